@@ -4,6 +4,7 @@ import physio
 from scipy.signal import butter, filtfilt
 from scipy.stats import skew
 from physio.parameters import get_respiration_parameters
+from Resp_Analysis.resp_modules.breath_segmenter import build_breath_table, cycle_skip_masks
 
 
 class FlowDirectionInferer:
@@ -196,44 +197,13 @@ class Resp_seg:
             return pd.DataFrame()
     
         try:
-            breaths = []
-            for _, row in resp_cycles.iterrows():
-                if any(pd.isnull([row["inspi_index"], row["expi_index"], row["next_inspi_index"]])):
-                    print(f"[WARN] Skip row: NaN in index field: {row}")
-                    continue
-                if int(row["next_inspi_index"]) >= len(resp):
-                    print(f"[WARN] Skip row: next_inspi_index {row['next_inspi_index']} >= resp len {len(resp)}")
-                    continue
+            missing_index, out_of_range = cycle_skip_masks(resp_cycles, len(resp))
+            for pos in np.flatnonzero(missing_index):
+                print(f"[WARN] Skip row: NaN in index field: {resp_cycles.iloc[pos]}")
+            for pos in np.flatnonzero(out_of_range):
+                print(f"[WARN] Skip row: next_inspi_index {resp_cycles['next_inspi_index'].iloc[pos]} >= resp len {len(resp)}")
 
-            
-                breaths.append({
-                    "inspiration_start": int(row["inspi_index"]),
-                    "inspiration_end":   int(row["expi_index"]),
-                    "expiration_start":  int(row["expi_index"] + 1),
-                    "expiration_end":    int(row["next_inspi_index"]),
-
-                    "inspiration_start_time": float(row["inspi_time"]),
-                    "inspiration_end_time":   float(row["expi_time"]),
-                    "expiration_start_time":  float(row["expi_time"]),
-                    "expiration_end_time":    float(row["next_inspi_time"]),
-
-                    "inspiration_duration": float(row["inspi_duration"]),
-                    "expiration_duration":  float(row["expi_duration"]),
-                    "total_duration":       float(row["cycle_duration"]),
-
-                    "inspiration_volume": float(row["inspi_volume"]),
-                    "expiration_volume":  float(row["expi_volume"]),
-                    "total_volume":       float(row["total_volume"]),
-
-                    "inspiration_amplitude": float(row["inspi_amplitude"]),
-                    "expiration_amplitude":  float(row["expi_amplitude"]),
-                    "total_amplitude":       float(row["total_amplitude"]),
-                })
-
-            for i in range(len(breaths) - 1):
-                breaths[i + 1]["inspiration_start"] = breaths[i]["expiration_end"] + 1
-                breaths[i + 1]["inspiration_start_time"] = breaths[i]["expiration_end_time"] + 1 / self.fs
-            return pd.DataFrame(breaths)
+            return build_breath_table(resp_cycles, len(resp), self.fs)
 
         except Exception as e:
             print(f"[ERROR] Failed to generate the breathing calculation table: {e}")
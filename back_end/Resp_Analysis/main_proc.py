@@ -4,37 +4,149 @@ from .resp_modules import (
 )
 from io import BytesIO
 import os
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+# 超过该时长（秒）的记录按块分段，块长 CHUNK_SECONDS
+LONG_RECORDING_SECONDS = 2 * 3600
+CHUNK_SECONDS = 600.0
 
-def process_file(filepath: str) -> Tuple[str, pd.DataFrame, pd.DataFrame]:
+
+def process_file(filepath: str) -> Tuple[str, pd.DataFrame, int, pd.DataFrame]:
     """
-    加载并处理一个呼吸数据文件，返回：文件名、可视化 DataFrame、原始 DataFrame。
+    加载并处理一个呼吸数据文件，返回：文件名、可视化 DataFrame、样本数、呼吸边界表。
+
+    超过 LONG_RECORDING_SECONDS 的 CSV 记录按块读取并逐窗口处理（见 iter_process_file），
+    整个记录从不载入内存；其余记录整段载入，结果与 process_dataframe 相同。
     """
     name = os.path.splitext(os.path.basename(filepath))[0]
-    df = _load_df(filepath, name)
+    if is_long_recording(filepath):
+        samples = 0
 
-    segmenter = BreathSegmenter()
-    extractor = ImpedanceFeatureExtractor()
+        def counted(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+            nonlocal samples
+            for chunk in chunks:
+                samples += len(chunk)
+                yield chunk
+
+        pieces = list(iter_process_stream(counted(_iter_load_df(filepath, name)), CHUNK_SECONDS))
+        breaths, merged = _join_pieces(name, pieces)
+        vis_df = BreathFeatureReshaper(merged)
+        print(f"{name}, breaths: {len(breaths)}")
+        return name, vis_df, samples, breaths
+    name, vis_df, df, breaths = process_dataframe(name, _load_df(filepath, name))
+    return name, vis_df, len(df), breaths
+
+
+def is_long_recording(filepath: str) -> bool:
+    """
+    CSV 文件的数据行是否超过 LONG_RECORDING_SECONDS；只数到超过为止。Excel 文件无法按块读取，总是返回 False。
+    """
+    if not filepath.lower().endswith(".csv"):
+        return False
+    limit = LONG_RECORDING_SECONDS * BreathSegmenter().fs + 1  # 含表头
+    lines = 0
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            if lines > limit:
+                return True
+    return False
+
+
+def process_dataframe(name: str, df: pd.DataFrame,
+                      chunk_seconds: Optional[float] = None) -> Tuple[str, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    处理已加载的 DataFrame（例如上传缓存中的数据），返回：文件名、可视化 DataFrame、原始 DataFrame、呼吸边界表。
 
-    breaths = segmenter.segment(df)
-    results = extractor.calc(df, breaths)
+    chunk_seconds 为 None 时，超过 LONG_RECORDING_SECONDS 的记录自动按 CHUNK_SECONDS 逐窗口处理
+    （窗口规则见 BreathSegmenter.segment_stream）；为 0 时始终整段处理。
+    """
+    segmenter = BreathSegmenter()
+    if chunk_seconds is None and len(df) > LONG_RECORDING_SECONDS * segmenter.fs:
+        chunk_seconds = CHUNK_SECONDS
 
-    breaths["breath_index"] = breaths.index + 1
-    merged = pd.merge(results, breaths, on="breath_index", how="left")
+    if chunk_seconds:
+        breaths, merged = _join_pieces(name, list(iter_process_chunks(df, chunk_seconds)))
+    else:
+        breaths = segmenter.segment(df)
+        results = ImpedanceFeatureExtractor().calc(df, breaths)
+        breaths["breath_index"] = breaths.index + 1
+        merged = pd.merge(results, breaths, on="breath_index", how="left")
     vis_df = BreathFeatureReshaper(merged)
 
     print(f"{name}, breaths: {len(breaths)}")
     return name, vis_df, df, breaths
 
 
+def iter_process_file(filepath: str,
+                      chunk_seconds: float = CHUNK_SECONDS) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    按块读取文件并逐窗口产出 (breaths, merged)，见 iter_process_stream。
+    """
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    yield from iter_process_stream(_iter_load_df(filepath, name), chunk_seconds)
+
+
+def iter_process_chunks(df: pd.DataFrame,
+                        chunk_seconds: float = CHUNK_SECONDS) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    对已载入的 DataFrame 逐窗口产出 (breaths, merged)，见 iter_process_stream。
+    """
+    step = max(int(chunk_seconds * BreathSegmenter().fs), 1)
+    yield from iter_process_stream((df.iloc[start:start + step] for start in range(0, len(df), step)),
+                                   chunk_seconds)
+
+
+def iter_process_stream(chunks: Iterable[pd.DataFrame],
+                        chunk_seconds: float = CHUNK_SECONDS) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    对按顺序到达的记录片段逐窗口产出 (breaths, merged)：呼吸边界表及其与阻抗特征的合并结果。
+
+    每个窗口的呼吸一经确定即产出（窗口规则见 BreathSegmenter.segment_stream），特征只用缓存中
+    覆盖这些呼吸的行计算，之前的行随即丢弃，因此内存约为两个窗口，不随记录长度增长
+    （没有呼吸的区段会一直缓存到下一次呼吸）。breath_index 跨窗口连续编号。
+    """
+    extractor = ImpedanceFeatureExtractor()
+    held: List[pd.DataFrame] = []
+
+    def hold(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            held.append(chunk)
+            yield chunk
+
+    offset = 0
+    for breaths in BreathSegmenter().segment_stream(hold(chunks), chunk_seconds):
+        rows = pd.concat(held) if len(held) > 1 else held[0]
+        index = np.asarray(rows.index)
+        positions = np.searchsorted(index, breaths[["inspiration_start", "expiration_end"]].to_numpy())
+        start, end = int(positions.min()), min(int(positions.max()) + 1, len(rows))
+        results = extractor.calc(rows.iloc[start:end], breaths)
+        # Later breaths start after this piece's last one
+        held[:] = [rows.iloc[int(np.searchsorted(index, breaths["expiration_end"].iloc[-1])):].copy()]
+
+        results["breath_index"] += offset
+        breaths["breath_index"] = np.arange(offset + 1, offset + len(breaths) + 1)
+        yield breaths, pd.merge(results, breaths, on="breath_index", how="left")
+        offset += len(breaths)
+
+
+def _join_pieces(name: str, pieces: List[Tuple[pd.DataFrame, pd.DataFrame]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    拼接逐窗口产出的 (breaths, merged)。
+    """
+    if not pieces:
+        raise ValueError(f"No breaths detected in {name}")
+    return tuple(pd.concat(parts, ignore_index=True) for parts in zip(*pieces))
+
+
 def generate_report_files(df: pd.DataFrame, vis_df: pd.DataFrame) -> BytesIO:
     """
     根据分析结果生成包含 Excel、PDF 和图像的压缩包。
     """
     return ExportUtils.write_zip({
-        "data.xlsx": ExportUtils.dataframe_to_excel_bytes(vis_df, freeze_header=True),
+        "data.xlsx": ExportUtils.dataframe_to_excel_bytes(vis_df, freeze_header=True, separate_by="BREATH_INDEX"),
         "plot.png": RespiratoryPlotter(df),
         "report.pdf": ExportUtils.dataframe_and_image_to_pdf(
             vis_df,
@@ -43,6 +155,7 @@ def generate_report_files(df: pd.DataFrame, vis_df: pd.DataFrame) -> BytesIO:
             "BREATH_INDEX", "SEGMENT", "R5-19", "R5", "R19", "X5",
             "INSP_VOLUME", "EXP_VOLUME"
         ],
+        separate_by="BREATH_INDEX",
         )
     })
 
@@ -58,3 +171,13 @@ def _load_df(path: str, name: str) -> pd.DataFrame:
     except Exception as e:
         raise RuntimeError(f"[ERROR] Failed to load {name}: {e}") from e
 
+
+
+def _iter_load_df(path: str, name: str) -> Iterator[pd.DataFrame]:
+    """
+    按块加载 DataFrame，自动修剪列名。
+    """
+    try:
+        yield from DataFrameLoader(index_col="#", delimiter="\t").iter_load(path)
+    except Exception as e:
+        raise RuntimeError(f"[ERROR] Failed to load {name}: {e}") from e
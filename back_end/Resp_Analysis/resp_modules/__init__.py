@@ -5,6 +5,8 @@ from .dataframe_loader import DataFrameLoader
 from .resp_plotter import RespiratoryPlotter
 from .export_utils import ExportUtils
 from .dataframe_validator import DataFrameValidator
+from .segment_stats import SegmentStatistics
+from .csv_ingest import CSVIngestEngine
 
 __all__ = [
     "ImpedanceFeatureExtractor",
@@ -13,5 +15,7 @@ __all__ = [
     "DataFrameLoader",
     "RespiratoryPlotter",
     "ExportUtils",
-    "DataFrameValidator"
+    "DataFrameValidator",
+    "SegmentStatistics",
+    "CSVIngestEngine"
 ]
@@ -1,79 +1,48 @@
 import pandas as pd
 import numpy as np
 
+METRICS = ["R5-19", "R5", "R19", "X5"]
+SEGMENTS = ["INSP", "EXP", "INSP-EXP", "TOTAL", "MAX", "MIN", "MAX-MIN"]
+
+# 仅在每个呼吸的 INSP 行填写的字段：输入列 -> 输出列
+PER_BREATH_COLUMNS = {
+    "INSP_Volume": "INSP_VOLUME",
+    "EXP_Volume": "EXP_VOLUME",
+    "inspiration_start": "INSPIRATION_START",
+    "inspiration_end": "INSPIRATION_END",
+    "expiration_start": "EXPIRATION_START",
+    "expiration_end": "EXPIRATION_END",
+}
+
+
 def BreathFeatureReshaper(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将每个呼吸一行的特征表转换为长表：每个呼吸 7 行（每个 SEGMENT 一行）。
+
+    缺失的指标列和非 INSP 行的呼吸字段为 NaN（整数列为可空的 Int64）。
+    不插入空白分隔行，由需要分隔的导出器自行添加。
+    """
     # 检查字段
-    required = [
-        "breath_index", "INSP_Volume", "EXP_Volume",
-        "inspiration_start", "inspiration_end",
-        "expiration_start", "expiration_end",
-    ]
+    required = ["breath_index", *PER_BREATH_COLUMNS]
     if missing := [col for col in required if col not in df.columns]:
         raise KeyError(f"Missing required column(s): {missing}")
 
-    metrics = ["R5-19", "R5", "R19", "X5"]
-    segments = ["INSP", "EXP", "INSP-EXP", "TOTAL", "MAX", "MIN", "MAX-MIN"]
-    N = len(df)
-
-    arrays = {col: df.get(col, [""] * N) for col in required}
-    for m in metrics:
-        for s in segments:
-            arrays[f"{m}_{s}"] = df.get(f"{m}_{s}", [""] * N)
+    n, s = len(df), len(SEGMENTS)
+    out = {
+        "BREATH_INDEX": np.repeat(df["breath_index"].to_numpy(), s),
+        "SEGMENT": np.tile(np.array(SEGMENTS, dtype=object), n),
+    }
 
-    rows = []
-    for i in range(N):
-        # Add blank line before each breath index (except the first one)
-        if i > 0:
-            blank_row = {
-                "BREATH_INDEX": "",
-                "SEGMENT": "",
-                "R5-19": "",
-                "R5": "",
-                "R19": "",
-                "X5": "",
-                "INSP_VOLUME": "",
-                "EXP_VOLUME": "",
-                "INSPIRATION_START": "",
-                "INSPIRATION_END": "",
-                "EXPIRATION_START": "",
-                "EXPIRATION_END": "",
-            }
-            rows.append(blank_row)
-        
-        # Add header line for the breath index
-        # header_row = {
-        #     "BREATH_INDEX": f"Breath {arrays['breath_index'][i]}",
-        #     "SEGMENT": "SEGMENT",
-        #     "R5-19": "R5-19",
-        #     "R5": "R5",
-        #     "R19": "R19",
-        #     "X5": "X5",
-        #     "INSP_VOLUME": "INSP_VOLUME",
-        #     "EXP_VOLUME": "EXP_VOLUME",
-        #     "INSPIRATION_START": "INSPIRATION_START",
-        #     "INSPIRATION_END": "INSPIRATION_END",
-        #     "EXPIRATION_START": "EXPIRATION_START",
-        #     "EXPIRATION_END": "EXPIRATION_END",
-        # }
-        # rows.append(header_row)
-        
-        # Add data rows for each segment
-        for seg in segments:
-            row = {
-                "BREATH_INDEX": arrays["breath_index"][i],
-                "SEGMENT": seg,
-                "R5-19": arrays[f"R5-19_{seg}"][i],
-                "R5": arrays[f"R5_{seg}"][i],
-                "R19": arrays[f"R19_{seg}"][i],
-                "X5": arrays[f"X5_{seg}"][i],
-                "INSP_VOLUME": arrays["INSP_Volume"][i] if seg == "INSP" else "",
-                "EXP_VOLUME": arrays["EXP_Volume"][i] if seg == "INSP" else "",
-                "INSPIRATION_START": arrays["inspiration_start"][i] if seg == "INSP" else "",
-                "INSPIRATION_END": arrays["inspiration_end"][i] if seg == "INSP" else "",
-                "EXPIRATION_START": arrays["expiration_start"][i] if seg == "INSP" else "",
-                "EXPIRATION_END": arrays["expiration_end"][i] if seg == "INSP" else "",
-            }
-            rows.append(row)
+    # 每个指标的 (n, 7) 块按行展开，顺序与 repeat/tile 一致
+    for m in METRICS:
+        block = df.reindex(columns=[f"{m}_{seg}" for seg in SEGMENTS]).to_numpy()
+        out[m] = block.reshape(-1)
 
-    return pd.DataFrame(rows)
+    insp_rows = np.arange(n) * s
+    for src, dst in PER_BREATH_COLUMNS.items():
+        values = df[src]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            values = values.astype("Int64")
+        out[dst] = pd.Series(values.array, index=insp_rows).reindex(np.arange(n * s)).array
 
+    return pd.DataFrame(out)
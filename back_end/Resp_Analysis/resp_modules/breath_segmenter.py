@@ -1,10 +1,106 @@
 import numpy as np
 import pandas as pd
 import physio
-from typing import List, Dict
+from importlib.metadata import version
+from typing import List, Dict, Iterable, Iterator, Tuple
 import chardet
 import io
 
+# Gaussian smoothing of the flow signal before cycle detection
+SMOOTHING_SIGMA_MS = 90
+
+# physio's crossing-baseline thresholds: baseline - eps * factor, eps = (baseline - q10) / 100
+DETECTION_QUANTILE = 0.10
+DETECTION_EPSILON_FACTORS = (10., 5.)
+
+# Of several inspiration crossings before one expiration, physio 0.2 keeps the last
+# (interleave_insp_exp(remove_first_insp=True)) and physio 0.3+ the first
+PHYSIO_KEEPS_LAST_INSPIRATION = tuple(int(part) for part in version("physio").split(".")[:2]) < (0, 3)
+
+# physio cycle columns holding sample indices of the breath boundaries
+CYCLE_INDEX_COLUMNS = ["inspi_index", "expi_index", "next_inspi_index"]
+
+# Breath table column -> physio cycle feature it is copied from
+BREATH_FEATURE_COLUMNS = {
+    "inspiration_start_time": "inspi_time",
+    "inspiration_end_time":   "expi_time",
+    "expiration_start_time":  "expi_time",
+    "expiration_end_time":    "next_inspi_time",
+
+    "inspiration_duration":   "inspi_duration",
+    "expiration_duration":    "expi_duration",
+    "total_duration":         "cycle_duration",
+
+    "inspiration_volume":     "inspi_volume",
+    "expiration_volume":      "expi_volume",
+    "total_volume":           "total_volume",
+
+    "inspiration_amplitude":  "inspi_amplitude",
+    "expiration_amplitude":   "expi_amplitude",
+    "total_amplitude":        "total_amplitude",
+}
+
+
+def cycle_skip_masks(cycles: pd.DataFrame, n_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cycles that cannot form a breath
+
+    Returns:
+        Tuple of (missing_index, out_of_range) boolean masks. A cycle is out of range
+        when its next inspiration is not inside the signal; cycles with a missing
+        index are only counted as missing_index.
+    """
+    indices = cycles[CYCLE_INDEX_COLUMNS].to_numpy(dtype=np.float64)
+    missing_index = np.isnan(indices).any(axis=1)
+    next_inspi = np.trunc(np.where(missing_index, 0, indices[:, 2]))
+    return missing_index, ~missing_index & (next_inspi >= n_samples)
+
+
+def build_breath_table(cycles: pd.DataFrame, n_samples: int, fs: float) -> pd.DataFrame:
+    """
+    One row per usable respiration cycle, with sample and time boundaries of both phases
+
+    Cycles with a missing boundary index or a next inspiration beyond the signal are
+    dropped. Each breath's inspiration then starts one sample after the previous
+    breath's expiration ends, so consecutive breaths tile the signal.
+
+    Args:
+        cycles: Cycle features from physio (CYCLE_INDEX_COLUMNS plus the
+            BREATH_FEATURE_COLUMNS sources)
+        n_samples: Length of the segmented signal
+        fs: Sampling rate in Hz
+
+    Returns:
+        Breath table; empty (without columns) when no cycle is usable
+    """
+    missing_index, out_of_range = cycle_skip_masks(cycles, n_samples)
+    keep = ~(missing_index | out_of_range)
+    if not keep.any():
+        return pd.DataFrame()
+
+    indices = cycles[CYCLE_INDEX_COLUMNS].to_numpy(dtype=np.float64)[keep].astype(np.int64)
+    inspi, expi, next_inspi = indices.T
+    features = {
+        column: cycles[source].to_numpy(dtype=np.float64)[keep]
+        for column, source in BREATH_FEATURE_COLUMNS.items()
+    }
+
+    # Chain the breaths: each inspiration starts right after the previous expiration
+    inspi = inspi.copy()
+    inspi[1:] = next_inspi[:-1] + 1
+    inspiration_start_time = features["inspiration_start_time"].copy()
+    inspiration_start_time[1:] = features["expiration_end_time"][:-1] + 1 / fs
+
+    table = {
+        "inspiration_start": inspi,
+        "inspiration_end":   expi,
+        "expiration_start":  expi + 1,
+        "expiration_end":    next_inspi,
+    }
+    table.update(features)
+    table["inspiration_start_time"] = inspiration_start_time
+    return pd.DataFrame(table)
+
 
 class BreathSegmenter:
     def __init__(self, flow_column="Flow_Filtered", fs=200):
@@ -12,11 +108,33 @@ class BreathSegmenter:
         self.fs = fs
         self.expected_cols = ["inspi_index", "expi_index", "next_inspi_index"]
 
+    @staticmethod
+    def _zero_crossings(signal: np.ndarray) -> np.ndarray:
+        """Positions i where the sign changes between signal[i - 1] and signal[i]"""
+        return np.flatnonzero(signal[:-1] * signal[1:] < 0) + 1
+
+    def _snap_to_zero(self, signal: np.ndarray, crossings: np.ndarray,
+                      indices: np.ndarray, window=20) -> np.ndarray:
+        """
+        Move every index to the first zero crossing in [idx - window, idx + window)
+
+        The crossing snaps to whichever of its two samples is closer to zero. Indices
+        with no crossing in their window are returned unchanged.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(signal) < 2:
+            return indices
+        lo = np.maximum(indices - window, 1)
+        hi = np.minimum(indices + window, len(signal) - 1)
+        k = np.searchsorted(crossings, lo)
+        candidate = crossings[np.minimum(k, len(crossings) - 1)] if len(crossings) else lo
+        found = (k < len(crossings)) & (candidate < hi)
+        crossing = np.where(found, candidate, 1)
+        snapped = np.where(np.abs(signal[crossing]) < np.abs(signal[crossing - 1]), crossing, crossing - 1)
+        return np.where(found, snapped, indices)
+
     def _nearest_zero(self, signal: np.ndarray, idx: int, window=20) -> int:
-        for i in range(max(idx - window, 1), min(idx + window, len(signal) - 1)):
-            if signal[i - 1] * signal[i] < 0:
-                return i if abs(signal[i]) < abs(signal[i - 1]) else i - 1
-        return idx
+        return int(self._snap_to_zero(signal, self._zero_crossings(signal), [idx], window)[0])
 
     def segment(self, df: pd.DataFrame) -> pd.DataFrame:
         if self.flow_column not in df:
@@ -25,7 +143,7 @@ class BreathSegmenter:
 
         raw = df[self.flow_column].fillna(0).values
         try:
-            resp = physio.smooth_signal(-raw, self.fs, win_shape="gaussian", sigma_ms=90)
+            resp = physio.smooth_signal(-raw, self.fs, win_shape="gaussian", sigma_ms=SMOOTHING_SIGMA_MS)
         except Exception as e:
             print(f"[ERROR] Smoothing failed: {e}")
             return pd.DataFrame()
@@ -39,47 +157,298 @@ class BreathSegmenter:
             print(f"[ERROR] Cycle analysis failed: {e}")
             return pd.DataFrame()
 
+        crossings = self._zero_crossings(raw)
         for col in self.expected_cols:
-            cleaned[col] = cleaned[col].apply(
-                lambda idx: self._nearest_zero(raw, int(idx)) if pd.notnull(idx) else np.nan
-            )
+            indices = cleaned[col].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(indices)
+            snapped = indices.copy()
+            snapped[valid] = self._snap_to_zero(raw, crossings, indices[valid].astype(np.int64))
+            # Integer column unless some cycles have no index
+            cleaned[col] = snapped if not valid.all() else snapped.astype(np.int64)
 
         return self._build_table(cleaned, resp)
 
+    def segment_stream(self, chunks: Iterable[pd.DataFrame], chunk_seconds: float = 600.0) -> Iterator[pd.DataFrame]:
+        """
+        segment() over a recording that arrives in consecutive pieces (e.g. a file read
+        chunk by chunk), yielding breaths as soon as they are final
+
+        The recording is split into windows of chunk_seconds. Each window gets its own
+        detection thresholds (from the 10% quantile of the smoothed signal over the
+        chunk_seconds ending at the window's end) and its own cycle cleaning (physio's
+        median/MAD rules over the cycles starting in the window). Smoothing, crossing
+        interleaving and zero-snapping are exact across window boundaries, and breaths
+        are chained across pieces as in segment(). A recording no longer than one
+        window therefore segments exactly as segment(), and the result never depends on
+        how the input is split into pieces.
+
+        Only the samples still needed are kept: about two windows plus the breath in
+        progress, whatever the recording length.
+
+        Yields:
+            One piece of the breath table per window that has breaths, in order;
+            concatenated (ignore_index=True) they form the whole table
+        """
+        stream = _BreathStream(self, max(int(chunk_seconds * self.fs), 1))
+        # Errors reading the input propagate; analysis errors end the stream as segment() does
+        for chunk in chunks:
+            if self.flow_column not in chunk:
+                print(f"[ERROR] Missing '{self.flow_column}'")
+                return
+            try:
+                pieces = list(stream.push(np.asarray(chunk[self.flow_column])))
+            except Exception as e:
+                print(f"[ERROR] Cycle analysis failed: {e}")
+                return
+            yield from pieces
+        try:
+            pieces = list(stream.finish())
+        except Exception as e:
+            print(f"[ERROR] Cycle analysis failed: {e}")
+            return
+        yield from pieces
+
+    def segment_chunks(self, df: pd.DataFrame, chunk_seconds: float = 600.0) -> Iterator[pd.DataFrame]:
+        """segment_stream() over an in-memory recording, fed one window at a time"""
+        step = max(int(chunk_seconds * self.fs), 1)
+        yield from self.segment_stream((df.iloc[start:start + step] for start in range(0, len(df), step)),
+                                       chunk_seconds)
+
+    @staticmethod
+    def _raw(flow: np.ndarray) -> np.ndarray:
+        """flow with NaN as 0, as segment() fills it"""
+        return np.where(np.isnan(flow), 0, flow)
+
+    def _window_cycles(self, resp: np.ndarray, offset: int, cycles: np.ndarray) -> pd.DataFrame:
+        """
+        physio's features and cleaning for cycles (absolute indices), on resp starting at offset
+
+        Index columns of the result are absolute again, with times and durations derived
+        from them as physio does on the whole signal.
+        """
+        baseline = 0.0
+        features = physio.compute_respiration_cycle_features(resp, self.fs, cycles - offset, baseline=baseline)
+        cleaned = physio.clean_respiration_cycles(resp, self.fs, features, baseline, low_limit_log_ratio=5)
+        for col in CYCLE_INDEX_COLUMNS:
+            cleaned[col] += offset
+        cleaned["inspi_time"] = cleaned["inspi_index"].to_numpy() / self.fs
+        cleaned["expi_time"] = cleaned["expi_index"].to_numpy() / self.fs
+        cleaned["next_inspi_time"] = cleaned["next_inspi_index"].to_numpy() / self.fs
+
+        inspi, expi, next_inspi = (cleaned[col] for col in ("inspi_time", "expi_time", "next_inspi_time"))
+        cleaned["cycle_duration"] = next_inspi - inspi
+        cleaned["inspi_duration"] = expi - inspi
+        cleaned["expi_duration"] = next_inspi - expi
+        cleaned["cycle_freq"] = 1. / cleaned["cycle_duration"]
+        cleaned["cycle_ratio"] = cleaned["inspi_duration"] / cleaned["cycle_duration"]
+        return cleaned
+
     def _build_table(self, df: pd.DataFrame, resp: np.ndarray) -> pd.DataFrame:
-        breaths: List[Dict] = []
-        for _, row in df.iterrows():
-            if any(pd.isnull(row[col]) for col in self.expected_cols):
-                continue
-            if int(row["next_inspi_index"]) >= len(resp):
-                continue
-            breaths.append({
-                "inspiration_start":      int(row["inspi_index"]),
-                "inspiration_end":        int(row["expi_index"]),
-                "expiration_start":       int(row["expi_index"]) + 1,
-                "expiration_end":         int(row["next_inspi_index"]),
-
-                "inspiration_start_time": float(row["inspi_time"]),
-                "inspiration_end_time":   float(row["expi_time"]),
-                "expiration_start_time":  float(row["expi_time"]),
-                "expiration_end_time":    float(row["next_inspi_time"]),
-
-                "inspiration_duration":   float(row["inspi_duration"]),
-                "expiration_duration":    float(row["expi_duration"]),
-                "total_duration":         float(row["cycle_duration"]),
-
-                "inspiration_volume":     float(row["inspi_volume"]),
-                "expiration_volume":      float(row["expi_volume"]),
-                "total_volume":           float(row["total_volume"]),
-
-                "inspiration_amplitude":  float(row["inspi_amplitude"]),
-                "expiration_amplitude":   float(row["expi_amplitude"]),
-                "total_amplitude":        float(row["total_amplitude"]),
-            })
-
-        for i in range(len(breaths) - 1):
-            breaths[i + 1]["inspiration_start"] = breaths[i]["expiration_end"] + 1
-            breaths[i + 1]["inspiration_start_time"] = breaths[i]["expiration_end_time"] + 1 / self.fs
-
-        return pd.DataFrame(breaths)
+        return build_breath_table(df, len(resp), self.fs)
+
+
+class _BreathStream:
+    """
+    State of BreathSegmenter.segment_stream(); positions are sample indices in the recording
+
+    Buffers hold raw flow from raw_start and smoothed signal from resp_start, trimmed
+    after every push to what smoothing, detection, cleaning and snapping still need.
+    """
+    SNAP_WINDOW = 20
+
+    def __init__(self, segmenter: BreathSegmenter, window: int):
+        self.seg = segmenter
+        self.fs = segmenter.fs
+        self.window = window
+        # physio's Gaussian kernel spans +-5 sigma
+        self.margin = 5 * max(int(self.fs * SMOOTHING_SIGMA_MS / 1000.), 1) + 1
+        self.finished = False
+
+        self.raw = np.empty(0)
+        self.raw_start = 0
+        self.resp = np.empty(0)
+        self.resp_start = 0
+
+        self.next_window = 0  # next window to scan for crossings
+        self.last_insp = None  # latest inspiration-threshold crossing
+        self.last_confirmed = None  # latest of those followed by a deeper crossing
+        self.exp_open = False  # an expiration may follow the latest confirmed inspiration
+        self.gap_insp = None  # inspiration kept since the last expiration
+        self.pending = None  # (inspiration, expiration) waiting for the next inspiration
+
+        self.cycles: List[Tuple[int, int, int]] = []  # finished, not yet cleaned
+        self.clean_window = 0  # next window to clean
+        self.last_breath = None  # (expiration_end, expiration_end_time) of the last yielded breath
+
+    @property
+    def received(self) -> int:
+        return self.raw_start + len(self.raw)
+
+    @property
+    def smoothed(self) -> int:
+        return self.resp_start + len(self.resp)
+
+    def push(self, flow: np.ndarray) -> Iterator[pd.DataFrame]:
+        self.raw = np.concatenate([self.raw, self.seg._raw(flow)]) if len(self.raw) else self.seg._raw(flow)
+        yield from self._advance()
+
+    def finish(self) -> Iterator[pd.DataFrame]:
+        self.finished = True
+        yield from self._advance()
+
+    def _advance(self) -> Iterator[pd.DataFrame]:
+        self._smooth()
+        self._detect()
+        yield from self._clean()
+        self._trim()
+
+    def _smooth(self):
+        end = self.received if self.finished else self.received - self.margin
+        if end <= self.smoothed:
+            return
+        lo, hi = max(self.smoothed - self.margin, 0), min(end + self.margin, self.received)
+        raw = self.raw[lo - self.raw_start:hi - self.raw_start]
+        smoothed = physio.smooth_signal(-raw, self.fs, win_shape="gaussian", sigma_ms=SMOOTHING_SIGMA_MS)
+        part = smoothed[self.smoothed - lo:end - lo]
+        self.resp = np.concatenate([self.resp, part]) if len(self.resp) else part
+
+    def _detect(self):
+        """Scan every window whose crossings can all be seen"""
+        n = self.smoothed
+        while True:
+            start = self.next_window * self.window
+            end = start + self.window
+            if self.finished:
+                if start >= n - 1:
+                    return
+                end = min(end, n)
+            elif n < end + 1:
+                return
+            self._scan(start, end, min(end, n - 1))
+            self.next_window += 1
+
+    def _scan(self, start: int, end: int, last_pair: int):
+        """Crossings of pairs (i, i + 1), i in [start, last_pair), with the thresholds of window [start, end)"""
+        baseline = 0.0
+        q10 = np.quantile(self._resp(max(end - self.window, 0), end), DETECTION_QUANTILE)
+        epsilon = (baseline - q10) / 100.
+        baseline_dw = baseline - epsilon * DETECTION_EPSILON_FACTORS[0]
+        baseline_insp = baseline - epsilon * DETECTION_EPSILON_FACTORS[1]
+
+        window = self._resp(start, last_pair + 1)
+        resp0, resp1 = window[:-1], window[1:]
+        # Event kinds sort as they must be handled at the same position: inspiration before deeper crossing
+        events = [
+            (np.flatnonzero((resp0 >= baseline_insp) & (resp1 < baseline_insp)) + start, 0),
+            (np.flatnonzero((resp0 >= baseline_dw) & (resp1 < baseline_dw)) + start, 1),
+            (np.flatnonzero((resp0 < baseline) & (resp1 >= baseline)) + start, 2),
+        ]
+        positions = np.concatenate([p for p, _ in events])
+        kinds = np.concatenate([np.full(len(p), kind) for p, kind in events])
+        for i in np.lexsort((kinds, positions)):
+            position, kind = int(positions[i]), kinds[i]
+            if kind == 0:
+                self.last_insp = position
+            elif kind == 1:
+                # Last inspiration crossing before each deeper crossing, once
+                if self.last_insp is not None and self.last_insp != self.last_confirmed:
+                    self.last_confirmed = self.last_insp
+                    self._inspiration(self.last_insp)
+            else:
+                self._expiration(position)
+
+    def _inspiration(self, position: int):
+        """physio's interleave_insp_exp: one inspiration between expirations"""
+        self.exp_open = True
+        if self.gap_insp is None or PHYSIO_KEEPS_LAST_INSPIRATION:
+            self.gap_insp = position
+
+    def _expiration(self, position: int):
+        """physio's interleave_insp_exp: the first expiration after an inspiration"""
+        if not self.exp_open:
+            return
+        self.exp_open = False
+        if self.pending is not None:
+            self.cycles.append((*self.pending, self.gap_insp))
+        self.pending = (self.gap_insp, position)
+        self.gap_insp = None
+
+    def _earliest_cycle_start(self) -> int:
+        """No cycle still to be found starts before this"""
+        if self.pending is not None:
+            return self.pending[0]
+        if self.gap_insp is not None:
+            return self.gap_insp
+        if self.last_insp is not None and self.last_insp != self.last_confirmed:
+            return self.last_insp
+        return self.next_window * self.window
+
+    def _clean(self) -> Iterator[pd.DataFrame]:
+        """Clean and yield the cycles of every window that can gain no more cycles"""
+        if self.finished and self.pending is not None and self.gap_insp is not None:
+            # The last inspiration closes the last cycle
+            self.cycles.append((*self.pending, self.gap_insp))
+            self.pending = None
+
+        while self.cycles:
+            # Windows without cycles have nothing to clean
+            self.clean_window = max(self.clean_window, self.cycles[0][0] // self.window)
+            end = (self.clean_window + 1) * self.window
+            in_window = [c for c in self.cycles if c[0] < end]
+            if not self.finished:
+                if self._earliest_cycle_start() < end:
+                    return
+                # Snapping reads SNAP_WINDOW + 1 samples past the last index
+                if self.received < in_window[-1][2] + self.SNAP_WINDOW + 2:
+                    return
+            self.cycles = self.cycles[len(in_window):]
+            self.clean_window += 1
+            piece = self._breaths(np.array(in_window, dtype=np.int64))
+            if not piece.empty:
+                yield piece
+
+    def _breaths(self, cycles: np.ndarray) -> pd.DataFrame:
+        lo, hi = int(cycles[0, 0]), int(cycles[-1, 2]) + 1
+        cleaned = self.seg._window_cycles(self._resp(lo, hi), lo, cycles)
+
+        # Snap to the zero crossings of the raw flow, reading only around the cycles
+        window = self.SNAP_WINDOW
+        raw_lo = max(lo - window - 1, 0)
+        raw = self.raw[raw_lo - self.raw_start:min(hi + window, self.received) - self.raw_start]
+        crossings = self.seg._zero_crossings(raw)
+        for col in CYCLE_INDEX_COLUMNS:
+            indices = cleaned[col].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(indices)
+            snapped = indices.copy()
+            snapped[valid] = self.seg._snap_to_zero(raw, crossings, indices[valid].astype(np.int64) - raw_lo,
+                                                    window) + raw_lo
+            cleaned[col] = snapped if not valid.all() else snapped.astype(np.int64)
+
+        table = build_breath_table(cleaned, self.received, self.fs)
+        if table.empty:
+            return table
+        if self.last_breath is not None:
+            # Chain onto the previous piece, as build_breath_table chains rows
+            end, end_time = self.last_breath
+            table.loc[0, "inspiration_start"] = end + 1
+            table.loc[0, "inspiration_start_time"] = end_time + 1 / self.fs
+        self.last_breath = (int(table["expiration_end"].iloc[-1]), float(table["expiration_end_time"].iloc[-1]))
+        return table
+
+    def _resp(self, start: int, end: int) -> np.ndarray:
+        return self.resp[start - self.resp_start:end - self.resp_start]
 
+    def _trim(self):
+        """Drop samples before everything that can still be read"""
+        needed = self._earliest_cycle_start()
+        if self.cycles:
+            needed = min(needed, self.cycles[0][0])
+        # Thresholds of the last, partial window reach one window back
+        resp_from = min(needed, max(self.next_window - 1, 0) * self.window)
+        raw_from = min(needed - self.SNAP_WINDOW - 1, self.smoothed - self.margin)
+        if resp_from > self.resp_start:
+            self.resp = self.resp[resp_from - self.resp_start:].copy()
+            self.resp_start = resp_from
+        if raw_from > self.raw_start:
+            self.raw = self.raw[raw_from - self.raw_start:].copy()
+            self.raw_start = raw_from
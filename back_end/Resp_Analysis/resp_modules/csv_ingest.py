@@ -0,0 +1,185 @@
+import io
+import time
+import codecs
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, IO, Iterator, List, Optional, Union
+import chardet
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  pandas' fastest CSV parser
+    DEFAULT_ENGINE = "pyarrow"
+except ImportError:
+    DEFAULT_ENGINE = "c"
+
+logger = logging.getLogger(__name__)
+
+# Columns of an oscillometry export; "#" is the sample index
+OSCILLOMETRY_COLUMNS = ["Flow_Filtered", "R5", "X5", "R11", "X11", "R19", "X19", "#", "Volume"]
+
+
+@dataclass
+class IngestStats:
+    """Throughput of one read"""
+    rows: int
+    bytes: int
+    seconds: float
+    encoding: str
+    engine: str
+    typed: bool  # False when the file did not match the schema and dtypes were inferred
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+@dataclass
+class CSVIngestEngine:
+    """
+    Reader for oscillometry CSV exports with the fixed OSCILLOMETRY_COLUMNS schema.
+
+    When the header holds every expected column, only those columns are parsed, with
+    float32 signals and an int32 sample index ("#"), which halves memory against the
+    float64/int64 pandas infers. Anything else (missing columns, unparseable values)
+    falls back to a plain read, so validation can still report what is wrong.
+    """
+    delimiter: str = "\t"
+    index_col: Optional[str] = "#"
+    encoding: Optional[str] = None  # None: detect from the first sniff_bytes bytes
+    engine: str = DEFAULT_ENGINE
+    float_dtype: str = "float32"
+    index_dtype: str = "int32"
+    schema_only: bool = True  # False: also read columns outside the schema, with inferred dtypes
+    sniff_bytes: int = 64 * 1024
+    schema: List[str] = field(default_factory=lambda: list(OSCILLOMETRY_COLUMNS))
+    last_stats: Optional[IngestStats] = field(default=None, init=False, repr=False)
+
+    def read(self, source: Union[str, Path, bytes, IO[bytes]], usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Args:
+            source: Path, raw bytes or binary file object
+            usecols: Columns to keep. Defaults to the schema columns when the file matches
+
+        Raises:
+            UnicodeDecodeError: Content does not decode with the given or detected encoding
+            pandas.errors.EmptyDataError / ParserError: As pd.read_csv
+        """
+        data = self._read_bytes(source)
+        start = time.perf_counter()
+        prefix = data[:self.sniff_bytes]
+        encoding = self.encoding or self.detect_encoding(prefix)
+        dtype = self._schema_dtypes(self._header(prefix, encoding), usecols)
+
+        df = None
+        engine = self.engine
+        if dtype is not None:
+            index_col = next((name for name in dtype if name.strip() == self.index_col), None)
+            try:
+                columns = list(dtype) if self.schema_only else usecols
+                df = self._read_csv(data, encoding, engine, columns, dtype, index_col)
+            except (ValueError, TypeError) as e:
+                # Non-numeric or missing values; let the inferred read surface them
+                logger.info(f"Typed read failed, falling back to inferred dtypes: {e}")
+        typed = df is not None
+        if df is None:
+            engine = "c"
+            df = self._read_csv(data, encoding, engine, usecols, None, self.index_col)
+
+        self.last_stats = IngestStats(len(df), len(data), time.perf_counter() - start, encoding, engine, typed)
+        logger.info(f"Read {len(df)} rows in {self.last_stats.seconds:.3f}s "
+                    f"({self.last_stats.rows_per_second:,.0f} rows/s, {engine})")
+        return df
+
+    def iter_read(self, source: Union[str, Path, IO[bytes]], chunk_rows: int = 200_000,
+                  usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a file in chunks of chunk_rows rows, holding only one chunk at a time
+
+        Files with the schema header get the typed dtypes of read(), anything else
+        inferred dtypes per chunk. Unlike read(), a typed read cannot fall back once
+        chunks have been yielded, so unparseable values raise. last_stats is set once
+        the whole file has been read.
+
+        Args:
+            source: Path or seekable binary file object
+            chunk_rows: Rows per yielded DataFrame
+            usecols: As for read()
+
+        Raises:
+            ValueError: Values do not parse as the schema dtypes
+            UnicodeDecodeError: Content does not decode with the given or detected encoding
+        """
+        handle = open(source, "rb") if isinstance(source, (str, Path)) else source
+        try:
+            start = time.perf_counter()
+            origin = handle.tell()
+            prefix = handle.read(self.sniff_bytes)
+            handle.seek(origin)
+            encoding = self.encoding or self.detect_encoding(prefix)
+            dtype = self._schema_dtypes(self._header(prefix, encoding), usecols)
+            columns, index_col = usecols, self.index_col
+            if dtype is not None:
+                index_col = next((name for name in dtype if name.strip() == self.index_col), None)
+                if self.schema_only:
+                    columns = list(dtype)
+
+            rows = 0
+            # The pyarrow parser cannot read in chunks
+            with pd.read_csv(handle, delimiter=self.delimiter, usecols=columns, index_col=index_col, dtype=dtype,
+                             encoding=encoding, engine="c", chunksize=chunk_rows) as reader:
+                for chunk in reader:
+                    rows += len(chunk)
+                    yield chunk
+            self.last_stats = IngestStats(rows, handle.tell() - origin, time.perf_counter() - start,
+                                          encoding, "c", dtype is not None)
+        finally:
+            if handle is not source:
+                handle.close()
+
+    @staticmethod
+    def detect_encoding(prefix: bytes) -> str:
+        """UTF-8 (with or without BOM) when the prefix decodes as such, else chardet's guess"""
+        if prefix.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
+        try:
+            # final=False tolerates a multi-byte character cut at the end of the prefix
+            codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+            return "utf-8"
+        except UnicodeDecodeError:
+            return chardet.detect(prefix)["encoding"] or "utf-8"
+
+    def _header(self, prefix: bytes, encoding: str) -> List[str]:
+        line = prefix.split(b"\n", 1)[0].rstrip(b"\r")
+        try:
+            return line.decode(encoding).lstrip("\ufeff").split(self.delimiter)
+        except (UnicodeDecodeError, LookupError):
+            return []
+
+    def _schema_dtypes(self, header: List[str], usecols: Optional[List[str]]) -> Optional[Dict[str, str]]:
+        """dtype for every column to read, keyed by the header's own spelling; None if off-schema"""
+        wanted = set(usecols or self.schema)
+        if self.index_col:
+            wanted.add(self.index_col)
+        if not wanted <= set(self.schema):
+            return None
+        present = {name.strip(): name for name in header}
+        if not wanted <= set(present):
+            return None
+        return {
+            present[col]: self.index_dtype if col == self.index_col else self.float_dtype
+            for col in self.schema if col in wanted
+        }
+
+    def _read_csv(self, data: bytes, encoding: str, engine: str, usecols, dtype, index_col) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(data), delimiter=self.delimiter, usecols=usecols, index_col=index_col,
+                           dtype=dtype, encoding=encoding, engine=engine)
+
+    @staticmethod
+    def _read_bytes(source) -> bytes:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source)
+        if isinstance(source, (str, Path)):
+            return Path(source).read_bytes()
+        return source.read()
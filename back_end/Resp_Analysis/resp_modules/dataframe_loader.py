@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Union, Dict, Optional, List, IO
+from typing import Union, Dict, Iterator, Optional, List, IO
 import pandas as pd
 import io
 from Resp_Analysis.resp_modules.dataframe_validator import DataFrameValidator
+from Resp_Analysis.resp_modules.csv_ingest import CSVIngestEngine
 
 @dataclass
 class DataFrameLoader:
@@ -25,15 +26,41 @@ class DataFrameLoader:
             }
         raise FileNotFoundError(f"{path} is not a valid file or directory")
 
+    def iter_load(self, path: Union[str, Path], chunk_rows: int = 200_000) -> Iterator[pd.DataFrame]:
+        """
+        Read one recording in chunks of chunk_rows rows, with stripped column names
+
+        CSV files are streamed, so only one chunk is in memory at a time. Excel files
+        cannot be read incrementally; they are loaded whole and then sliced.
+        """
+        path = Path(path)
+        suffix = path.suffix.lower()
+        try:
+            if suffix == '.csv':
+                engine = CSVIngestEngine(delimiter=self.delimiter, index_col=self.index_col,
+                                         encoding=self.encoding)
+                chunks = engine.iter_read(path, chunk_rows, usecols=self.usecols)
+            elif suffix == '.xlsx':
+                df = self._read(path, suffix, path.name)
+                chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+            else:
+                raise ValueError(f"Unsupported file type: {suffix}")
+            for chunk in chunks:
+                chunk.columns = chunk.columns.str.strip()
+                yield chunk
+        except Exception as e:
+            raise ValueError(f"[ERROR] Failed to read {path.name}: {e}")
+
     def load_bytes(self, data: bytes, suffix: str, name: str = "uploaded") -> pd.DataFrame:
         return self._read(io.BytesIO(data), suffix.lower(), name)
 
     def _read(self, source: Union[Path, IO[bytes]], suffix: str, name: str) -> pd.DataFrame:
         try:
             if suffix == '.csv':
-                df = pd.read_csv(source, delimiter=self.delimiter,
-                                 index_col=self.index_col, usecols=self.usecols,
-                                 encoding=self.encoding)
+                # Typed float32 columns when the file has the oscillometry schema
+                engine = CSVIngestEngine(delimiter=self.delimiter, index_col=self.index_col,
+                                         encoding=self.encoding)
+                df = engine.read(source, usecols=self.usecols)
             elif suffix == '.xlsx':
                 # For Excel files, we don't use delimiter parameter
                 df = pd.read_excel(source, index_col=self.index_col,
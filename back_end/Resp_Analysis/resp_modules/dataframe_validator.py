@@ -1,23 +1,37 @@
 import pandas as pd
-import chardet
 import io
 import re
+import time
+from Resp_Analysis.resp_modules.csv_ingest import CSVIngestEngine, OSCILLOMETRY_COLUMNS
 
 class DataFrameValidator:
-    EXPECTED_COLUMNS = [
-        "Flow_Filtered", "R5", "X5", "R11", "X11", "R19", "X19", "#", "Volume"
-    ]
+    EXPECTED_COLUMNS = OSCILLOMETRY_COLUMNS
     NUMERIC_COLUMNS = [col for col in EXPECTED_COLUMNS if col != "#"]
-    ILLEGAL_CHAR_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\u200b]")
+    # 非原始字符串：字符类里是字符本身而非转义，pyarrow 字符串列的 RE2 也能识别
+    ILLEGAL_CHAR_PATTERN = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\u200b]")
+
+    # 按开销从低到高排列，遇到第一个失败即停止
+    CHECKS = ["empty", "columns", "row_count", "nulls", "numeric", "illegal_chars"]
 
     def __init__(self, content: bytes, suffix: str):
         self.content = content
         self.suffix = suffix.lower()
         self.df = None
+        self.timings = {}
 
     def validate(self) -> dict:
+        """
+        读取并校验文件，返回 {"valid", "message"}。
+
+        各步骤耗时（秒）记录在 self.timings 中，包括读取 "read"；
+        失败时只包含失败前已运行的检查。
+        """
+        timings = {}
         try:
+            start = time.perf_counter()
             self.df = self._read_dataframe()
+            timings["read"] = time.perf_counter() - start
+            self.timings = timings
             self._validate_dataframe()
             return {"valid": True, "message": f"Valid file. {len(self.df)} rows."}
         except Exception as e:
@@ -27,18 +41,23 @@ class DataFrameValidator:
         if self.suffix == ".xlsx":
             return pd.read_excel(io.BytesIO(self.content), engine="openpyxl")
         if self.suffix == ".csv":
-            try:
-                return pd.read_csv(io.BytesIO(self.content), delimiter="\t", encoding="utf-8")
-            except UnicodeDecodeError:
-                enc = chardet.detect(self.content[:4096])["encoding"] or "utf-8"
-                return pd.read_csv(io.BytesIO(self.content), delimiter="\t", encoding=enc)
+            # 编码只按文件开头检测一次；符合固定表头时按 float32/int32 直接解析
+            return CSVIngestEngine(index_col=None, schema_only=False).read(self.content)
         raise ValueError(f"Unsupported file type: {self.suffix}")
 
     def _validate_dataframe(self):
-        df = self.df
+        for name in self.CHECKS:
+            start = time.perf_counter()
+            try:
+                getattr(self, f"_check_{name}")(self.df)
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+    def _check_empty(self, df: pd.DataFrame):
         if df.empty:
             raise ValueError("File is empty")
 
+    def _check_columns(self, df: pd.DataFrame):
         cols = set(df.columns)
         expected = set(self.EXPECTED_COLUMNS)
         if missing := expected - cols:
@@ -48,18 +67,28 @@ class DataFrameValidator:
         if len(df.columns) != len(self.EXPECTED_COLUMNS):
             raise ValueError(f"Expected {len(self.EXPECTED_COLUMNS)} columns, got {len(df.columns)}")
 
-        if df.isnull().any().any():
-            raise ValueError(f"Nulls in columns: {', '.join(df.columns[df.isnull().any()])}")
+    def _check_row_count(self, df: pd.DataFrame):
+        if len(df) < 1000:
+            raise ValueError(f"Only {len(df)} rows; expected at least 1000.")
+
+    def _check_nulls(self, df: pd.DataFrame):
+        nulls = df.isna().any()
+        if nulls.any():
+            raise ValueError(f"Nulls in columns: {', '.join(df.columns[nulls])}")
 
+    def _check_numeric(self, df: pd.DataFrame):
+        # 已解析为数值类型的列无需再转换
         for col in self.NUMERIC_COLUMNS:
+            if pd.api.types.is_numeric_dtype(df[col].dtype):
+                continue
             if not pd.to_numeric(df[col], errors="coerce").notna().all():
                 raise ValueError(f"Non-numeric values in column '{col}'")
 
+    def _check_illegal_chars(self, df: pd.DataFrame):
+        # 只有文本列可能含非法字符，数值列跳过逐字符扫描
         for col in df.columns:
-            for i, val in enumerate(df[col]):
-                if self.ILLEGAL_CHAR_PATTERN.search(str(val)):
-                    raise ValueError(f"Illegal character in {col}[{i}]")
-
-        if len(df) < 1000:
-            raise ValueError(f"Only {len(df)} rows; expected at least 1000.")
-
+            if pd.api.types.is_numeric_dtype(df[col].dtype):
+                continue
+            found = df[col].astype(str).str.contains(self.ILLEGAL_CHAR_PATTERN.pattern, regex=True).to_numpy()
+            if found.any():
+                raise ValueError(f"Illegal character in {col}[{found.argmax()}]")
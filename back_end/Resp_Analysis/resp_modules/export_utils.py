@@ -43,9 +43,21 @@ class ExportUtils:
             parts.append(df.iloc[prev:])
         return parts
 
+    @staticmethod
+    def _insert_separators(df: pd.DataFrame, key: str) -> pd.DataFrame:
+        """在 key 列取值变化处插入全空行（长表中每组之间的空白分隔行）"""
+        if len(df) < 2:
+            return df.reset_index(drop=True)
+        values = df[key].to_numpy()
+        starts = np.flatnonzero(values[1:] != values[:-1]) + 1
+        # 第 i 行前面有多少个分隔行，它就向后移动多少位
+        positions = np.arange(len(df)) + np.searchsorted(starts, np.arange(len(df)), side="right")
+        return df.set_axis(positions).reindex(np.arange(len(df) + len(starts)))
+
     @staticmethod
     def _build_table(df: pd.DataFrame, page_width: int) -> Table:
-        data = [df.columns.tolist()] + df.fillna("").values.tolist()
+        cells = df.astype(object).where(df.notna(), "")
+        data = [df.columns.tolist()] + cells.values.tolist()
         ncols = len(data[0])
         col_width = min(page_width / ncols, 100)
         table = Table(data, colWidths=[col_width] * ncols)
@@ -92,7 +104,8 @@ class ExportUtils:
         df: pd.DataFrame,
         index: bool = False,
         sheet_name: str = "Data",
-        freeze_header: bool = True
+        freeze_header: bool = True,
+        separate_by: Optional[str] = None
     ) -> BytesIO:
         """
         Convert DataFrame to Excel bytes with optional frozen header row.
@@ -102,6 +115,7 @@ class ExportUtils:
             index: Whether to include index
             sheet_name: Name of the worksheet
             freeze_header: Whether to freeze the first row (header)
+            separate_by: Column whose value changes get a blank row in between
             
         Returns:
             BytesIO: Excel file as bytes buffer
@@ -115,12 +129,17 @@ class ExportUtils:
             worksheet = workbook.active
             worksheet.title = sheet_name
             
+            if separate_by:
+                df = ExportUtils._insert_separators(df, separate_by)
+
             # Convert DataFrame to rows
             rows = dataframe_to_rows(df, index=index, header=True)
             
-            # Write data to worksheet
+            # Write data to worksheet, missing values as empty cells
             for r_idx, row in enumerate(rows, 1):
                 for c_idx, value in enumerate(row, 1):
+                    if value is not None and not isinstance(value, str) and pd.isna(value):
+                        value = None
                     worksheet.cell(row=r_idx, column=c_idx, value=value)
             
             # Freeze the header row if requested
@@ -178,7 +197,8 @@ class ExportUtils:
         df: pd.DataFrame,
         image_bytes: Optional[BytesIO],
         columns: Optional[List[str]] = None,
-        page_size=landscape(A4)
+        page_size=landscape(A4),
+        separate_by: Optional[str] = None
     ) -> BytesIO:
         buf = BytesIO()
         doc = SimpleDocTemplate(buf, pagesize=page_size)
@@ -201,6 +221,8 @@ class ExportUtils:
             parts = ExportUtils._split_dataframe(df)
             page_width, _ = page_size
             for i, part in enumerate(parts):
+                if separate_by:
+                    part = ExportUtils._insert_separators(part, separate_by)
                 elements.append(ExportUtils._build_table(part, page_width))
                 elements.append(Spacer(1, 30))
                 if i + 1 < len(parts):
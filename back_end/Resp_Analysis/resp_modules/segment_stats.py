@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Optional, Sequence, Tuple, Union
+
+
+class SegmentStatistics:
+    """
+    Mean, min and max of many signal segments, for several signals at once.
+
+    Segments are inclusive [start, end] sample ranges, as used for breath phases.
+    Means come from prefix sums, so each segment costs O(1) whatever its length.
+    Min/max use one np.minimum/np.maximum.reduceat pass per signal. A segment
+    containing NaN gives NaN, as np.mean/np.min/np.max would.
+    """
+
+    def __init__(self, signals: Union[np.ndarray, Sequence[np.ndarray]]):
+        """
+        Args:
+            signals: One 1-D signal, or several equal-length signals as a sequence or
+                an (n_signals, n_samples) array
+        """
+        if isinstance(signals, np.ndarray) and signals.ndim == 1:
+            signals = [signals]
+        rows = [np.asarray(signal) for signal in signals]
+        self.n_signals, self.n_samples = len(rows), len(rows[0])
+        if any(row.shape != (self.n_samples,) for row in rows):
+            raise ValueError("Signals must be 1-D and of equal length")
+        # One contiguous row per signal keeps every scan below unstrided. The extra
+        # trailing sample lets reduceat address the end of a segment on the last sample.
+        self._padded = np.empty((self.n_signals, self.n_samples + 1), dtype=np.result_type(*rows))
+        for padded, row in zip(self._padded, rows):
+            padded[:-1] = row
+            padded[-1:] = row[-1:]
+        self.signals = self._padded[:, :-1]
+
+        sums = self.signals.sum(axis=1, dtype=np.float64)
+        counts = np.full(self.n_signals, self.n_samples)
+        nan = None
+        if not np.isfinite(sums).all():
+            nan = np.isnan(self.signals)
+            if nan.any():
+                counts = counts - nan.sum(axis=1)
+                sums = np.where(nan, 0.0, self.signals).sum(axis=1)
+            else:
+                nan = None
+        # Centering keeps the prefix sums small, so long recordings lose no precision
+        self._offset = np.divide(sums, counts, out=np.zeros(self.n_signals), where=counts > 0)
+        self._prefix = np.zeros((self.n_signals, self.n_samples + 1))
+        centered = self._prefix[:, 1:]
+        np.subtract(self.signals, self._offset[:, None], out=centered)
+        if nan is not None:
+            centered[nan] = 0.0
+        np.cumsum(centered, axis=1, out=centered)
+        self._nan_prefix: Optional[np.ndarray] = None
+        if nan is not None:
+            self._nan_prefix = np.zeros((self.n_signals, self.n_samples + 1), dtype=np.int64)
+            np.cumsum(nan, axis=1, out=self._nan_prefix[:, 1:])
+
+    def _check(self, start, end) -> Tuple[np.ndarray, np.ndarray]:
+        start = np.asarray(start, dtype=np.intp)
+        end = np.asarray(end, dtype=np.intp)
+        if start.shape != end.shape:
+            raise ValueError("start and end must have the same length")
+        if start.size and (start.min() < 0 or end.max() >= self.n_samples):
+            raise IndexError(f"Segment out of bounds for {self.n_samples} samples")
+        if np.any(start > end):
+            raise ValueError("Segment end before its start")
+        return start, end
+
+    def mean(self, start, end) -> np.ndarray:
+        """
+        Mean of every [start, end] segment
+
+        Returns:
+            (n_segments, n_signals) array
+        """
+        start, end = self._check(start, end)
+        total = self._prefix[:, end + 1] - self._prefix[:, start]
+        means = (total / (end - start + 1) + self._offset[:, None]).T
+        if self._nan_prefix is not None:
+            has_nan = (self._nan_prefix[:, end + 1] - self._nan_prefix[:, start] > 0).T
+            means[has_nan] = np.nan
+        return means
+
+    def min_max(self, start, end) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Min and max of every [start, end] segment
+
+        Returns:
+            Tuple of (min, max), each (n_segments, n_signals) in the signals' dtype
+        """
+        start, end = self._check(start, end)
+        minimum = np.empty((len(start), self.n_signals), dtype=self.signals.dtype)
+        maximum = np.empty_like(minimum)
+        if not start.size:
+            return minimum, maximum
+        # reduceat reduces [indices[i], indices[i + 1]); interleaving start and end + 1
+        # puts each segment at the even positions
+        indices = np.column_stack([start, end + 1]).ravel()
+        for row, padded in enumerate(self._padded):
+            minimum[:, row] = np.minimum.reduceat(padded, indices)[::2]
+            maximum[:, row] = np.maximum.reduceat(padded, indices)[::2]
+        return minimum, maximum
@@ -47,7 +47,8 @@ def test_output_column_values(minimal_valid_df):
     assert insp_row["EXPIRATION_END"] == 30
 
     exp_row = df_out[df_out["SEGMENT"] == "EXP"].iloc[0]
-    assert exp_row["INSP_VOLUME"] == ""
+    assert pd.isna(exp_row["INSP_VOLUME"])
+    assert pd.isna(exp_row["INSPIRATION_START"])
 
 
 @pytest.mark.parametrize("missing_col", [
@@ -66,7 +67,7 @@ def test_missing_metric_columns_filled_with_empty(minimal_valid_df):
     df = minimal_valid_df.drop(columns=["R5_MAX"])
     result = BreathFeatureReshaper(df)
     max_row = result[result["SEGMENT"] == "MAX"].iloc[0]
-    assert max_row["R5"] == ""
+    assert np.isnan(max_row["R5"])
 
 
 def test_empty_dataframe_returns_empty():
@@ -92,6 +93,25 @@ def test_multiple_rows(minimal_valid_df):
     assert len(df_out) == 14  # 2 rows * 7 segments
     assert set(df_out["BREATH_INDEX"]) == {1}
 
+
+def test_no_separator_rows_between_breaths(minimal_valid_df):
+    df = pd.concat([minimal_valid_df] * 3, ignore_index=True)
+    df["breath_index"] = [1, 2, 3]
+    df_out = BreathFeatureReshaper(df)
+    # 长表不含空白行，每个呼吸连续 7 行
+    assert df_out["BREATH_INDEX"].tolist() == [1] * 7 + [2] * 7 + [3] * 7
+    assert df_out["SEGMENT"].tolist()[7:14] == ["INSP", "EXP", "INSP-EXP", "TOTAL", "MAX", "MIN", "MAX-MIN"]
+    assert df_out.loc[df_out["SEGMENT"] == "MAX-MIN", "R5"].tolist() == [5, 5, 5]
+
+
+def test_output_columns_are_typed(minimal_valid_df):
+    df_out = BreathFeatureReshaper(minimal_valid_df)
+    assert df_out["R5-19"].dtype == np.float64
+    assert df_out["INSP_VOLUME"].dtype == np.float64
+    assert df_out["INSPIRATION_START"].dtype == "Int64"
+    assert df_out["INSPIRATION_START"].isna().sum() == 6
+
+
 def test_required_column_type_flexibility(minimal_valid_df):
     df = minimal_valid_df.copy()
     # 将数字字段转为字符串类型
@@ -115,7 +135,7 @@ def test_missing_all_metrics_still_returns_valid(minimal_valid_df):
     ]]
     df_out = BreathFeatureReshaper(df)
     assert df_out.shape[0] == 7  # 7 segments
-    assert df_out["R5"].eq("").all()  # 所有指标字段为空
+    assert df_out["R5"].isna().all()  # 所有指标字段为空
 
 
 def test_non_string_column_names():
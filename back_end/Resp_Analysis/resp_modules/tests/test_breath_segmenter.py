@@ -1,7 +1,9 @@
 import pytest
 import numpy as np
 import pandas as pd
+from importlib.metadata import version
 from unittest.mock import patch, MagicMock
+import breath_segmenter
 from breath_segmenter import BreathSegmenter  # 替换为你的模块名
 
 
@@ -74,6 +76,27 @@ def test_nearest_zero_logic(mock_physio):
     assert idx in (1, 2)  # 应该在过零点附近
 
 
+def loop_nearest_zero(signal, idx, window=20):
+    """逐点扫描的参考实现"""
+    for i in range(max(idx - window, 1), min(idx + window, len(signal) - 1)):
+        if signal[i - 1] * signal[i] < 0:
+            return i if abs(signal[i]) < abs(signal[i - 1]) else i - 1
+    return idx
+
+
+def test_snap_to_zero_matches_loop():
+    rng = np.random.default_rng(0)
+    signal = np.sin(np.linspace(0, 60, 5000)) + rng.normal(0, 0.05, 5000)
+    signal[1000:1100] = 0.0  # 零值不算过零
+    indices = np.concatenate([rng.integers(-30, 5030, 2000), [0, 1, 4999, 5000, 1050]])
+    seg = BreathSegmenter()
+    snapped = seg._snap_to_zero(signal, seg._zero_crossings(signal), indices)
+    expected = [loop_nearest_zero(signal, int(i)) for i in indices]
+    np.testing.assert_array_equal(snapped, expected)
+    assert seg._nearest_zero(signal, 1050) == 1050
+    assert seg._nearest_zero(np.array([1.0]), 0) == 0
+
+
 @patch("breath_segmenter.physio")
 def test_segment_skip_invalid_row(mock_physio):
     """模拟返回 NaN 的周期，确保被跳过"""
@@ -96,3 +119,112 @@ def test_segment_skip_invalid_row(mock_physio):
     out = seg.segment(df)
     assert out.empty
 
+
+
+# ---------- 分块分段 ----------
+
+def build_long_input(seconds=600, fs=200, dtype=np.float64):
+    """频率、幅度缓慢变化并带噪声的呼吸流量信号"""
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * fs) / fs
+    freq = 0.25 + 0.05 * np.sin(2 * np.pi * t / 97)
+    flow = np.sin(2 * np.pi * np.cumsum(freq) / fs) * (1 + 0.3 * np.sin(t / 13)) + rng.normal(0, 0.1, len(t))
+    flow[1000:1010] = np.nan
+    return pd.DataFrame({"Flow_Filtered": flow.astype(dtype)})
+
+
+# segment() 的周期清洗按 pyproject 锁定的 physio 版本调用
+pinned_physio = pytest.mark.skipif(version("physio") != "0.2.0", reason="segment() targets physio 0.2.0")
+
+
+def read_in_pieces(df, rows):
+    """按固定行数切片，模拟逐块读取文件"""
+    return (df.iloc[start:start + rows] for start in range(0, len(df), rows))
+
+
+@pinned_physio
+@pytest.mark.parametrize("dtype, rtol", [(np.float64, 1e-9), (np.float32, 1e-5)])
+@pytest.mark.parametrize("rows", [997, 20000, 10 ** 6])
+def test_segment_stream_single_window_matches_segment(dtype, rtol, rows):
+    df = build_long_input(dtype=dtype)
+    seg = BreathSegmenter()
+    expected = seg.segment(df)
+    pieces = list(seg.segment_stream(read_in_pieces(df, rows), chunk_seconds=600))
+    assert len(expected) > 100
+    # 整数边界逐样本一致；浮点特征只差 FFT 平滑的舍入
+    pd.testing.assert_frame_equal(pd.concat(pieces, ignore_index=True), expected, check_exact=False, rtol=rtol)
+
+
+@pinned_physio
+def test_segment_stream_does_not_depend_on_read_size():
+    df = build_long_input()
+    seg = BreathSegmenter()
+    # 多窗口时阈值与清洗按窗口进行，但与读取块的大小无关
+    tables = [pd.concat(seg.segment_stream(read_in_pieces(df, rows), 61.3), ignore_index=True)
+              for rows in (333, 5000, 120000)]
+    assert len(tables[0]) > 100
+    for table in tables[1:]:
+        pd.testing.assert_frame_equal(table, tables[0])
+    pd.testing.assert_frame_equal(pd.concat(seg.segment_chunks(df, 61.3), ignore_index=True), tables[0])
+
+
+@pinned_physio
+def test_segment_stream_yields_each_window_before_reading_on():
+    df = build_long_input()
+    seen = []
+
+    def reading(chunks):
+        for chunk in chunks:
+            seen.append(chunk.index[-1] + 1)
+            yield chunk
+
+    stream = BreathSegmenter().segment_stream(reading(read_in_pieces(df, 1000)), 30)
+    first = next(stream)
+    # 第一个窗口（6000 个样本）的呼吸在读完整个记录之前产出
+    assert first["expiration_end"].iloc[-1] < 6000 + 200 * 10
+    assert seen[-1] < len(df) / 2
+
+
+@pinned_physio
+def test_segment_chunks_yields_consecutive_pieces():
+    df = build_long_input()
+    pieces = list(BreathSegmenter().segment_chunks(df, 30))
+    assert len(pieces) > 10
+    for prev, piece in zip(pieces, pieces[1:]):
+        assert piece["inspiration_start"].iloc[0] == prev["expiration_end"].iloc[-1] + 1
+        assert piece.index[0] == 0
+
+
+def build_double_inspiration_resp(seconds=60, fs=200):
+    """每隔一个周期，吸气谷中段回升到吸气阈值之上（仍低于基线），一个周期内两次穿越吸气阈值"""
+    t = np.arange(seconds * fs) / fs
+    resp = np.sin(2 * np.pi * 0.25 * t)
+    trough_centers = np.arange(3, seconds, 8.0)
+    for center in trough_centers:
+        resp *= 1 - 0.98 * np.exp(-0.5 * ((t - center) / 0.2) ** 2)
+    return resp
+
+
+@pinned_physio
+@pytest.mark.parametrize("rows", [7, 250, 100000])
+def test_segment_stream_matches_segment_double_inspiration(rows):
+    # segment() 分析的是 -flow
+    df = pd.DataFrame({"Flow_Filtered": -build_double_inspiration_resp()})
+    seg = BreathSegmenter()
+    expected = seg.segment(df)
+    pieces = list(seg.segment_stream(read_in_pieces(df, rows), chunk_seconds=600))
+    assert len(expected) > 5
+    pd.testing.assert_frame_equal(pd.concat(pieces, ignore_index=True), expected, check_exact=False, rtol=1e-9)
+
+
+def test_segment_chunks_missing_flow_column():
+    assert list(BreathSegmenter().segment_chunks(pd.DataFrame({"Other": [1, 2, 3]}))) == []
+
+
+def test_segment_stream_read_errors_propagate():
+    def failing():
+        yield build_long_input(seconds=10)
+        raise OSError("disk gone")
+
+    with pytest.raises(OSError):
+        list(BreathSegmenter().segment_stream(failing()))
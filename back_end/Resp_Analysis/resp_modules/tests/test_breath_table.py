@@ -0,0 +1,113 @@
+import pytest
+import numpy as np
+import pandas as pd
+from breath_segmenter import BreathSegmenter, build_breath_table, cycle_skip_masks
+
+FEATURE_SOURCES = [
+    "inspi_time", "expi_time", "next_inspi_time",
+    "inspi_duration", "expi_duration", "cycle_duration",
+    "inspi_volume", "expi_volume", "total_volume",
+    "inspi_amplitude", "expi_amplitude", "total_amplitude",
+]
+
+
+def iterrows_table(df, n_samples, fs):
+    """原来逐行构建呼吸表的参考实现"""
+    breaths = []
+    for _, row in df.iterrows():
+        if any(pd.isnull(row[col]) for col in ["inspi_index", "expi_index", "next_inspi_index"]):
+            continue
+        if int(row["next_inspi_index"]) >= n_samples:
+            continue
+        breaths.append({
+            "inspiration_start":      int(row["inspi_index"]),
+            "inspiration_end":        int(row["expi_index"]),
+            "expiration_start":       int(row["expi_index"]) + 1,
+            "expiration_end":         int(row["next_inspi_index"]),
+
+            "inspiration_start_time": float(row["inspi_time"]),
+            "inspiration_end_time":   float(row["expi_time"]),
+            "expiration_start_time":  float(row["expi_time"]),
+            "expiration_end_time":    float(row["next_inspi_time"]),
+
+            "inspiration_duration":   float(row["inspi_duration"]),
+            "expiration_duration":    float(row["expi_duration"]),
+            "total_duration":         float(row["cycle_duration"]),
+
+            "inspiration_volume":     float(row["inspi_volume"]),
+            "expiration_volume":      float(row["expi_volume"]),
+            "total_volume":           float(row["total_volume"]),
+
+            "inspiration_amplitude":  float(row["inspi_amplitude"]),
+            "expiration_amplitude":   float(row["expi_amplitude"]),
+            "total_amplitude":        float(row["total_amplitude"]),
+        })
+
+    for i in range(len(breaths) - 1):
+        breaths[i + 1]["inspiration_start"] = breaths[i]["expiration_end"] + 1
+        breaths[i + 1]["inspiration_start_time"] = breaths[i]["expiration_end_time"] + 1 / fs
+
+    return pd.DataFrame(breaths)
+
+
+def make_cycles(n, seed=0, n_samples=None, nan_fraction=0.0, float_indices=False):
+    """模拟 physio 的周期特征表"""
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.integers(600, 1000, n))
+    expi = starts + rng.integers(200, 500, n)
+    next_inspi = starts + rng.integers(600, 1000, n)
+    cycles = pd.DataFrame({
+        "inspi_index": starts, "expi_index": expi, "next_inspi_index": next_inspi,
+    })
+    if float_indices:
+        cycles = cycles + rng.uniform(0, 0.99, cycles.shape)
+    for col in FEATURE_SOURCES:
+        cycles[col] = rng.uniform(0, 10, n)
+    if nan_fraction:
+        for col in ["inspi_index", "expi_index", "next_inspi_index", "inspi_volume"]:
+            cycles.loc[rng.random(n) < nan_fraction, col] = np.nan
+    return cycles
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("nan_fraction", [0.0, 0.1, 0.5])
+def test_matches_iterrows(seed, nan_fraction):
+    cycles = make_cycles(300, seed=seed, nan_fraction=nan_fraction)
+    n_samples = int(cycles["next_inspi_index"].max() * 0.9)  # 末尾的周期越界
+    expected = iterrows_table(cycles, n_samples, 200)
+    pd.testing.assert_frame_equal(build_breath_table(cycles, n_samples, 200), expected)
+
+
+def test_float_indices_truncate_like_int():
+    cycles = make_cycles(50, float_indices=True)
+    n_samples = int(cycles["next_inspi_index"].iloc[-1])  # 截断后恰好越界
+    pd.testing.assert_frame_equal(
+        build_breath_table(cycles, n_samples, 250), iterrows_table(cycles, n_samples, 250)
+    )
+
+
+def test_single_and_no_usable_cycles():
+    cycles = make_cycles(3)
+    one = build_breath_table(cycles.iloc[:1], 10**9, 200)
+    pd.testing.assert_frame_equal(one, iterrows_table(cycles.iloc[:1], 10**9, 200))
+
+    cycles["expi_index"] = np.nan
+    empty = build_breath_table(cycles, 10**9, 200)
+    assert empty.empty and len(empty.columns) == 0
+    assert build_breath_table(make_cycles(0), 100, 200).empty
+
+
+def test_skip_masks():
+    cycles = make_cycles(4)
+    cycles.loc[1, "inspi_index"] = np.nan
+    n_samples = int(cycles.loc[2, "next_inspi_index"])
+    missing, out_of_range = cycle_skip_masks(cycles, n_samples)
+    assert missing.tolist() == [False, True, False, False]
+    assert out_of_range.tolist() == [False, False, True, True]
+
+
+def test_segmenter_uses_table(monkeypatch):
+    cycles = make_cycles(20, nan_fraction=0.1)
+    seg = BreathSegmenter(fs=100)
+    resp = np.zeros(int(cycles["next_inspi_index"].max()))
+    pd.testing.assert_frame_equal(seg._build_table(cycles, resp), iterrows_table(cycles, len(resp), 100))
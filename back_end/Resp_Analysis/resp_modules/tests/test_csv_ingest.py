@@ -0,0 +1,130 @@
+import io
+import pytest
+import numpy as np
+import pandas as pd
+from csv_ingest import CSVIngestEngine, OSCILLOMETRY_COLUMNS
+
+
+# ---------- 工具函数 ----------
+
+def make_df(n=50):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({col: rng.normal(size=n).round(4) for col in OSCILLOMETRY_COLUMNS if col != "#"})
+    df.insert(7, "#", np.arange(n))
+    return df
+
+
+def to_bytes(df, encoding="utf-8"):
+    return df.to_csv(sep="\t", index=False).encode(encoding)
+
+
+# ---------- 固定表头：按类型解析 ----------
+
+def test_schema_columns_read_typed():
+    df = make_df()
+    engine = CSVIngestEngine(engine="c")
+    out = engine.read(to_bytes(df))
+    assert out.index.name == "#"
+    assert out.index.dtype == np.int32
+    assert (out.dtypes == np.float32).all()
+    np.testing.assert_allclose(out["R5"], df["R5"], rtol=1e-6)
+    assert engine.last_stats.typed
+    assert engine.last_stats.rows == len(df)
+    assert engine.last_stats.rows_per_second > 0
+
+
+def test_extra_columns_dropped_unless_requested():
+    df = make_df()
+    df["Extra"] = "x"
+    assert "Extra" not in CSVIngestEngine(engine="c").read(to_bytes(df)).columns
+    out = CSVIngestEngine(engine="c", index_col=None, schema_only=False).read(to_bytes(df))
+    assert "Extra" in out.columns
+    assert out["R5"].dtype == np.float32
+
+
+def test_usecols_subset():
+    out = CSVIngestEngine(engine="c").read(to_bytes(make_df()), usecols=["R5", "X5"])
+    assert list(out.columns) == ["R5", "X5"]
+    assert out.index.name == "#"
+
+
+def test_header_whitespace_tolerated():
+    df = make_df().rename(columns={"R5": " R5 "})
+    engine = CSVIngestEngine(engine="c")
+    out = engine.read(to_bytes(df))
+    assert engine.last_stats.typed
+    assert out[" R5 "].dtype == np.float32
+
+
+# ---------- 不符合表头或无法解析：回退为推断类型 ----------
+
+def test_off_schema_falls_back_to_inferred():
+    df = pd.DataFrame({"#": [0, 1], "A": [1, 2]})
+    engine = CSVIngestEngine(engine="c")
+    out = engine.read(to_bytes(df))
+    assert not engine.last_stats.typed
+    assert out["A"].dtype == np.int64
+
+
+def test_non_numeric_value_falls_back():
+    df = make_df().astype({"R5": object})
+    df.loc[3, "R5"] = "bad"
+    engine = CSVIngestEngine(engine="c")
+    out = engine.read(to_bytes(df))
+    assert not engine.last_stats.typed
+    assert out["R5"].iloc[3] == "bad"
+
+
+# ---------- 编码检测 ----------
+
+@pytest.mark.parametrize("prefix, expected", [
+    (b"R5\tX5\n1\t2\n", "utf-8"),
+    (b"\xef\xbb\xbfR5\tX5\n", "utf-8-sig"),
+    ("编号\t值".encode("utf-8")[:-1], "utf-8"),  # 末尾多字节字符被截断
+])
+def test_detect_encoding(prefix, expected):
+    assert CSVIngestEngine.detect_encoding(prefix) == expected
+
+
+def test_detects_non_utf8_from_bounded_prefix():
+    df = make_df()
+    df["备注"] = "呼吸数据记录"
+    engine = CSVIngestEngine(engine="c", index_col=None, schema_only=False, sniff_bytes=512)
+    out = engine.read(to_bytes(df, encoding="gbk"))
+    assert engine.last_stats.encoding.lower() not in ("utf-8", "ascii")
+    assert out["备注"].iloc[0] == "呼吸数据记录"
+
+
+def test_explicit_encoding_is_not_overridden():
+    content = "编号\t值\n一\t一百".encode("gbk")
+    with pytest.raises(UnicodeDecodeError):
+        CSVIngestEngine(engine="c", index_col=None, encoding="utf-8").read(content)
+
+
+# ---------- 按块读取 ----------
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 1000])
+def test_iter_read_matches_read(chunk_rows):
+    data = to_bytes(make_df())
+    engine = CSVIngestEngine(engine="c")
+    expected = engine.read(data)
+    chunks = list(engine.iter_read(io.BytesIO(data), chunk_rows))
+    assert all(len(chunk) <= chunk_rows for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    assert engine.last_stats.rows == len(expected)
+    assert engine.last_stats.typed
+
+
+def test_iter_read_off_schema_infers_dtypes():
+    df = pd.DataFrame({"#": [0, 1, 2], "A": [1, 2, 3]})
+    engine = CSVIngestEngine(engine="c")
+    out = pd.concat(engine.iter_read(io.BytesIO(to_bytes(df)), 2))
+    assert list(out["A"]) == [1, 2, 3]
+    assert not engine.last_stats.typed
+
+
+def test_iter_read_non_numeric_value_raises():
+    df = make_df().astype({"R5": object})
+    df.loc[3, "R5"] = "bad"
+    with pytest.raises(ValueError):
+        list(CSVIngestEngine(engine="c").iter_read(io.BytesIO(to_bytes(df))))
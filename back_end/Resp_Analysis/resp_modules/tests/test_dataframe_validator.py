@@ -136,3 +136,32 @@ def test_unsupported_suffix():
     assert not result["valid"]
     assert "Unsupported file type" in result["message"]
 
+
+
+# ---------- 检查顺序与耗时 ----------
+
+def test_timings_reported_for_every_check():
+    validator = DataFrameValidator(to_csv_bytes(make_valid_df()), ".csv")
+    assert validator.validate()["valid"]
+    assert list(validator.timings) == ["read", *DataFrameValidator.CHECKS]
+    assert all(t >= 0 for t in validator.timings.values())
+
+
+def test_stops_at_first_failed_check():
+    df = make_valid_df(n=500)
+    df.loc[0, "R5"] = None
+    validator = DataFrameValidator(to_csv_bytes(df), ".csv")
+    result = validator.validate()
+    # 行数检查更便宜，先于空值检查失败
+    assert "expected at least 1000" in result["message"]
+    assert "row_count" in validator.timings
+    assert "nulls" not in validator.timings
+    assert "illegal_chars" not in validator.timings
+
+
+def test_illegal_character_position():
+    df = make_valid_df()
+    df["#"] = df["#"].astype(str)
+    df.loc[7, "#"] = "7\u200b"  # 零宽空格
+    result = DataFrameValidator(to_csv_bytes(df), ".csv").validate()
+    assert result["message"] == "Illegal character in #[7]"
@@ -148,6 +148,27 @@ def test_split_dataframe_with_blank_rows():
     assert all(isinstance(p, pd.DataFrame) for p in parts)
 
 
+def test_insert_separators_between_groups():
+    df = pd.DataFrame({
+        "BREATH_INDEX": [1, 1, 2, 2, 2, 3],
+        "V": pd.array([1, None, 3, 4, 5, 6], dtype="Int64")
+    })
+    out = ExportUtils._insert_separators(df, "BREATH_INDEX")
+    assert len(out) == 8
+    blank = out.isna().all(axis=1)
+    assert blank.tolist() == [False, False, True, False, False, False, True, False]
+    assert out.loc[~blank, "BREATH_INDEX"].tolist() == df["BREATH_INDEX"].tolist()
+
+
+def test_excel_separate_by_writes_blank_rows():
+    import openpyxl
+    df = pd.DataFrame({"BREATH_INDEX": [1, 1, 2], "V": [0.5, np.nan, 1.5]})
+    buf = ExportUtils.dataframe_to_excel_bytes(df, separate_by="BREATH_INDEX")
+    ws = openpyxl.load_workbook(buf).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows == [("BREATH_INDEX", "V"), (1, 0.5), (1, None), (None, None), (2, 1.5)]
+
+
 def test_process_image_scaling(image_bytes):
     img = ExportUtils._process_image(image_bytes, page_size=(400, 300))
     assert isinstance(img, Image)
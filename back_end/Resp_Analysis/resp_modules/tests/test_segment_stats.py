@@ -0,0 +1,92 @@
+import pytest
+import numpy as np
+from segment_stats import SegmentStatistics
+
+
+def brute_force(signals, start, end):
+    """Per-segment np.mean/np.min/np.max, as the extractor used to compute them"""
+    segments = [signals[:, s:e + 1] for s, e in zip(start, end)]
+    return (np.array([np.mean(seg, axis=1) for seg in segments]),
+            np.array([np.min(seg, axis=1) for seg in segments]),
+            np.array([np.max(seg, axis=1) for seg in segments]))
+
+
+@pytest.fixture
+def random_segments():
+    rng = np.random.default_rng(0)
+    signals = rng.normal(5, 2, (4, 5000))
+    start = rng.integers(0, 4900, 300)
+    end = start + rng.integers(0, 100, 300)
+    return signals, start, end
+
+
+def test_matches_brute_force(random_segments):
+    signals, start, end = random_segments
+    stats = SegmentStatistics(signals)
+    mean, minimum, maximum = brute_force(signals, start, end)
+    np.testing.assert_allclose(stats.mean(start, end), mean, rtol=1e-12)
+    minv, maxv = stats.min_max(start, end)
+    np.testing.assert_array_equal(minv, minimum)
+    np.testing.assert_array_equal(maxv, maximum)
+
+
+def test_single_sample_and_last_sample_segments():
+    signal = np.array([3.0, 1.0, 4.0, 1.0, 5.0])
+    stats = SegmentStatistics(signal)
+    start, end = np.array([0, 2, 4, 0]), np.array([0, 4, 4, 4])
+    np.testing.assert_allclose(stats.mean(start, end)[:, 0], [3.0, 10 / 3, 5.0, 2.8])
+    minv, maxv = stats.min_max(start, end)
+    np.testing.assert_array_equal(minv[:, 0], [3.0, 1.0, 5.0, 1.0])
+    np.testing.assert_array_equal(maxv[:, 0], [3.0, 5.0, 5.0, 5.0])
+
+
+def test_list_of_signals():
+    a, b = np.arange(10.0), np.arange(10.0) ** 2
+    stats = SegmentStatistics([a, b])
+    np.testing.assert_allclose(stats.mean([1], [3]), [[2.0, 14 / 3]])
+    minv, maxv = stats.min_max([1], [3])
+    np.testing.assert_array_equal(minv, [[1.0, 1.0]])
+    np.testing.assert_array_equal(maxv, [[3.0, 9.0]])
+
+
+def test_nan_only_affects_segments_containing_it():
+    signal = np.arange(10, dtype=float)
+    signal[3] = np.nan
+    stats = SegmentStatistics(signal)
+    start, end = np.array([0, 4, 2]), np.array([2, 9, 5])
+    mean = stats.mean(start, end)[:, 0]
+    minv, maxv = stats.min_max(start, end)
+    assert mean[0] == pytest.approx(1.0) and mean[1] == pytest.approx(6.5)
+    assert np.isnan(mean[2]) and np.isnan(minv[2, 0]) and np.isnan(maxv[2, 0])
+
+
+def test_integer_signals_keep_dtype_for_min_max():
+    stats = SegmentStatistics(np.arange(20))
+    minv, maxv = stats.min_max([2], [9])
+    assert minv.dtype == np.arange(1).dtype
+    assert (minv[0, 0], maxv[0, 0]) == (2, 9)
+    assert stats.mean([2], [9])[0, 0] == pytest.approx(5.5)
+
+
+def test_long_recording_precision():
+    # Three hours at 200 Hz with a large offset
+    rng = np.random.default_rng(1)
+    signal = 1000 + rng.normal(0, 1, 3 * 3600 * 200)
+    stats = SegmentStatistics(signal)
+    start = np.array([0, len(signal) - 800])
+    end = start + 799
+    expected = [signal[s:e + 1].mean() for s, e in zip(start, end)]
+    np.testing.assert_allclose(stats.mean(start, end)[:, 0], expected, rtol=1e-13)
+
+
+def test_invalid_segments():
+    stats = SegmentStatistics(np.zeros(10))
+    with pytest.raises(IndexError):
+        stats.mean([0], [10])
+    with pytest.raises(IndexError):
+        stats.min_max([-1], [3])
+    with pytest.raises(ValueError):
+        stats.mean([5], [4])
+    minv, maxv = stats.min_max([], [])
+    assert minv.shape == maxv.shape == (0, 1)
+    assert stats.mean([], []).shape == (0, 1)
@@ -0,0 +1,56 @@
+from dataclasses import asdict
+from typing import List
+from fastapi import APIRouter
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from fast_json import ORJSONResponse
+from batch_processing import SUMMARY_FILENAME, batch_job_manager
+
+router = APIRouter()
+
+
+class BatchRequest(BaseModel):
+    paths: List[str]  # Recording files or directories under the server's recordings directory
+    n_jobs: int = -1  # Worker processes, -1: one per CPU
+
+
+@router.post("/batch/")
+def submit_batch(request: BatchRequest):
+    """
+    Process a cohort of recordings in the background
+
+    Poll /batch/{job_id} for per-file timings and failures, then download the cohort
+    summary from /batch/{job_id}/summary. Results are written under the server's batch
+    output folder.
+    """
+    try:
+        job_id = batch_job_manager.submit(request.paths, request.n_jobs)
+    except PermissionError as e:
+        return ORJSONResponse(status_code=403, content={"error": str(e)})
+    except FileNotFoundError as e:
+        return ORJSONResponse(status_code=404, content={"error": str(e)})
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+    return batch_job_manager.get(job_id).summary()
+
+
+@router.get("/batch/{job_id}")
+def get_batch(job_id: str):
+    """Batch status plus the result of every finished recording, in completion order"""
+    try:
+        job = batch_job_manager.get(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Batch job not found"})
+    return ORJSONResponse(content={**job.summary(), "results": [asdict(r) for r in list(job.results)]})
+
+
+@router.get("/batch/{job_id}/summary")
+def download_batch_summary(job_id: str):
+    """Cohort summary CSV, one row per recording"""
+    try:
+        job = batch_job_manager.get(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Batch job not found"})
+    if job.status != "completed":
+        return ORJSONResponse(status_code=409, content={"error": f"Batch is {job.status}"})
+    return FileResponse(job.summary_path, media_type="text/csv", filename=SUMMARY_FILENAME)
@@ -1,30 +1,37 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
-import pandas as pd
-import json
-import tempfile, shutil, os
-from Resp_Analysis.main_proc import process_file, generate_report_files
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from Resp_Analysis.main_proc import generate_report_files
+from upload_cache import upload_cache
 
 router = APIRouter()
-last_processed_result: tuple[str, pd.DataFrame, pd.DataFrame, pd.DataFrame] | None = None
 
 @router.get("/export-zip/")
-async def export_zip():
-    global last_processed_result
+async def export_zip(upload_id: Optional[str] = Query(None, description="upload_id from /upload-download/; defaults to the latest processed upload")):
+    if upload_id:
+        try:
+            entry = upload_cache.get(upload_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Upload not found. Please upload the file again.")
+    else:
+        entry = upload_cache.latest(processed=True)
 
-    if not last_processed_result:
+    if entry is None:
         raise HTTPException(status_code=400, detail="No processed result available.")
 
-    basename, vis_df, df = last_processed_result
-
     try:
-        zip_buf = generate_report_files(df, vis_df)
+        with entry:
+            if entry.processed is None:
+                raise HTTPException(status_code=400, detail="No processed result available.")
+            vis_df, _ = entry.processed
+            zip_buf = generate_report_files(entry.dataframe(), vis_df)
 
         return StreamingResponse(
             zip_buf,
             media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={basename}_report.zip"}
+            headers={"Content-Disposition": f"attachment; filename={entry.name}_report.zip"}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {e}")
-
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, UploadFile, File
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from fast_json import ORJSONResponse
 
 import json
 import pandas as pd
 import io
 import os
 from Resp_Analysis.resp_modules.export_utils import ExportUtils
-from Resp_Analysis.resp_modules.dataframe_loader import DataFrameLoader
+from upload_cache import upload_cache
 
 router = APIRouter()
 
@@ -15,22 +17,28 @@ async def plot_csv(file: UploadFile = File(...)):
     try:
         contents = await file.read()
         
-        # Use DataFrameLoader for consistent file handling
-        loader = DataFrameLoader(index_col='#')
-        df = loader.load_bytes(contents, os.path.splitext(file.filename.lower())[1], file.filename)
+        # Parsed once per file content, shared with /upload-download/
+        entry = upload_cache.load(contents, file.filename)
+        try:
+            df = entry.dataframe()
+        except Exception:
+            entry.release()
+            raise
 
         required_cols = {"X5", "R5", "Volume"}
         if not required_cols.issubset(df.columns):
-            return JSONResponse(
+            entry.release()
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": f"Missing required columns: {required_cols - set(df.columns)}"}
             )
 
+        # The columns are read while streaming; hold the entry until the response is sent
         json_str = ExportUtils.dataframe_to_plot_json(df, columns=["X5", "R5", "Volume"])
-        return StreamingResponse(json_str, media_type="application/json")
+        return StreamingResponse(json_str, media_type="application/json", background=BackgroundTask(entry.release))
 
 
     except Exception as e:
         print(f"[ERROR] /plot-csv failed: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
 
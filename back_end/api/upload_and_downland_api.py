@@ -1,61 +1,29 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-import tempfile, shutil, os
+from fast_json import ORJSONResponse
 import pandas as pd
-from Resp_Analysis.main_proc import process_file
-from . import export_api
+from Resp_Analysis.main_proc import process_dataframe
+from upload_cache import upload_cache
 router = APIRouter()
 
-def clean_records(records: pd.DataFrame, key_fields: list[str]) -> list[dict]:
-    if not records:
-        return []
-
-    df = pd.DataFrame(records)
-
-    df = df.dropna(how="all")
-    df = df.loc[~df.apply(lambda row: all(str(v).strip() == "" for v in row), axis=1)]
-
-
-    header = list(df.columns)
-    is_header_like = df.apply(
-        lambda row: all(str(row[k]).strip().lower() == k.lower() for k in header),
-        axis=1
-    )
-    df = df[~is_header_like]
-
-    return df.to_dict(orient="records")
+def clean_records(vis_df: pd.DataFrame) -> list[dict]:
+    """长表转为 JSON 记录，缺失值为 None"""
+    return vis_df.astype(object).where(vis_df.notna(), None).to_dict(orient="records")
 
 
 @router.post("/upload-download/")
 async def upload_and_download(file: UploadFile = File(...)):
-    global last_processed_result
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded.")
 
-    temp_dir = tempfile.mkdtemp()
-    try:
-        file_path = os.path.join(temp_dir, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-
-        basename, vis_df, df, breaths = process_file(file_path)
-        export_api.last_processed_result = (basename, vis_df, df)
-        records = vis_df.to_dict(orient="records")
-
-        key_fields = [
-            "BREATH_INDEX", "SEGMENT", "R5-19", "R5", "R19", "X5",
-            "INSP_VOLUME", "EXP_VOLUME",
-            "INSPIRATION_START", "INSPIRATION_END",
-            "EXPIRATION_START", "EXPIRATION_END"
-        ]
-
-        cleaned_records = clean_records(records, key_fields)
-
-        return JSONResponse(content={
-            "filename": f"{basename}_result",
-            "items": cleaned_records
-        })
-
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-
+    # 同一文件只解析一次，/plot-csv 和 /export-zip 复用缓存
+    with upload_cache.load(await file.read(), file.filename) as entry:
+        if entry.processed is None:
+            _, vis_df, _, breaths = process_dataframe(entry.name, entry.dataframe())
+            entry.processed = (vis_df, breaths)
+    vis_df, _ = entry.processed
+
+    return ORJSONResponse(content={
+        "filename": f"{entry.name}_result",
+        "upload_id": entry.key,
+        "items": clean_records(vis_df)
+    })
@@ -0,0 +1,113 @@
+import numpy as np
+import logging
+from typing import Dict, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+
+class BaselineComparisonEngine:
+    """
+    Computes percent-of-baseline and percent-change-from-baseline values for every
+    measured frame in one vectorized pass.
+
+    Frame values are laid out as a (frames x keys) float matrix with NaN for missing
+    values, so each comparison against the baseline row is a single NumPy expression.
+    Results are cached per (baseline_frame_id, revision); the caller bumps the revision
+    whenever measurements or formulas change.
+    """
+
+    def __init__(self, measurement_keys: List[str], formula_keys: List[str]):
+        self.measurement_keys = list(measurement_keys)
+        self.formula_keys = list(formula_keys)
+        self.keys = self.measurement_keys + self.formula_keys
+        self._cache_revision = None
+        self._cache: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {}
+
+    def build_columns(self, frames: List[Dict]) -> np.ndarray:
+        """
+        Lay out the compared measurements and formulas of all frames as float columns
+
+        Returns:
+            np.ndarray: (n_frames, n_keys) array, NaN where a value is missing
+        """
+        columns = np.full((len(frames), len(self.keys)), np.nan, dtype=np.float64)
+        for col, key in enumerate(self.keys):
+            source = "measurements" if col < len(self.measurement_keys) else "formulas"
+            columns[:, col] = [to_float((frame.get(source) or {}).get(key)) for frame in frames]
+        return columns
+
+    def compare_columns(self, columns: np.ndarray, baseline_row: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compare every row of columns against the baseline row
+
+        Returns:
+            Tuple of (percent_of_baseline, percent_change_from_baseline, valid_mask)
+        """
+        baseline = columns[baseline_row]
+        valid = np.isfinite(columns) & np.isfinite(baseline) & (baseline != 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent_of = columns / baseline * 100
+            percent_change = (columns - baseline) / baseline * 100
+        return percent_of, percent_change, valid
+
+    def compare(self, frames: List[Dict], baseline_frame_id: str,
+                revision: int) -> Dict[str, Optional[Dict[str, Optional[Dict[str, float]]]]]:
+        """
+        Get baseline comparisons for all frames
+
+        Args:
+            frames: Measured frames from the session
+            baseline_frame_id: ID of the frame to compare against
+            revision: Session revision the frames belong to
+
+        Returns:
+            Dict mapping frame_id to {key: {"percentOfBaseline", "percentChangeFromBaseline"} or None}.
+            The baseline frame itself maps to None.
+        """
+        if revision != self._cache_revision:
+            self._cache = {}
+            self._cache_revision = revision
+        if baseline_frame_id in self._cache:
+            return self._cache[baseline_frame_id]
+
+        frame_ids = [frame["frame_id"] for frame in frames]
+        if baseline_frame_id not in frame_ids:
+            raise ValueError("Baseline frame not found")
+
+        columns = self.build_columns(frames)
+        baseline_row = frame_ids.index(baseline_frame_id)
+        percent_of, percent_change, valid = self.compare_columns(columns, baseline_row)
+
+        # Convert once to Python lists rather than indexing NumPy scalars per cell
+        percent_of, percent_change, valid = percent_of.tolist(), percent_change.tolist(), valid.tolist()
+        results = {}
+        for row, frame_id in enumerate(frame_ids):
+            if row == baseline_row:
+                results[frame_id] = None
+                continue
+            results[frame_id] = {
+                key: {
+                    "percentOfBaseline": percent_of[row][col],
+                    "percentChangeFromBaseline": percent_change[row][col]
+                } if valid[row][col] else None
+                for col, key in enumerate(self.keys)
+            }
+
+        self._cache[baseline_frame_id] = results
+        logger.info(f"Computed baseline comparisons for {len(frame_ids)} frames (revision {revision})")
+        return results
+
+    def invalidate(self):
+        """Drop all cached comparisons"""
+        self._cache = {}
+        self._cache_revision = None
+
+
+def to_float(value) -> float:
+    """Convert a stored measurement value to float, NaN if missing or non-numeric"""
+    if value is None or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -0,0 +1,365 @@
+"""
+Batch processing of recording directories
+
+Fans Resp_Analysis.main_proc.process_file out over a joblib process pool, writes each
+recording's breath table and long-format features to its own result directory, and
+a cohort summary table with one row per recording. A failing recording is reported
+in the summary and does not stop the batch.
+
+Command line, from back_end/:
+    python batch_processing.py RECORDINGS_DIR [MORE_DIRS_OR_FILES ...] -o OUTPUT_DIR [-j N_JOBS]
+"""
+import os
+import sys
+import time
+import uuid
+import shutil
+import logging
+import warnings
+import argparse
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from Resp_Analysis.main_proc import process_file
+from Resp_Analysis.resp_modules.breath_feature_reshaper import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Recording file types, as DataFrameLoader reads them
+RECORDING_SUFFIXES = (".csv", ".xlsx")
+
+SUMMARY_FILENAME = "cohort_summary.csv"
+
+# Set by warm_up in the process that ran it
+_warmed_up = False
+
+# Directory the batch API may read recordings from; unset, the API accepts no batches
+RECORDINGS_ROOT_ENV = "BATCH_RECORDINGS_ROOT"
+
+
+@dataclass
+class FileResult:
+    """Outcome of processing one recording"""
+    name: str
+    path: str
+    status: str  # completed, failed
+    seconds: float
+    worker: int  # PID of the process that ran it
+    samples: int = 0
+    breaths: int = 0
+    error: Optional[str] = None
+    output_dir: Optional[str] = None
+    warmed_up: bool = False  # whether warm_up had run in the worker
+    metrics: Dict[str, float] = field(default_factory=dict)  # per-recording means, see summarize_recording
+
+    def row(self) -> Dict[str, Any]:
+        """Cohort summary row"""
+        row = asdict(self)
+        metrics = row.pop("metrics")
+        return {**row, **metrics}
+
+
+@dataclass
+class BatchReport:
+    """Results of a batch, in input order"""
+    results: List[FileResult]
+    output_dir: str
+    seconds: float
+
+    @property
+    def failed(self) -> List[FileResult]:
+        return [r for r in self.results if r.status == "failed"]
+
+    def summary_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([r.row() for r in self.results])
+
+
+def list_recordings(paths: Iterable[Union[str, Path]]) -> Dict[str, Path]:
+    """
+    Recording files to process, keyed by a unique result name
+
+    Directories contribute their recording files (not recursively), sorted by name.
+    Names are file stems, numbered when two recordings share one.
+
+    Raises:
+        FileNotFoundError: A path does not exist
+    """
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(f for f in path.iterdir() if f.is_file() and f.suffix.lower() in RECORDING_SUFFIXES))
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"{path} is not a valid file or directory")
+
+    recordings = {}
+    for f in files:
+        name, n = f.stem, 1
+        while name in recordings:
+            n += 1
+            name = f"{f.stem}_{n}"
+        recordings[name] = f
+    return recordings
+
+
+def warm_up():
+    """Worker initializer: import the processing stack once, before the first recording"""
+    global _warmed_up
+    import physio  # noqa: F401
+    import scipy.signal  # noqa: F401
+    import matplotlib
+    matplotlib.use("Agg")
+    import Resp_Analysis.main_proc  # noqa: F401
+    _warmed_up = True
+
+
+def summarize_recording(vis_df: pd.DataFrame, breaths: pd.DataFrame) -> Dict[str, float]:
+    """Means over a recording's breaths of the impedance metrics, volumes and breath duration"""
+    metrics = {}
+    for segment in ("TOTAL", "INSP-EXP"):
+        rows = vis_df[vis_df["SEGMENT"] == segment]
+        metrics.update({f"{m}_{segment}_mean": float(rows[m].mean()) for m in METRICS})
+    for col in ("INSP_VOLUME", "EXP_VOLUME"):
+        metrics[f"{col}_mean"] = float(vis_df[col].mean())
+    duration = float(breaths["total_duration"].mean()) if "total_duration" in breaths else np.nan
+    metrics["total_duration_mean"] = duration
+    metrics["breaths_per_minute"] = 60 / duration if duration > 0 else np.nan
+    return metrics
+
+
+def process_recording(name: str, path: Union[str, Path], output_dir: Union[str, Path]) -> FileResult:
+    """
+    Process one recording and write its results to output_dir/name/
+
+    Never raises; a failure is returned as a FileResult with status "failed".
+    """
+    start = time.perf_counter()
+    try:
+        _, vis_df, samples, breaths = process_file(str(path))
+        out = Path(output_dir) / name
+        out.mkdir(parents=True, exist_ok=True)
+        breaths.to_csv(out / "breaths.csv", index=False)
+        vis_df.to_csv(out / "features.csv", index=False)
+        return FileResult(name, str(path), "completed", time.perf_counter() - start, os.getpid(),
+                          samples=samples, breaths=len(breaths), output_dir=str(out), warmed_up=_warmed_up,
+                          metrics=summarize_recording(vis_df, breaths))
+    except Exception as e:
+        logger.error(f"Batch: {name} failed: {e}")
+        return FileResult(name, str(path), "failed", time.perf_counter() - start, os.getpid(),
+                          error=f"{type(e).__name__}: {e}", warmed_up=_warmed_up)
+
+
+def run_batch(paths: Iterable[Union[str, Path]], output_dir: Union[str, Path], n_jobs: int = -1,
+              on_result: Optional[Callable[[FileResult], None]] = None,
+              cancel: Optional[threading.Event] = None) -> BatchReport:
+    """
+    Process every recording under paths and write the cohort summary
+
+    Args:
+        paths: Recording files and/or directories of recordings
+        output_dir: Receives one result directory per recording and SUMMARY_FILENAME
+        n_jobs: Worker processes, as for joblib (-1: one per CPU). 1 runs in this process
+        on_result: Called with each FileResult as it finishes, in completion order
+        cancel: Checked between results; once set, no further recordings are started, pool
+            workers are stopped, and the report holds only the finished recordings and
+            is not written
+
+    Raises:
+        FileNotFoundError: A path does not exist
+    """
+    start = time.perf_counter()
+    recordings = list_recordings(paths)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if n_jobs == 1 or len(recordings) < 2:
+        finished = (process_recording(name, path, output_dir) for name, path in recordings.items())
+    else:
+        from joblib import Parallel, delayed
+
+        # loky workers run warm_up once when they start, so per-file timings exclude imports
+        finished = Parallel(n_jobs=n_jobs, backend="loky", return_as="generator_unordered",
+                            initializer=warm_up)(
+            delayed(process_recording)(name, path, output_dir) for name, path in recordings.items()
+        )
+
+    by_name = {}
+    for result in finished:
+        by_name[result.name] = result
+        if on_result is not None:
+            on_result(result)
+        if cancel is not None and cancel.is_set():
+            # Closing joblib's generator aborts the pool, which it warns about
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                finished.close()
+            logger.info(f"Batch cancelled after {len(by_name)} of {len(recordings)} recordings")
+            break
+
+    report = BatchReport([by_name[name] for name in recordings if name in by_name], str(output_dir),
+                         time.perf_counter() - start)
+    if len(report.results) < len(recordings):
+        return report
+    report.summary_frame().to_csv(output_dir / SUMMARY_FILENAME, index=False)
+    logger.info(f"Batch of {len(recordings)} recordings done in {report.seconds:.1f}s, "
+                f"{len(report.failed)} failed")
+    return report
+
+
+class BatchJob:
+    """State of one background batch"""
+
+    def __init__(self, recordings: Dict[str, Path], output_dir: str, n_jobs: int):
+        self.job_id = str(uuid.uuid4())
+        self.recordings = recordings
+        self.output_dir = output_dir
+        self.n_jobs = n_jobs
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.error: Optional[str] = None
+        self.results: List[FileResult] = []  # in completion order
+        self.future: Optional[Future] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed")
+
+    @property
+    def summary_path(self) -> str:
+        return os.path.join(self.output_dir, SUMMARY_FILENAME)
+
+    def summary(self) -> Dict[str, Any]:
+        """Job status and progress"""
+        total = len(self.recordings)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "output_dir": self.output_dir,
+            "files_done": len(self.results),
+            "files_failed": sum(r.status == "failed" for r in self.results),
+            "total_files": total,
+            "progress": len(self.results) / total if total else 1.0
+        }
+
+
+class BatchJobManager:
+    """
+    Runs batches in the background, one at a time since each fans out over all CPUs
+
+    Recordings must lie under recordings_root; without one, every batch is refused.
+    Each job writes to a folder under output_root. Without an output_root, a temporary
+    one is created by the first job and removed by shutdown(), which the app calls on exit.
+    """
+
+    def __init__(self, max_jobs: int = 32, output_root: Optional[str] = None,
+                 recordings_root: Optional[str] = None):
+        self.max_jobs = max_jobs
+        self.output_root = output_root
+        self.recordings_root = recordings_root
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch")
+        self._cancel = threading.Event()
+        self._jobs: Dict[str, BatchJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, paths: List[str], n_jobs: int = -1) -> str:
+        """
+        Queue a batch
+
+        Raises:
+            PermissionError: A recording is outside recordings_root, or no root is configured
+            FileNotFoundError: A path does not exist
+            ValueError: The paths hold no recordings
+
+        Returns:
+            str: Job ID
+        """
+        if self.recordings_root is None:
+            raise PermissionError(f"Batches are disabled; set {RECORDINGS_ROOT_ENV} to the recordings directory")
+        root = Path(self.recordings_root).resolve()
+        for path in paths:
+            if not Path(path).resolve().is_relative_to(root):
+                raise PermissionError(f"{path} is outside the recordings directory")
+        recordings = list_recordings(paths)
+        # Directory entries may be links out of the root
+        for path in recordings.values():
+            if not path.resolve().is_relative_to(root):
+                raise PermissionError(f"{path} is outside the recordings directory")
+        if not recordings:
+            raise ValueError(f"No {'/'.join(RECORDING_SUFFIXES)} recordings found")
+        with self._lock:
+            if self.output_root is None:
+                self.output_root = tempfile.mkdtemp(prefix="rnsh_batches_")
+            job = BatchJob(recordings, "", n_jobs)
+            job.output_dir = os.path.join(self.output_root, job.job_id)
+            finished = [job_id for job_id, j in self._jobs.items() if j.done]
+            while len(self._jobs) >= self.max_jobs and finished:
+                del self._jobs[finished.pop(0)]
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run, job)
+        logger.info(f"Queued batch {job.job_id} of {len(recordings)} recordings")
+        return job.job_id
+
+    def get(self, job_id: str) -> BatchJob:
+        """Get a job, KeyError if unknown"""
+        with self._lock:
+            return self._jobs[job_id]
+
+    def shutdown(self):
+        """
+        Stop the runner and delete the default output folders
+
+        Queued batches are dropped and a running one is cancelled at its next result
+        without waiting for it.
+        """
+        self._cancel.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.output_root is not None:
+            shutil.rmtree(self.output_root, ignore_errors=True)
+
+    def _run(self, job: BatchJob):
+        job.status = "running"
+        try:
+            run_batch(job.recordings.values(), job.output_dir, job.n_jobs, on_result=job.results.append,
+                      cancel=self._cancel)
+            job.status = "cancelled" if self._cancel.is_set() else "completed"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logger.error(f"Batch {job.job_id} failed: {e}")
+        job.finished_at = time.time()
+
+
+# Global batch job manager
+batch_job_manager = BatchJobManager(recordings_root=os.environ.get(RECORDINGS_ROOT_ENV))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Segment and summarize a cohort of respiratory recordings")
+    parser.add_argument("paths", nargs="+", help="Recording files or directories of recordings")
+    parser.add_argument("-o", "--output-dir", required=True, help="Directory for per-file results and the summary")
+    parser.add_argument("-j", "--n-jobs", type=int, default=-1, help="Worker processes (-1: one per CPU)")
+    args = parser.parse_args(argv)
+
+    def report_file(result: FileResult):
+        detail = f"{result.breaths} breaths" if result.status == "completed" else result.error
+        print(f"{result.status:<9} {result.seconds:>8.2f}s  {result.name}: {detail}", flush=True)
+
+    report = run_batch(args.paths, args.output_dir, args.n_jobs, on_result=report_file)
+    print(f"{len(report.results)} recordings in {report.seconds:.1f}s, {len(report.failed)} failed; "
+          f"summary: {os.path.join(report.output_dir, SUMMARY_FILENAME)}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    # Run through the module so workers unpickle process_recording by its import name
+    from batch_processing import main as batch_main
+    sys.exit(batch_main())
@@ -0,0 +1,57 @@
+"""Benchmark reading oscillometry CSV exports
+
+Compares pd.read_csv with inferred dtypes (the previous DataFrameLoader path) with the
+typed CSVIngestEngine, on the C parser and, when installed, the pyarrow parser.
+
+Run from back_end/:  python benchmarks/bench_csv_ingest.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import time
+import numpy as np
+import pandas as pd
+from Resp_Analysis.resp_modules.csv_ingest import CSVIngestEngine, DEFAULT_ENGINE, OSCILLOMETRY_COLUMNS
+
+SAMPLE_RATE = 200
+
+
+def make_export(minutes, rng):
+    """Tab-separated export with the oscillometry columns at SAMPLE_RATE Hz"""
+    n = int(minutes * 60 * SAMPLE_RATE)
+    df = pd.DataFrame({col: rng.normal(size=n).round(6) for col in OSCILLOMETRY_COLUMNS if col != "#"})
+    df.insert(7, "#", np.arange(n))
+    return df.to_csv(sep="\t", index=False).encode()
+
+
+def best_of(func, repeat=3):
+    """Best wall-clock time of several runs, in milliseconds, and the last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    readers = {"inferred": lambda data: pd.read_csv(io.BytesIO(data), delimiter="\t", index_col="#")}
+    engines = ["c"] + (["pyarrow"] if DEFAULT_ENGINE == "pyarrow" else [])
+    for engine in engines:
+        readers[f"typed/{engine}"] = CSVIngestEngine(engine=engine).read
+
+    print(f"{'recording':<11} {'rows':>9} {'MB':>6} {'reader':<14} {'ms':>8} {'rows/s':>12} {'memory MB':>10}")
+    for minutes in (10, 60, 180):
+        data = make_export(minutes, rng)
+        for name, read in readers.items():
+            ms, df = best_of(lambda: read(data))
+            memory = df.memory_usage(index=True).sum() / 1e6
+            print(f"{minutes:>7} min {len(df):>9} {len(data) / 1e6:>6.1f} {name:<14} {ms:>8.1f} "
+                  f"{len(df) / ms * 1000:>12,.0f} {memory:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
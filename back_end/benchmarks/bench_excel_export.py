@@ -0,0 +1,123 @@
+"""Benchmark the Excel export of large sessions
+
+Compares a regular (fully in-memory) openpyxl workbook with per-cell style objects
+against the write-only workbook with named styles used by VideoExportEngine.
+
+Run from back_end/:  python benchmarks/bench_excel_export.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import time
+import tracemalloc
+import numpy as np
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from session_manager import MEASUREMENT_KEYS, FORMULA_KEYS
+from video_export_engine import (
+    VideoExportEngine, MEASUREMENT_ROWS, FORMULA_ROWS, TABLE_HEADERS, COLUMN_WIDTHS
+)
+
+
+def make_frames(n_frames, rng):
+    """Measured frames with some values and comparisons missing, frame 0 as baseline"""
+    frames = []
+    for idx in range(n_frames):
+        measurements = {k: float(v) if rng.random() > 0.2 else None
+                        for k, v in zip(MEASUREMENT_KEYS, rng.uniform(1, 500, len(MEASUREMENT_KEYS)))}
+        formulas = {k: float(v) if rng.random() > 0.3 else None
+                    for k, v in zip(FORMULA_KEYS, rng.uniform(0, 5, len(FORMULA_KEYS)))}
+        comparisons = {} if idx == 0 else {
+            k: {"percentOfBaseline": float(v), "percentChangeFromBaseline": float(v) - 100}
+            for k, v in zip(MEASUREMENT_KEYS + FORMULA_KEYS, rng.uniform(50, 150, 18))
+        }
+        frames.append({
+            "frame_id": f"frame-{idx}", "frame_idx": idx * 3, "timestamp": idx / 30,
+            "custom_name": f"Frame {idx}", "measurements": measurements, "formulas": formulas,
+            "baseline_comparisons": comparisons, "is_baseline": idx == 0
+        })
+    return frames
+
+
+def regular_workbook_export(frames):
+    """Previous approach: random-access workbook, new style objects assigned to every cell"""
+    def border():
+        return Border(top=Side(style='thin'), left=Side(style='thin'),
+                      bottom=Side(style='thin'), right=Side(style='thin'))
+
+    def style(cell, fill=None, bold=False):
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border()
+        if fill:
+            cell.font = Font(bold=bold, size=12)
+            cell.fill = PatternFill(start_color=fill, end_color=fill, fill_type="solid")
+
+    workbook = openpyxl.Workbook()
+    ws = workbook.active
+    row = 9
+    for frame in frames:
+        ws.merge_cells(f'A{row}:H{row}')
+        ws[f'A{row}'].value = frame["custom_name"]
+        style(ws[f'A{row}'], "8EA9DB", True)
+        row += 4
+        for col, header in enumerate(TABLE_HEADERS, 1):
+            style(ws.cell(row=row, column=col, value=header), "D9E1F2", True)
+        row += 1
+        comparisons = frame["baseline_comparisons"]
+        for section, rows, values in (("Raw Measurements", MEASUREMENT_ROWS, frame["measurements"]),
+                                      ("Calculated Formulas", FORMULA_ROWS, frame["formulas"])):
+            ws.merge_cells(f'A{row}:E{row}')
+            style(ws.cell(row=row, column=1, value=section), "E2EFDA", True)
+            row += 1
+            for key, label, unit in rows:
+                if values.get(key) is None:
+                    continue
+                comparison = comparisons.get(key) or {}
+                cells = [label, values[key], unit,
+                         comparison.get("percentOfBaseline", 0) / 100,
+                         comparison.get("percentChangeFromBaseline", 0) / 100]
+                for col, value in enumerate(cells, 1):
+                    style(ws.cell(row=row, column=col, value=value))
+                row += 1
+        row += 3
+    for col_letter, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[col_letter].width = width
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def measure(func):
+    """(seconds, peak traced MB, output MB); timed and traced in separate runs"""
+    start = time.perf_counter()
+    func().close()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    output = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    output.seek(0, os.SEEK_END)
+    size = output.tell()
+    output.close()
+    return elapsed, peak / 1e6, size / 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'frames':>7} {'engine':<24} {'seconds':>9} {'peak MB':>9} {'file MB':>9}")
+    for n_frames in (100, 1_000):
+        frames = make_frames(n_frames, rng)
+        for name, func in (
+            ("regular workbook", lambda: regular_workbook_export(frames)),
+            ("write-only named styles", lambda: VideoExportEngine().create_excel_export(frames, "frame-0"))
+        ):
+            seconds, peak, size = measure(func)
+            print(f"{n_frames:>7} {name:<24} {seconds:>9.2f} {peak:>9.1f} {size:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
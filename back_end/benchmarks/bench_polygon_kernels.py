@@ -0,0 +1,69 @@
+"""Benchmark polygon area/perimeter kernels on freehand traces
+
+Run from back_end/:  python benchmarks/bench_polygon_kernels.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import time
+import numpy as np
+from measurement_engine import shoelace_area, calculate_perimeter, calculate_polygon_batch, polygons_to_ragged
+
+
+def freehand_trace(n_vertices, rng):
+    """Noisy closed trace resembling a hand-drawn contour"""
+    t = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)
+    radius = 120 + 15 * np.sin(5 * t) + rng.normal(0, 1.5, n_vertices)
+    return np.column_stack([320 + radius * np.cos(t), 240 + 0.6 * radius * np.sin(t)])
+
+
+def loop_area_perimeter(points):
+    """The previous pure-Python index loops, kept as the reference"""
+    n = len(points)
+    area = 0.0
+    perimeter = 0.0
+    for i in range(n):
+        j = (i + 1) % n
+        area += points[i][0] * points[j][1] - points[j][0] * points[i][1]
+        dx = points[j][0] - points[i][0]
+        dy = points[j][1] - points[i][1]
+        perimeter += math.sqrt(dx * dx + dy * dy)
+    return abs(area) / 2.0, perimeter
+
+
+def best_of(func, repeat=5):
+    """Best wall-clock time of several runs, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("Single freehand trace (points passed as lists, as the API receives them)")
+    print(f"{'vertices':>10} {'loop ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for n_vertices in (1_000, 5_000, 20_000, 100_000):
+        points = freehand_trace(n_vertices, rng).tolist()
+        loop_ms = best_of(lambda: loop_area_perimeter(points))
+        numpy_ms = best_of(lambda: (shoelace_area(points), calculate_perimeter(points)))
+        print(f"{n_vertices:>10} {loop_ms:>10.3f} {numpy_ms:>10.3f} {loop_ms / numpy_ms:>7.1f}x")
+
+    print()
+    print("Batch of freehand traces (one request vs one call per polygon)")
+    print(f"{'polygons':>10} {'vertices':>10} {'per-poly ms':>12} {'batch ms':>10} {'speedup':>8}")
+    for n_polygons, n_vertices in ((10, 2_000), (100, 2_000), (500, 5_000)):
+        polygons = [freehand_trace(n_vertices, rng) for _ in range(n_polygons)]
+        coords, offsets = polygons_to_ragged(polygons)
+        per_poly_ms = best_of(lambda: [(shoelace_area(p), calculate_perimeter(p)) for p in polygons], repeat=3)
+        batch_ms = best_of(lambda: calculate_polygon_batch(coords, offsets), repeat=3)
+        print(f"{n_polygons:>10} {n_vertices:>10} {per_poly_ms:>12.3f} {batch_ms:>10.3f} {per_poly_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark per-breath feature extraction on long oscillometry recordings
+
+Compares the previous per-slice np.mean/np.min/np.max list comprehensions with the
+prefix-sum/reduceat SegmentStatistics engine used by ImpedanceFeatureExtractor.
+
+Run from back_end/:  python benchmarks/bench_segment_stats.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import numpy as np
+import pandas as pd
+from Resp_Analysis.resp_modules.impedance_features import ImpedanceFeatureExtractor
+
+SAMPLE_RATE = 200
+
+
+def make_recording(hours, rng):
+    """Signals at SAMPLE_RATE Hz and breaths of 3-5 s, split 40/60 into inspiration/expiration"""
+    n = int(hours * 3600 * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    df = pd.DataFrame({
+        "Time": t,
+        "R5": 4 + np.sin(t) + rng.normal(0, 0.1, n),
+        "R19": 3 + 0.8 * np.sin(t) + rng.normal(0, 0.1, n),
+        "X5": -1 + np.cos(t) + rng.normal(0, 0.1, n),
+        "Volume": np.sin(2 * np.pi * t / 4)
+    })
+    lengths = rng.integers(3 * SAMPLE_RATE, 5 * SAMPLE_RATE, n // (3 * SAMPLE_RATE))
+    starts = np.concatenate([[0], np.cumsum(lengths)])
+    starts = starts[starts + 5 * SAMPLE_RATE < n]
+    ends = starts + lengths[:len(starts)] - 1
+    split = starts + (ends - starts) * 2 // 5
+    breaths = pd.DataFrame({
+        "inspiration_start": starts, "inspiration_end": split,
+        "expiration_start": split + 1, "expiration_end": ends
+    })
+    return df, breaths
+
+
+def legacy_calc(df, breaths, freq=("R5", "R19", "X5")):
+    """Previous implementation: every statistic scans its own slice"""
+    index = np.asarray(df.index)
+    data = {col: np.asarray(df[col]) for col in df.columns if col not in {"#", "Time"}}
+
+    def stat_segments(signal, start, end):
+        mean = [np.mean(signal[s:e+1]) for s, e in zip(start, end)]
+        minv = [np.min(signal[s:e+1]) for s, e in zip(start, end)]
+        maxv = [np.max(signal[s:e+1]) for s, e in zip(start, end)]
+        return np.array(mean), np.array(minv), np.array(maxv), np.array(maxv) - np.array(minv)
+
+    start_i = np.searchsorted(index, breaths["inspiration_start"])
+    end_i = np.searchsorted(index, breaths["inspiration_end"])
+    start_e = np.searchsorted(index, breaths["expiration_start"])
+    end_e = np.searchsorted(index, breaths["expiration_end"])
+    result = {"breath_index": np.arange(1, len(breaths) + 1)}
+    for name, sig in [("R5-19", data["R5"] - data["R19"])] + [(f, data[f]) for f in freq]:
+        insp_mean, _, _, _ = stat_segments(sig, start_i, end_i)
+        exp_mean, _, _, _ = stat_segments(sig, start_e, end_e)
+        total_mean, total_min, total_max, total_range = stat_segments(sig, start_i, end_e)
+        result[f"{name}_INSP"] = insp_mean
+        result[f"{name}_EXP"] = exp_mean
+        result[f"{name}_TOTAL"] = total_mean
+        result[f"{name}_MIN"] = total_min
+        result[f"{name}_MAX"] = total_max
+        result[f"{name}_MAX-MIN"] = total_range
+        result[f"{name}_INSP-EXP"] = insp_mean - exp_mean
+    vol = data["Volume"]
+    result["INSP_Volume"] = vol[end_i] - vol[start_i]
+    result["EXP_Volume"] = vol[end_e] - vol[start_e]
+    return pd.DataFrame(result)
+
+
+def best_of(func, repeat=3):
+    """Best wall-clock time of several runs, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    extractor = ImpedanceFeatureExtractor()
+    print(f"{'recording':<12} {'samples':>10} {'breaths':>8} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8} {'max abs diff':>13}")
+    for hours in (0.5, 2, 6):
+        df, breaths = make_recording(hours, rng)
+        legacy = legacy_calc(df, breaths)
+        engine = extractor.calc(df, breaths)
+        diff = np.abs(legacy.to_numpy() - engine.to_numpy()).max()
+        legacy_ms = best_of(lambda: legacy_calc(df, breaths))
+        engine_ms = best_of(lambda: extractor.calc(df, breaths))
+        print(f"{hours:>9} h  {len(df):>10} {len(breaths):>8} {legacy_ms:>10.1f} {engine_ms:>10.1f} "
+              f"{legacy_ms / engine_ms:>7.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
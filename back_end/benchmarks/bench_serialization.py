@@ -0,0 +1,137 @@
+"""Benchmark JSON serialization of the large response payloads and array request parsing
+
+Run from back_end/:  python benchmarks/bench_serialization.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import numpy as np
+import pandas as pd
+import orjson
+from fastapi.responses import JSONResponse
+from fast_json import ORJSONResponse, numbers_to_array, points_to_array
+from main import AreaBatchRequest, AreaRequest
+from session_manager import MEASUREMENT_KEYS, FORMULA_KEYS
+from Resp_Analysis.resp_modules.export_utils import ExportUtils
+
+
+def best_of(func, repeat=5):
+    """Best wall-clock time of several runs, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def upload_download_payload(n_breaths, rng):
+    """Per-breath result records as returned by /upload-download/"""
+    columns = [
+        "BREATH_INDEX", "SEGMENT", "R5-19", "R5", "R19", "X5", "INSP_VOLUME", "EXP_VOLUME",
+        "INSPIRATION_START", "INSPIRATION_END", "EXPIRATION_START", "EXPIRATION_END"
+    ]
+    df = pd.DataFrame(rng.normal(size=(n_breaths, len(columns))), columns=columns)
+    return {"filename": "bench_result", "items": df.to_dict(orient="records")}
+
+
+def plot_csv_frame(n_samples, rng):
+    """Oscillometry signal columns as read by /plot-csv"""
+    return pd.DataFrame(rng.normal(size=(n_samples, 3)), columns=["X5", "R5", "Volume"])
+
+
+def frame_details_payload(n_frames, rng):
+    """Bulk frame details with measurements, formulas and baseline comparisons"""
+    frames = []
+    for idx in range(n_frames):
+        comparisons = {
+            key: {"percentOfBaseline": float(v), "percentChangeFromBaseline": float(v) - 100}
+            for key, v in zip(["angle_a", "angle_b"] + FORMULA_KEYS, rng.uniform(50, 150, 10))
+        }
+        frames.append({
+            "frame_id": f"frame-{idx}",
+            "frame_idx": idx,
+            "timestamp": idx / 30,
+            "custom_name": f"Frame {idx}",
+            "measurements": dict(zip(MEASUREMENT_KEYS, rng.uniform(1, 500, len(MEASUREMENT_KEYS)).tolist())),
+            "formulas": dict(zip(FORMULA_KEYS, rng.uniform(0, 5, len(FORMULA_KEYS)).tolist())),
+            "baseline_comparisons": comparisons
+        })
+    return {"frames": frames, "baseline_frame_id": "frame-0"}
+
+
+def report(name, baseline_ms, new_ms, size):
+    print(f"{name:<40} {baseline_ms:>10.2f} {new_ms:>10.2f} {baseline_ms / new_ms:>7.1f}x {size / 1e6:>8.2f}")
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("Response serialization (starlette JSONResponse vs ORJSONResponse)")
+    print(f"{'payload':<40} {'json ms':>10} {'orjson ms':>10} {'speedup':>8} {'MB':>8}")
+    for n_breaths in (1_000, 10_000):
+        payload = upload_download_payload(n_breaths, rng)
+        report(
+            f"/upload-download/ ({n_breaths} breaths)",
+            best_of(lambda: JSONResponse(content=payload)),
+            best_of(lambda: ORJSONResponse(content=payload)),
+            len(ORJSONResponse(content=payload).body)
+        )
+    for n_frames in (100, 1_000):
+        payload = frame_details_payload(n_frames, rng)
+        report(
+            f"/session/frame-details ({n_frames} frames)",
+            best_of(lambda: JSONResponse(content=payload)),
+            best_of(lambda: ORJSONResponse(content=payload)),
+            len(ORJSONResponse(content=payload).body)
+        )
+    for n_samples in (20_000, 100_000):
+        df = plot_csv_frame(n_samples, rng)
+        time_axis = df.index.to_numpy().astype(np.float32) / 200.0
+
+        def stdlib_plot():
+            return json.dumps([
+                {"id": col, "data": [{"x": float(x), "y": float(y)} for x, y in zip(time_axis, df[col])]}
+                for col in df.columns
+            ]).encode()
+
+        report(
+            f"/plot-csv ({n_samples} samples)",
+            best_of(stdlib_plot, repeat=3),
+            best_of(lambda: b"".join(ExportUtils.dataframe_to_plot_json(df, columns=list(df.columns))), repeat=3),
+            len(stdlib_plot())
+        )
+
+    print()
+    print("Array request parsing (pydantic List[float] validation vs orjson + np.fromiter)")
+    print(f"{'payload':<40} {'pydantic ms':>10} {'ndarray ms':>10} {'speedup':>8} {'MB':>8}")
+    for n_polygons, n_vertices in ((100, 1_000), (500, 5_000)):
+        coords = rng.uniform(0, 640, n_polygons * n_vertices * 2).tolist()
+        offsets = list(range(0, n_polygons * n_vertices + 1, n_vertices))
+        body = orjson.dumps({"coords": coords, "offsets": offsets})
+
+        def fast_parse():
+            decoded = orjson.loads(body)
+            return numbers_to_array(decoded["coords"], "coords"), numbers_to_array(decoded["offsets"], "offsets", np.int64)
+
+        report(
+            f"/measure/area-batch ({n_polygons}x{n_vertices})",
+            best_of(lambda: np.asarray(AreaBatchRequest.model_validate_json(body).coords), repeat=3),
+            best_of(fast_parse, repeat=3),
+            len(body)
+        )
+    for n_vertices in (1_000, 20_000):
+        body = orjson.dumps({"points": rng.uniform(0, 640, (n_vertices, 2)).tolist()})
+        report(
+            f"/measure/area ({n_vertices} vertices)",
+            best_of(lambda: np.asarray(AreaRequest.model_validate_json(body).points)),
+            best_of(lambda: points_to_array(orjson.loads(body)["points"])),
+            len(body)
+        )
+
+
+if __name__ == "__main__":
+    main()
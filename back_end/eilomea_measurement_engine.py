@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_c_factor(area_bv: float, area_av: float) -> float:
     """
     Calculates C-factor (Supraglottic Obstruction): Standardised ratio representing how open the supraglottis is
@@ -12,7 +15,7 @@ def calculate_c_factor(area_bv: float, area_av: float) -> float:
         Formula:
         c_factor = area_bv / (area_bv + area_av)
     """
-    if area_bv + area_av == 0:
+    if np.any(area_bv + area_av == 0):
         raise ValueError("The sum of area_bv and area_av must not be zero to avoid division by zero.")
     return area_bv / (area_bv + area_av)
 
@@ -30,7 +33,7 @@ def calculate_p_factor(area_d: float, distance_a: float) -> float:
         Formula:
         p_factor = area_d / distance_a
     """
-    if distance_a == 0:
+    if np.any(distance_a == 0):
         raise ValueError("distance_a must not be zero to avoid division by zero.")
     return area_d / distance_a
 
@@ -48,7 +51,7 @@ def calculate_distance_ratio(distance_one: float, distance_two: float) -> float:
         Formula:
         distance_ratio = distance_one / distance_two
     """
-    if distance_two == 0:
+    if np.any(distance_two == 0):
         raise ValueError("distance_two must not be zero to avoid division by zero.")
     return distance_one / distance_two
 
@@ -66,7 +69,7 @@ def calculate_supraglottic_area_ratio_1(area_b: float, distance_a: float) -> flo
         Formula:
         supraglottic_area_ratio_1 = area_b / distance_a
     """
-    if distance_a == 0:
+    if np.any(distance_a == 0):
         raise ValueError("distance_a must not be zero to avoid division by zero.")
     return area_b / distance_a
 
@@ -85,6 +88,6 @@ def calculate_supraglottic_area_ratio_2(area_b: float, distance_a: float, distan
         Formula:
         supraglottic_area_ratio_2 = area_b / (distance_a + distance_c)
     """
-    if distance_a + distance_c == 0:
+    if np.any(distance_a + distance_c == 0):
         raise ValueError("The sum of distance_a and distance_c must not be zero to avoid division by zero.")
     return area_b / (distance_a + distance_c)
\ No newline at end of file
@@ -0,0 +1,256 @@
+import os
+import copy
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Dict, List, Optional
+
+from video_export_engine import VideoExportEngine
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCancelled(Exception):
+    """Raised inside a running export when its job has been cancelled"""
+
+
+class ExportJob:
+    """State of one background Excel export"""
+
+    def __init__(self, cache_key: str, filename: str, total_frames: int):
+        self.job_id = str(uuid.uuid4())
+        self.cache_key = cache_key
+        self.filename = filename
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.error: Optional[str] = None
+        self.frames_done = 0
+        self.total_frames = total_frames
+        self.cached = False  # True when served from a previous export of the same data
+        self.path: Optional[str] = None
+        self.size_bytes: Optional[int] = None
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed")
+
+    def summary(self) -> Dict[str, Any]:
+        """Job status and progress"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "filename": self.filename,
+            "cached": self.cached,
+            "frames_done": self.frames_done,
+            "total_frames": self.total_frames,
+            "progress": self.frames_done / self.total_frames if self.total_frames else 1.0,
+            "size_bytes": self.size_bytes
+        }
+
+
+class ExportJobManager:
+    """
+    Runs Excel exports in a worker pool and caches the finished files.
+
+    Exports are keyed by the session state they were built from (see cache_key). A
+    submission whose key matches a finished export completes immediately with the
+    cached file; one that matches an export still in progress joins that job.
+
+    Files go to artifact_dir. Without one, a temporary directory is created by the
+    first export and removed by shutdown(), which the app calls on exit.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 32, max_artifacts: int = 8,
+                 artifact_dir: Optional[str] = None):
+        self.max_jobs = max_jobs
+        self.max_artifacts = max_artifacts
+        self.artifact_dir = artifact_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs: Dict[str, ExportJob] = {}
+        self._artifacts: "OrderedDict[str, str]" = OrderedDict()  # cache_key -> file path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(session_id: Optional[str], revision: Optional[int], baseline_frame_id: Optional[str],
+                  frames_data: List[Dict[str, Any]]) -> str:
+        """
+        Key identifying an export's inputs
+
+        The session revision covers server-side state (thumbnails, names, baseline);
+        the frames payload covers values the client computed itself.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(orjson.dumps([session_id, revision, baseline_frame_id]))
+        digest.update(orjson.dumps(frames_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        return digest.hexdigest()
+
+    def submit(self, frames_data: List[Dict[str, Any]], baseline_frame_id: Optional[str] = None,
+               export_metadata: Optional[Dict[str, Any]] = None, session_manager=None,
+               session_id: Optional[str] = None, revision: Optional[int] = None,
+               filename: str = "video_analysis_results.xlsx") -> str:
+        """
+        Queue an export
+
+        Args:
+            frames_data: Frames to export, as for create_excel_export. Copied, so the
+                caller may keep changing them
+            baseline_frame_id: ID of the baseline frame
+            export_metadata: Additional export information
+            session_manager: Source of frame thumbnails
+            session_id: Session the frames come from, for cache_key()
+            revision: Session revision read before frames_data was taken, for cache_key()
+            filename: Download filename
+
+        Returns:
+            str: Job ID
+        """
+        # Key the copy that is exported, so later changes by the caller cannot split the two
+        frames_data = copy.deepcopy(frames_data)
+        cache_key = self.cache_key(session_id, revision, baseline_frame_id, frames_data)
+        job = ExportJob(cache_key, filename, len(frames_data))
+
+        with self._lock:
+            path = self._artifacts.get(cache_key)
+            if path and os.path.exists(path):
+                self._artifacts.move_to_end(cache_key)
+                job.status = "completed"
+                job.cached = True
+                job.path = path
+                job.frames_done = job.total_frames
+                job.size_bytes = os.path.getsize(path)
+                job.finished_at = time.time()
+                self._add_job(job)
+                logger.info(f"Export {job.job_id} served from cache")
+                return job.job_id
+
+            running = next((j for j in self._jobs.values()
+                            if j.cache_key == cache_key and not j.done and not j.cancel_event.is_set()), None)
+            if running:
+                return running.job_id
+
+            if self.artifact_dir is None:
+                self.artifact_dir = tempfile.mkdtemp(prefix="rnsh_exports_")
+            self._add_job(job)
+            job.future = self._executor.submit(
+                self._run, job, frames_data, baseline_frame_id,
+                export_metadata, session_manager
+            )
+        logger.info(f"Queued export {job.job_id} for {job.total_frames} frames")
+        return job.job_id
+
+    def get(self, job_id: str) -> ExportJob:
+        """Get a job, KeyError if unknown"""
+        with self._lock:
+            return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation, returns False if the job had already finished"""
+        job = self.get(job_id)
+        if job.done:
+            return False
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            # Never started
+            self._finish(job, "cancelled")
+        return True
+
+    def artifact_path(self, job_id: str) -> str:
+        """
+        Path of a finished export file
+
+        Raises:
+            KeyError: Unknown job
+            ValueError: Job has not completed
+            LookupError: File has been evicted from the cache
+        """
+        job = self.get(job_id)
+        if job.status != "completed":
+            raise ValueError(f"Export is {job.status}")
+        if not job.path or not os.path.exists(job.path):
+            raise LookupError("Export file has expired, submit the export again")
+        return job.path
+
+    def shutdown(self):
+        """Stop the workers and delete all export files"""
+        for job in list(self._jobs.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self.artifact_dir is not None:
+            shutil.rmtree(self.artifact_dir, ignore_errors=True)
+
+    def _add_job(self, job: ExportJob):
+        """Register a job, forgetting the oldest finished jobs once over max_jobs"""
+        finished = [job_id for job_id, j in self._jobs.items() if j.done]
+        while len(self._jobs) >= self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+        self._jobs[job.job_id] = job
+
+    def _finish(self, job: ExportJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+
+    def _store_artifact(self, cache_key: str, path: str):
+        """Cache a finished export, deleting the least recently used beyond max_artifacts"""
+        with self._lock:
+            self._artifacts[cache_key] = path
+            self._artifacts.move_to_end(cache_key)
+            while len(self._artifacts) > self.max_artifacts:
+                _, evicted = self._artifacts.popitem(last=False)
+                try:
+                    os.unlink(evicted)
+                except OSError as e:
+                    logger.warning(f"Failed to delete cached export {evicted}: {e}")
+
+    def _run(self, job: ExportJob, frames_data: List[Dict[str, Any]], baseline_frame_id: Optional[str],
+             export_metadata: Optional[Dict[str, Any]], session_manager):
+        if job.cancel_event.is_set():
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        path = os.path.join(self.artifact_dir, f"{job.job_id}.xlsx")
+
+        def progress(frames_done, total_frames):
+            job.frames_done = frames_done
+            if job.cancel_event.is_set():
+                raise ExportCancelled()
+
+        try:
+            engine = VideoExportEngine(session_manager=session_manager, progress_callback=progress)
+            with open(path, "wb") as output:
+                engine.create_excel_export(frames_data, baseline_frame_id, export_metadata, output)
+            job.size_bytes = os.path.getsize(path)
+            job.path = path
+            self._store_artifact(job.cache_key, path)
+            self._finish(job, "completed")
+            logger.info(f"Export {job.job_id} completed ({job.size_bytes} bytes)")
+        except ExportCancelled:
+            self._discard(path)
+            self._finish(job, "cancelled")
+            logger.info(f"Export {job.job_id} cancelled after {job.frames_done} frames")
+        except Exception as e:
+            self._discard(path)
+            self._finish(job, "failed", str(e))
+            logger.error(f"Export {job.job_id} failed: {e}")
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# Global export job manager
+export_job_manager = ExportJobManager()
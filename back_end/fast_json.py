@@ -0,0 +1,132 @@
+import orjson
+import numpy as np
+from typing import Any, Dict, Iterable, Tuple, Type
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# NumPy arrays/scalars are written natively; dict keys may be ints (e.g. frame indices)
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values orjson does not serialize on its own"""
+    if isinstance(obj, np.ndarray):
+        # Non-contiguous or unsupported dtypes (orjson only takes C-contiguous numeric arrays)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with the app-wide orjson options"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    Used as the app's default response class, so endpoints can return dicts that
+    contain NumPy arrays and scalars directly. NaN and infinity become null.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def points_to_array(points: Any, field: str = "points") -> np.ndarray:
+    """
+    Convert a decoded JSON point list to a float64 (N, 2) array
+
+    Raises:
+        ValueError: If the value is not a list of [x, y] pairs of finite numbers
+    """
+    if not isinstance(points, list):
+        raise ValueError(f"{field} must be a list of [x, y] points")
+    try:
+        flat = np.fromiter(
+            (coord for point in points if len(point) == 2 for coord in point),
+            dtype=np.float64, count=2 * len(points)
+        )
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a list of [x, y] points")
+    if not np.isfinite(flat).all():
+        raise ValueError(f"{field} must contain finite numbers")
+    return flat.reshape(-1, 2)
+
+
+def numbers_to_array(values: Any, field: str, dtype=np.float64) -> np.ndarray:
+    """Convert a decoded flat JSON number list to a 1-D array"""
+    if not isinstance(values, list):
+        raise ValueError(f"{field} must be a list of numbers")
+    try:
+        array = np.fromiter(values, dtype=dtype, count=len(values))
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a list of numbers")
+    if dtype == np.float64 and not np.isfinite(array).all():
+        raise ValueError(f"{field} must contain finite numbers")
+    return array
+
+
+async def parse_array_body(request: Request, model: Type[BaseModel],
+                           point_fields: Iterable[str] = (),
+                           number_fields: Dict[str, Any] = None) -> Tuple[BaseModel, Dict[str, np.ndarray]]:
+    """
+    Parse a JSON request body, decoding large array fields straight into ndarrays
+
+    The body is decoded once with orjson. Array fields skip pydantic's per-element
+    validation and are converted with np.fromiter; the remaining (small) fields are
+    validated against model as usual.
+
+    Args:
+        request: Incoming request
+        model: Pydantic model describing the body
+        point_fields: Fields holding [[x, y], ...] lists, parsed to (N, 2) float64
+        number_fields: Fields holding flat number lists, mapped to their dtype
+
+    Returns:
+        Tuple of (validated model with the array fields left at their defaults,
+        {field: ndarray})
+    """
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON body: {e}")
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    point_fields, number_fields = tuple(point_fields), number_fields or {}
+    arrays = {}
+    for field in point_fields:
+        if field in body:
+            arrays[field] = points_to_array(body.pop(field), field)
+    for field, dtype in number_fields.items():
+        if field in body:
+            arrays[field] = numbers_to_array(body.pop(field), field, dtype)
+
+    missing = [f for f in point_fields + tuple(number_fields)
+               if f not in arrays and model.model_fields[f].is_required()]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    placeholders = {field: [] for field in arrays}
+    return model.model_validate({**body, **placeholders}), arrays
+
+
+def array_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra documenting a body that is parsed with parse_array_body"""
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+            "required": True
+        }
+    }
@@ -0,0 +1,196 @@
+import numpy as np
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+from eilomea_measurement_engine import (
+    calculate_p_factor, calculate_c_factor, calculate_distance_ratio,
+    calculate_supraglottic_area_ratio_1, calculate_supraglottic_area_ratio_2
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Formula:
+    """
+    A derived value computed from measurements (or other formulas)
+
+    func receives the inputs positionally and must accept floats as well as NumPy
+    arrays, so the same definition serves single frames and whole columns.
+    """
+
+    def __init__(self, name: str, inputs: Sequence[str], func: Callable, description: str = ""):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.func = func
+        self.description = description
+
+    def __repr__(self):
+        return f"Formula({self.name!r}, inputs={self.inputs!r})"
+
+
+# Registry of all formulas, in display/export order. Adding a formula is one entry here.
+FORMULA_REGISTRY = [
+    Formula("p_factor", ("area_a", "distance_a"), calculate_p_factor,
+            "P-Factor: Area A / Distance A"),
+    Formula("c_factor", ("area_bv", "area_av"), calculate_c_factor,
+            "C-Factor: Area BV / (Area AV + Area BV)"),
+    Formula("distance_ratio_1", ("distance_g", "distance_a"), calculate_distance_ratio,
+            "Distance G / Distance A"),
+    Formula("distance_ratio_2", ("distance_g", "distance_c"), calculate_distance_ratio,
+            "Distance G / Distance C"),
+    Formula("distance_ratio_3", ("distance_h", "distance_a"), calculate_distance_ratio,
+            "Distance H / Distance A"),
+    Formula("distance_ratio_4", ("distance_h", "distance_c"), calculate_distance_ratio,
+            "Distance H / Distance C"),
+    Formula("supraglottic_area_ratio_1", ("area_b", "distance_a"), calculate_supraglottic_area_ratio_1,
+            "Area B / Distance A"),
+    Formula("supraglottic_area_ratio_2", ("area_b", "distance_a", "distance_c"), calculate_supraglottic_area_ratio_2,
+            "Area B / (Distance A + Distance C)"),
+]
+
+
+class FormulaGraph:
+    """
+    Dependency DAG of formulas over measurement keys.
+
+    A formula is only defined when all of its inputs are present and non-zero (a zero
+    measurement means "not measured"), and when its function does not reject the
+    inputs. Evaluation runs in topological order, so formulas may use other formulas
+    as inputs, and can be limited to the formulas downstream of changed keys.
+    """
+
+    def __init__(self, formulas: Iterable[Formula]):
+        self.formulas: Dict[str, Formula] = {}
+        for formula in formulas:
+            if formula.name in self.formulas:
+                raise ValueError(f"Duplicate formula: {formula.name}")
+            self.formulas[formula.name] = formula
+        self.keys = list(self.formulas)
+        self.order = self._topological_order()
+
+        # key -> formulas that use it directly
+        self._consumers: Dict[str, List[str]] = {}
+        for formula in self.formulas.values():
+            for key in formula.inputs:
+                self._consumers.setdefault(key, []).append(formula.name)
+
+    def _topological_order(self) -> List[str]:
+        """Formula names ordered so every formula comes after the formulas it uses"""
+        order = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name, path):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Formula dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 1
+            for key in self.formulas[name].inputs:
+                if key in self.formulas:
+                    visit(key, path + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.formulas:
+            visit(name, [])
+        return order
+
+    def inputs(self) -> Set[str]:
+        """Measurement keys the formulas depend on"""
+        return {key for f in self.formulas.values() for key in f.inputs if key not in self.formulas}
+
+    def downstream(self, changed: Iterable[str]) -> List[str]:
+        """
+        Formulas affected by a change to the given keys, in evaluation order
+
+        Args:
+            changed: Measurement keys (or formula names) whose values changed
+        """
+        affected = set()
+        pending = list(changed)
+        while pending:
+            for name in self._consumers.get(pending.pop(), []):
+                if name not in affected:
+                    affected.add(name)
+                    pending.append(name)
+        return [name for name in self.order if name in affected]
+
+    def evaluate(self, measurements: Dict[str, Optional[float]],
+                 only: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Evaluate formulas for a single frame
+
+        Args:
+            measurements: Measurement values (missing, None or 0 means not measured)
+            only: Restrict evaluation to these formulas; other formula inputs are read
+                from measurements if present
+
+        Returns:
+            Dict of the formulas that are defined for these measurements
+        """
+        selected = self.order if only is None else [name for name in self.order if name in set(only)]
+        values = dict(measurements)
+        results = {}
+        for name in selected:
+            formula = self.formulas[name]
+            args = [values.get(key) for key in formula.inputs]
+            if not all(args):
+                values.pop(name, None)
+                continue
+            try:
+                results[name] = float(formula.func(*args))
+                values[name] = results[name]
+            except (ValueError, TypeError, ZeroDivisionError) as e:
+                logger.debug(f"Formula {name} not defined: {e}")
+                values.pop(name, None)
+        return results
+
+    def evaluate_columns(self, columns: Dict[str, np.ndarray],
+                         only: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate formulas over whole measurement columns
+
+        Args:
+            columns: Measurement key -> float array (NaN where not measured); all the
+                same length
+            only: Restrict evaluation to these formulas
+
+        Returns:
+            Dict of formula name -> float array, NaN where the formula is not defined
+        """
+        selected = self.order if only is None else [name for name in self.order if name in set(only)]
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        values = {key: np.asarray(col, dtype=np.float64) for key, col in columns.items()}
+        missing = np.full(n_rows, np.nan)
+        results = {}
+        for name in selected:
+            formula = self.formulas[name]
+            args = [values.get(key, missing) for key in formula.inputs]
+            valid = np.ones(n_rows, dtype=bool)
+            for arg in args:
+                valid &= np.isfinite(arg) & (arg != 0)
+            # Rows that are not valid get a harmless placeholder so the formula's own
+            # zero checks only see rows that will be kept
+            safe_args = [np.where(valid, arg, 1.0) for arg in args]
+            try:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    column = np.asarray(formula.func(*safe_args), dtype=np.float64)
+            except (ValueError, ZeroDivisionError):
+                # The formula rejected at least one row; fall back to row by row
+                column = np.array([
+                    self._evaluate_row(formula, [a[i] for a in safe_args]) for i in range(n_rows)
+                ], dtype=np.float64)
+            column = np.where(valid, column, np.nan)
+            results[name] = column
+            values[name] = column
+        return results
+
+    @staticmethod
+    def _evaluate_row(formula: Formula, args: List[float]) -> float:
+        try:
+            return float(formula.func(*args))
+        except (ValueError, TypeError, ZeroDivisionError):
+            return np.nan
+
+
+# Global graph of the registered formulas
+formula_graph = FormulaGraph(FORMULA_REGISTRY)
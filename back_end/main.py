@@ -2,40 +2,65 @@ import multiprocessing
 multiprocessing.freeze_support()
 
 
-from fastapi import FastAPI, File, UploadFile, Query, HTTPException, Form, Request, Header
-from fastapi.responses import JSONResponse, Response, FileResponse, StreamingResponse
+from fastapi import FastAPI, File, UploadFile, Query, HTTPException, Form, Request, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import tempfile
 import logging
 import uuid
 import os
 import shutil
+from contextlib import asynccontextmanager
 from typing import Dict, Optional, List, Any
 from datetime import datetime
 # Import our validation modules
 from api.plotter_api import router as plotter_api 
 from api.upload_and_downland_api import router as upload_and_downland_api
 from api.export_api import router as export_api
+from api.batch_api import router as batch_api
 from video_validation import validate_video_file
 # Import other logic
 from frame_capture import capture_frame
-from session_manager import session_manager
-from measurement_engine import calculate_angle, calculate_area_opencv, calculate_area_scikit, calculate_area_comparison, calculate_distance_ratio
-from video_export_engine import create_excel_export
+from session_manager import session_manager, MEASUREMENT_KEYS
+from measurement_engine import calculate_angle, calculate_angles_batch, calculate_area_opencv, calculate_area_scikit, calculate_area_comparison, calculate_distance_ratio, calculate_polygon_batch, measure_frame_annotations, measurement_cache
+from fast_json import ORJSONResponse, parse_array_body, array_body_openapi
+from polygon_editor import polygon_editor_manager
+from polygon_tracker import PolygonTracker
+from upload_cache import upload_cache
+from batch_processing import batch_job_manager
+from video_export_engine import create_excel_export, iter_export_file
+from export_job_manager import export_job_manager
+from tidy_export import TIDY_FORMATS, session_tidy_frame, iter_tidy_export
 from pydantic import BaseModel
 import json
-import io
+import asyncio
+import orjson
+import numpy as np
+from starlette.concurrency import run_in_threadpool
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Uploaded recordings are patient data; don't leave them in the temp directory
+    upload_cache.clear()
+    batch_job_manager.shutdown()
+    export_job_manager.shutdown()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Background optical-flow tracking jobs; formulas use the same rules as saved frames
+polygon_tracker = PolygonTracker(formula_fn=session_manager.calculate_formulas)
 
 
 app.include_router(plotter_api)
 app.include_router(upload_and_downland_api)
 app.include_router(export_api)
+app.include_router(batch_api)
 
 @app.get("/api/test")
 async def health_check():
@@ -73,6 +98,7 @@ class AreaRequest(BaseModel):
     points: List[List[float]]
     method: Optional[str] = "scikit"  # "opencv", "scikit", or "comparison"
     scale_pixels_per_mm: Optional[float] = None
+    descriptor_mode: Optional[str] = "analytic"  # "analytic" or "raster" (scikit method only)
 
 class AreaResponse(BaseModel):
     area_pixels: float
@@ -86,6 +112,54 @@ class AreaResponse(BaseModel):
     bbox: Optional[List[float]] = None
     eccentricity: Optional[float] = None
     solidity: Optional[float] = None
+    descriptor_mode: Optional[str] = None
+    convex_area_pixels: Optional[float] = None
+    feret_diameter_max: Optional[float] = None
+    feret_diameter_min: Optional[float] = None
+    feret_diameter_max_mm: Optional[float] = None
+    feret_diameter_min_mm: Optional[float] = None
+    min_area_rect: Optional[Dict[str, Any]] = None
+
+class AreaBatchRequest(BaseModel):
+    coords: List[float]  # Flattened vertices of all polygons: [x0, y0, x1, y1, ...]
+    offsets: List[int]  # Polygon i uses vertices offsets[i] to offsets[i + 1]
+    scale_pixels_per_mm: Optional[float] = None
+
+class AreaBatchResponse(BaseModel):
+    area_pixels: List[float]
+    perimeter_pixels: List[float]
+    centroid: List[List[float]]
+    bbox: List[List[float]]
+    area_mm2: Optional[List[float]] = None
+    perimeter_mm: Optional[List[float]] = None
+
+class FrameMeasurementRequest(BaseModel):
+    angles: Dict[str, List[List[float]]] = {}  # e.g. {"angle_a": [[x1,y1], [x2,y2], [x3,y3]]}
+    distances: Dict[str, List[List[float]]] = {}  # e.g. {"distance_a": [[x1,y1], [x2,y2]]}
+    areas: Dict[str, List[List[float]]] = {}  # e.g. {"area_a": [[x1,y1], ...]}
+    distance_ratios: List[Dict[str, List[List[float]]]] = []  # Each: {"horizontal_points": [...], "vertical_points": [...]}
+    scale_pixels_per_mm: Optional[float] = None
+    # Optionally save the measured frame to the session in the same call
+    save: bool = False
+    timestamp: Optional[float] = None
+    frame_idx: Optional[int] = None
+    custom_name: Optional[str] = None
+    override_existing: bool = False
+
+class PolygonOpenRequest(BaseModel):
+    points: List[List[float]] = []
+    scale_pixels_per_mm: Optional[float] = None
+
+class PolygonEditRequest(BaseModel):
+    edits: List[Dict[str, Any]]  # e.g. [{"op": "move", "index": 3, "point": [x, y]}]
+
+class TrackingRequest(BaseModel):
+    start_frame: int  # Frame the annotations were drawn on
+    end_frame: int  # Last frame to track to (inclusive)
+    angles: Dict[str, List[List[float]]] = {}
+    distances: Dict[str, List[List[float]]] = {}
+    areas: Dict[str, List[List[float]]] = {}
+    scale_pixels_per_mm: Optional[float] = None
 
 class AreaComparisonResponse(BaseModel):
     opencv_contour: Optional[Dict[str, Any]] = None
@@ -133,7 +207,7 @@ async def upload_csv_file(file: UploadFile = File(...)):
         validation_result = validate_csv_bytes(temp_file.name)
         
         if not validation_result["valid"]:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={
                     "error": "File validation failed",
@@ -141,7 +215,7 @@ async def upload_csv_file(file: UploadFile = File(...)):
                 }
             )
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "filename": file.filename,
             "content_type": file.content_type,
             "validation": validation_result["message"],
@@ -167,7 +241,7 @@ async def upload_video_file(file: UploadFile = File(...)):
         validation_result = validate_video_file(temp_file.name)
         
         if not validation_result["valid"]:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={
                     "error": "Video validation failed",
@@ -190,7 +264,7 @@ async def upload_video_file(file: UploadFile = File(...)):
             metadata=metadata
         )
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "filename": file.filename,
             "content_type": file.content_type,
             "validation": validation_result["message"],
@@ -213,7 +287,7 @@ async def get_video_frame(
     # Get current session
     session = session_manager.get_current_session()
     if not session:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"error": "No active video session"}
         )
@@ -226,7 +300,7 @@ async def get_video_frame(
         )
         return Response(content=jpeg_bytes, media_type="image/jpeg")
     except Exception as e:
-        return JSONResponse(status_code=400, content={"error": str(e)})
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
 
 
 @app.get("/session/current")
@@ -237,12 +311,12 @@ async def get_current_session():
 
     session = session_manager.get_current_session()
     if not session:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "No active session"}
         )
 
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "session_id": session["session_id"],
         "filename": session["filename"],
         "metadata": session["metadata"],
@@ -261,7 +335,7 @@ async def stream_session_video():
     """
     session = session_manager.get_current_session()
     if not session:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "Video file not found"}
         )
@@ -269,7 +343,7 @@ async def stream_session_video():
     video_path = session["video_path"]
     
     if not os.path.exists(video_path):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "Video file not found on disk"}
         )
@@ -289,7 +363,7 @@ async def stream_session_video():
         )
     except Exception as e:
         logger.error(f"Error streaming video: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to stream video"}
         )
@@ -302,10 +376,10 @@ async def clear_session():
     """
     try:
         session_manager.clear_current_session()
-        return JSONResponse(content={"message": "Session cleared successfully"})
+        return ORJSONResponse(content={"message": "Session cleared successfully"})
     except Exception as e:
         logger.error(f"Error clearing session: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to clear session"}
         )
@@ -318,18 +392,18 @@ async def save_measurement(measurement_data: dict):
     """
     try:
         frame_id = session_manager.add_measured_frame(measurement_data)
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": "Measurement saved successfully",
             "frame_id": frame_id
         })
     except ValueError as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"error": str(e)}
         )
     except Exception as e:
         logger.error(f"Error saving measurement: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to save measurement"}
         )
@@ -346,15 +420,15 @@ async def update_session_position(
     """
     try:
         session_manager.update_current_position(timestamp, frame_idx, is_paused)
-        return JSONResponse(content={"message": "Position updated successfully"})
+        return ORJSONResponse(content={"message": "Position updated successfully"})
     except ValueError as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"error": str(e)}
         )
     except Exception as e:
         logger.error(f"Error updating position: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to updated position"}
         )
@@ -372,80 +446,362 @@ def measure_angle(request: PointsRequest):
 @app.post("/measure/multiple-angles", response_model=MultipleAnglesResponse)
 def measure_multiple_angles(request: MultipleAnglesRequest):
     try:
-        results = []
         for measurement in request.measurements:
-            angle_type = measurement.get("type", "unknown")
             points = measurement.get("points", [])
-            
             if len(points) != 3:
                 raise ValueError(f"Each angle measurement must have exactly 3 points, got {len(points)}")
-            
-            angle = calculate_angle(points)
-            results.append({
-                "type": angle_type,
-                "angle": angle,
-                "points": points
-            })
+        
+        angles = calculate_angles_batch([m["points"] for m in request.measurements]).tolist()
+        results = [
+            {"type": measurement.get("type", "unknown"), "angle": angle, "points": measurement["points"]}
+            for measurement, angle in zip(request.measurements, angles)
+        ]
         
         return MultipleAnglesResponse(measurements=results)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/measure/area", response_model=AreaResponse)
-def measure_area(request: AreaRequest):
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _measure_area_result(request: AreaRequest, points: np.ndarray) -> Dict[str, Any]:
+    """Run the requested area measurement and add calibrated values"""
+    if request.method == "opencv":
+        result = calculate_area_opencv(points, "contour")
+    elif request.method == "scikit":
+        result = calculate_area_scikit(points, request.descriptor_mode)
+    elif request.method == "comparison":
+        comparison_result = calculate_area_comparison(points, request.scale_pixels_per_mm)
+        # Return the recommended method (scikit-image) from comparison
+        if "scikit_image" in comparison_result and "error" not in comparison_result["scikit_image"]:
+            result = comparison_result["scikit_image"]
+        elif "opencv_contour" in comparison_result and "error" not in comparison_result["opencv_contour"]:
+            result = comparison_result["opencv_contour"]
+        else:
+            raise ValueError("All measurement methods failed")
+    else:
+        raise ValueError(f"Unknown method: {request.method}")
+    
+    # Add calibrated measurements if scale provided
+    if request.scale_pixels_per_mm and "area_pixels" in result:
+        result["area_mm2"] = result["area_pixels"] / (request.scale_pixels_per_mm ** 2)
+        result["perimeter_mm"] = result["perimeter_pixels"] / request.scale_pixels_per_mm
+        result["scale_pixels_per_mm"] = request.scale_pixels_per_mm
+        if result.get("feret_diameter_max") is not None:
+            result["feret_diameter_max_mm"] = result["feret_diameter_max"] / request.scale_pixels_per_mm
+            result["feret_diameter_min_mm"] = result["feret_diameter_min"] / request.scale_pixels_per_mm
+    
+    return result
+
+
+@app.post("/measure/area", response_model=AreaResponse, openapi_extra=array_body_openapi(AreaRequest))
+async def measure_area(request: Request, response: Response, if_none_match: Optional[str] = Header(None)):
     """
     Calculate area using specified method
+    
+    Results are memoized by geometry hash; the hash is returned as an ETag so a
+    client re-sending the same polygon with If-None-Match gets a 304.
     """
     try:
-        if request.method == "opencv":
-            result = calculate_area_opencv(request.points, "contour")
-        elif request.method == "scikit":
-            result = calculate_area_scikit(request.points)
-        elif request.method == "comparison":
-            comparison_result = calculate_area_comparison(request.points, request.scale_pixels_per_mm)
-            # Return the recommended method (scikit-image) from comparison
-            if "scikit_image" in comparison_result and "error" not in comparison_result["scikit_image"]:
-                result = comparison_result["scikit_image"]
-            elif "opencv_contour" in comparison_result and "error" not in comparison_result["opencv_contour"]:
-                result = comparison_result["opencv_contour"]
-            else:
-                raise ValueError("All measurement methods failed")
-        else:
-            raise ValueError(f"Unknown method: {request.method}")
+        area_request, arrays = await parse_array_body(request, AreaRequest, point_fields=["points"])
+        points = arrays["points"]
+        key = measurement_cache.make_key(
+            points, f"area:{area_request.method}", area_request.scale_pixels_per_mm,
+            descriptor_mode=area_request.descriptor_mode
+        )
+        etag = f'"{key}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        result = await run_in_threadpool(
+            measurement_cache.get_or_compute, key, lambda: _measure_area_result(area_request, points)
+        )
+        response.headers["ETag"] = etag
+        return AreaResponse(**result)
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/measure/area-batch", response_model=AreaBatchResponse,
+          openapi_extra=array_body_openapi(AreaBatchRequest))
+async def measure_area_batch(request: Request):
+    """
+    Calculate area, perimeter, centroid and bbox for many polygons in one pass
+    
+    coords and offsets are decoded straight into ndarrays and the results are
+    serialized from ndarrays, so large batches never become Python float lists.
+    """
+    try:
+        batch, arrays = await parse_array_body(
+            request, AreaBatchRequest, number_fields={"coords": np.float64, "offsets": np.int64}
+        )
+        result = calculate_polygon_batch(arrays["coords"], arrays["offsets"])
+        response = {
+            "area_pixels": result["area"],
+            "perimeter_pixels": result["perimeter"],
+            "centroid": result["centroid"],
+            "bbox": result["bbox"]
+        }
         
         # Add calibrated measurements if scale provided
-        if request.scale_pixels_per_mm and "area_pixels" in result:
-            result["area_mm2"] = result["area_pixels"] / (request.scale_pixels_per_mm ** 2)
-            result["perimeter_mm"] = result["perimeter_pixels"] / request.scale_pixels_per_mm
-            result["scale_pixels_per_mm"] = request.scale_pixels_per_mm
+        if batch.scale_pixels_per_mm:
+            response["area_mm2"] = result["area"] / batch.scale_pixels_per_mm ** 2
+            response["perimeter_mm"] = result["perimeter"] / batch.scale_pixels_per_mm
         
-        return AreaResponse(**result)
+        return ORJSONResponse(content=response)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/measure/area-comparison", response_model=AreaComparisonResponse)
-def measure_area_comparison_endpoint(request: AreaRequest):
+@app.post("/measure/frame")
+async def measure_frame(request: FrameMeasurementRequest):
+    """
+    Measure every annotation of a frame and derive its formulas in one call,
+    optionally saving the result to the session
+    """
+    try:
+        result = measure_frame_annotations(
+            angles=request.angles,
+            distances=request.distances,
+            areas=request.areas,
+            distance_ratios=request.distance_ratios,
+            scale_pixels_per_mm=request.scale_pixels_per_mm
+        )
+        if unknown := set(result["measurements"]) - set(MEASUREMENT_KEYS):
+            raise ValueError(f"Unknown measurement keys: {', '.join(sorted(unknown))}")
+        result["formulas"] = session_manager.calculate_formulas(result["measurements"])
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+
+    if not request.save:
+        return ORJSONResponse(content=result)
+
+    try:
+        if request.timestamp is None or request.frame_idx is None:
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": "timestamp and frame_idx are required to save"}
+            )
+
+        frame_id, error_response = _save_captured_frame(
+            request.timestamp, request.frame_idx, dict(result["measurements"]),
+            request.custom_name, request.override_existing, formulas=dict(result["formulas"])
+        )
+        if error_response:
+            return error_response
+
+        result["frame_id"] = frame_id
+        return ORJSONResponse(content=result)
+
+    except Exception as e:
+        logger.error(f"Error saving measured frame: {e}")
+        return ORJSONResponse(
+            status_code=500,
+            content={"error": "Failed to save measured frame"}
+        )
+
+
+@app.post("/measure/area-comparison", response_model=AreaComparisonResponse,
+          openapi_extra=array_body_openapi(AreaRequest))
+async def measure_area_comparison_endpoint(request: Request, response: Response,
+                                           if_none_match: Optional[str] = Header(None)):
     """
-    Calculate area using multiple methods for comparison
+    Calculate area using multiple methods for comparison (memoized, see /measure/area)
     """
     try:
-        result = calculate_area_comparison(request.points, request.scale_pixels_per_mm)
+        area_request, arrays = await parse_array_body(request, AreaRequest, point_fields=["points"])
+        points, scale = arrays["points"], area_request.scale_pixels_per_mm
+        key = measurement_cache.make_key(points, "area-comparison", scale)
+        etag = f'"{key}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        result = await run_in_threadpool(
+            measurement_cache.get_or_compute, key, lambda: calculate_area_comparison(points, scale)
+        )
+        response.headers["ETag"] = etag
         return AreaComparisonResponse(**result)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/measure/cache-stats")
+def measurement_cache_stats():
+    """Size and hit rate of the measurement memoization cache"""
+    return measurement_cache.stats()
+
+
+@app.post("/polygon/open")
+def open_editable_polygon(request: PolygonOpenRequest):
+    """
+    Open a server-side editable polygon for live area feedback
+    
+    Edits are then sent as small deltas to /polygon/{polygon_id}/edit or over the
+    /ws/polygon/{polygon_id} WebSocket, and each one updates the measurements in O(1).
+    """
+    try:
+        polygon_id = polygon_editor_manager.open(request.points, request.scale_pixels_per_mm)
+        polygon = polygon_editor_manager.get(polygon_id)
+        return {"polygon_id": polygon_id, **polygon.measurements()}
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+
+
+@app.post("/polygon/{polygon_id}/edit")
+def edit_polygon(polygon_id: str, request: PolygonEditRequest):
+    """Apply vertex edits to an open polygon and return its measurements"""
+    try:
+        polygon = polygon_editor_manager.get(polygon_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Polygon not found"})
+    # One lock for the batch, so the reply matches the edits and no socket edit interleaves
+    with polygon.lock:
+        try:
+            for edit in request.edits:
+                polygon.apply(edit)
+            return polygon.measurements()
+        except (ValueError, IndexError, KeyError, TypeError) as e:
+            return ORJSONResponse(status_code=400, content={"error": f"Invalid edit: {e}", **polygon.measurements()})
+
+
+@app.get("/polygon/{polygon_id}")
+def get_polygon(polygon_id: str):
+    """Current vertices and measurements of an open polygon"""
+    try:
+        polygon = polygon_editor_manager.get(polygon_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Polygon not found"})
+    return polygon.snapshot()
+
+
+@app.delete("/polygon/{polygon_id}")
+def close_polygon(polygon_id: str):
+    """Close an editable polygon"""
+    if not polygon_editor_manager.close(polygon_id):
+        return ORJSONResponse(status_code=404, content={"error": "Polygon not found"})
+    return {"message": "Polygon closed"}
+
+
+@app.websocket("/ws/polygon/{polygon_id}")
+async def polygon_edit_socket(websocket: WebSocket, polygon_id: str):
+    """
+    Stream vertex edits for an open polygon (e.g. 60 Hz drag events)
+    
+    Each text message is one edit or a list of edits; the reply is the measurement
+    dict after applying them, or {"error": ...} if an edit was rejected.
+    """
+    await websocket.accept()
+    try:
+        polygon = polygon_editor_manager.get(polygon_id)
+    except KeyError:
+        await websocket.send_text(orjson.dumps({"error": "Polygon not found"}).decode())
+        await websocket.close(code=1008)
+        return
+    
+    try:
+        while True:
+            message = await websocket.receive_text()
+            with polygon.lock:
+                try:
+                    edits = orjson.loads(message)
+                    for edit in edits if isinstance(edits, list) else [edits]:
+                        polygon.apply(edit)
+                    reply = polygon.measurements()
+                except (orjson.JSONDecodeError, ValueError, IndexError, KeyError, TypeError, AttributeError) as e:
+                    reply = {"error": f"Invalid edit: {e}", **polygon.measurements()}
+            await websocket.send_text(orjson.dumps(reply).decode())
+    except WebSocketDisconnect:
+        logger.info(f"Polygon editor socket closed for {polygon_id}")
+
+
+@app.post("/tracking/start")
+def start_tracking(request: TrackingRequest):
+    """
+    Track annotations from start_frame through end_frame of the session video
+    
+    Runs as a background job; poll /tracking/{job_id}/results or stream
+    /tracking/{job_id}/stream for per-frame measurements and formulas.
+    """
+    session = session_manager.get_current_session()
+    if not session:
+        return ORJSONResponse(status_code=400, content={"error": "No active session"})
+    try:
+        job_id = polygon_tracker.start(
+            session["video_path"], request.start_frame, request.end_frame,
+            {"angles": request.angles, "distances": request.distances, "areas": request.areas},
+            request.scale_pixels_per_mm
+        )
+        return polygon_tracker.get(job_id).summary()
+    except FileNotFoundError as e:
+        logger.error(f"Error starting tracking: {e}")
+        return ORJSONResponse(status_code=404, content={"error": str(e)})
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+
+
+@app.get("/tracking/{job_id}/results")
+def get_tracking_results(job_id: str, since: int = Query(0, ge=0)):
+    """Job status plus the per-frame results from index since onwards"""
+    try:
+        job = polygon_tracker.get(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Tracking job not found"})
+    results = job.results[since:]
+    return ORJSONResponse(
+        content={**job.summary(), "results": results, "next": since + len(results)}
+    )
+
+
+@app.get("/tracking/{job_id}/stream")
+async def stream_tracking_results(job_id: str):
+    """Stream per-frame results as NDJSON while the job runs, ending with the final status"""
+    try:
+        job = polygon_tracker.get(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Tracking job not found"})
+    
+    async def generate():
+        sent = 0
+        while True:
+            done = job.done
+            results = job.results[sent:]
+            for result in results:
+                yield orjson.dumps(result) + b"\n"
+            sent += len(results)
+            if done:
+                yield orjson.dumps(job.summary()) + b"\n"
+                return
+            await asyncio.sleep(0.05)
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.post("/tracking/{job_id}/cancel")
+def cancel_tracking(job_id: str):
+    """Cancel a running tracking job"""
+    try:
+        cancelled = polygon_tracker.cancel(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Tracking job not found"})
+    return {"cancelled": cancelled, **polygon_tracker.get(job_id).summary()}
+
+
 @app.get("/session/check-frame/{frame_idx}")
 async def check_frame_exists(frame_idx: int):
     """Check if a frame has already been measured"""
     try:
         existing_frame = session_manager.check_frame_exists(frame_idx)
         if existing_frame:
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "exists": True,
                 "frame_data": {
                     "frame_id": existing_frame["frame_id"],
@@ -454,10 +810,10 @@ async def check_frame_exists(frame_idx: int):
                 }
             })
         else:
-            return JSONResponse(content={"exists": False})
+            return ORJSONResponse(content={"exists": False})
     except Exception as e:
         logger.error(f"Error checking frame existence: {e}")
-        return JSONResponse(status_code=500, content={"error": "Failed to check frame"})
+        return ORJSONResponse(status_code=500, content={"error": "Failed to check frame"})
 
 
 @app.post("/session/update-frame-name")
@@ -469,47 +825,140 @@ async def update_frame_name(request: Request):
         custom_name = data.get("custom_name")
         
         if not frame_id or custom_name is None:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "frame_id and custom_name are required"}
             )
         
         success = session_manager.update_frame_custom_name(frame_id, custom_name)
         if success:
-            return JSONResponse(content={"message": "Frame name updated successfully"})
+            return ORJSONResponse(content={"message": "Frame name updated successfully"})
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": "Frame not found"}
             )
     except Exception as e:
         logger.error(f"Error updating frame name: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to update frame name"}
         )
 
 
+@app.post("/session/update-frame-measurements")
+async def update_frame_measurements(request: Request):
+    """Update measurements of a measured frame, recomputing only the formulas that use them"""
+    try:
+        data = await request.json()
+        frame_id = data.get("frame_id")
+        measurements = data.get("measurements")
+        
+        if not frame_id or not isinstance(measurements, dict):
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": "frame_id and measurements are required"}
+            )
+        
+        formulas = session_manager.update_frame_measurements(frame_id, measurements)
+        return ORJSONResponse(content={"frame_id": frame_id, "formulas": formulas})
+    except KeyError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e.args[0])})
+    except LookupError as e:
+        return ORJSONResponse(status_code=404, content={"error": str(e)})
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        logger.error(f"Error updating frame measurements: {e}")
+        return ORJSONResponse(
+            status_code=500,
+            content={"error": "Failed to update frame measurements"}
+        )
+
+
 @app.delete("/session/remove-frame/{frame_id}")
 async def remove_measured_frame(frame_id: str):
     """Remove a measured frame from the session"""
     try:
         success = session_manager.remove_measured_frame(frame_id)
         if success:
-            return JSONResponse(content={"message": "Frame removed successfully"})
+            return ORJSONResponse(content={"message": "Frame removed successfully"})
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": "Frame not found"}
             )
     except Exception as e:
         logger.error(f"Error removing frame: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to remove frame"}
         )
 
 
+def _save_captured_frame(timestamp: float, frame_idx: int, measurements: dict, custom_name: Optional[str],
+                         override_existing: bool, formulas: Optional[dict] = None) -> tuple[Optional[str], Optional[ORJSONResponse]]:
+    """
+    Capture the frame thumbnail from the session video and store the measured frame
+
+    Returns:
+        Tuple of (frame_id, None) on success or (None, error_response) on failure
+    """
+    # Check if frame already exists and handle override
+    existing_frame = session_manager.check_frame_exists(frame_idx)
+    if existing_frame and not override_existing:
+        return None, ORJSONResponse(
+            status_code=409,  # Conflict status code
+            content={
+                "error": "Frame already exists",
+                "existing_frame": {
+                    "frame_id": existing_frame["frame_id"],
+                    "custom_name": existing_frame.get("custom_name"),
+                    "timestamp": existing_frame["timestamp"]
+                }
+            }
+        )
+    
+    # If overriding, remove the existing frame first
+    if existing_frame and override_existing:
+        session_manager.remove_measured_frame(existing_frame["frame_id"])
+    
+    # Capture frame thumbnail
+    session = session_manager.get_current_session()
+    if not session:
+        return None, ORJSONResponse(status_code=400, content={"error": "No active session"})
+    
+    # Capture frame as thumbnail
+    thumbnail_bytes = capture_frame(
+        file_path=session["video_path"],
+        timestamp=timestamp,
+        frame_idx=frame_idx
+    )
+    
+    # Save thumbnail to temp file
+    thumbnail_filename = f"frame_{frame_idx}_{timestamp:.3f}.jpg"
+    thumbnail_path = os.path.join(session_manager.session_temp_dir, thumbnail_filename)
+    
+    with open(thumbnail_path, "wb") as f:
+        f.write(thumbnail_bytes)
+    
+    # Store measurements in session before calculating formulas
+    if formulas is None:
+        formulas = session_manager.calculate_formulas(measurements)
+
+    # Prepare frame data
+    frame_data = {
+        "timestamp": timestamp,
+        "frame_idx": frame_idx,
+        "measurements": measurements,
+        "formulas": formulas, # Include calculated formulas
+        "custom_name": custom_name,  # Include custom_name
+        "thumbnail_path": thumbnail_path
+    }
+    
+    return session_manager.add_measured_frame(frame_data), None
+
+
 @app.post("/session/save-measured-frame")
 async def save_measured_frame(request: Request):
     """Save a measured frame with all its data"""
@@ -524,72 +973,25 @@ async def save_measured_frame(request: Request):
         override_existing = data.get("override_existing", False)  # Flag for overriding
         
         if timestamp is None or frame_idx is None:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400, 
                 content={"error": "timestamp and frame_idx are required"}
             )
 
-        # Check if frame already exists and handle override
-        existing_frame = session_manager.check_frame_exists(frame_idx)
-        if existing_frame and not override_existing:
-            return JSONResponse(
-                status_code=409,  # Conflict status code
-                content={
-                    "error": "Frame already exists",
-                    "existing_frame": {
-                        "frame_id": existing_frame["frame_id"],
-                        "custom_name": existing_frame.get("custom_name"),
-                        "timestamp": existing_frame["timestamp"]
-                    }
-                }
-            )
-        
-        # If overriding, remove the existing frame first
-        if existing_frame and override_existing:
-            session_manager.remove_measured_frame(existing_frame["frame_id"])
-        
-        # Capture frame thumbnail
-        session = session_manager.get_current_session()
-        if not session:
-            return JSONResponse(status_code=400, content={"error": "No active session"})
-        
-        # Capture frame as thumbnail
-        thumbnail_bytes = capture_frame(
-            file_path=session["video_path"],
-            timestamp=timestamp,
-            frame_idx=frame_idx
+        frame_id, error_response = _save_captured_frame(
+            timestamp, frame_idx, measurements, custom_name, override_existing
         )
+        if error_response:
+            return error_response
         
-        # Save thumbnail to temp file
-        thumbnail_filename = f"frame_{frame_idx}_{timestamp:.3f}.jpg"
-        thumbnail_path = os.path.join(session_manager.session_temp_dir, thumbnail_filename)
-        
-        with open(thumbnail_path, "wb") as f:
-            f.write(thumbnail_bytes)
-        
-        # Store measurements in session before calculating formulas
-        formulas = session_manager.calculate_formulas(measurements)
-
-        # Prepare frame data
-        frame_data = {
-            "timestamp": timestamp,
-            "frame_idx": frame_idx,
-            "measurements": measurements,
-            "formulas": formulas, # Include calculated formulas
-            "custom_name": custom_name,  # Include custom_name
-            "thumbnail_path": thumbnail_path
-        }
-        
-        frame_id = session_manager.add_measured_frame(frame_data)
-        
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": "Frame saved successfully",
             "frame_id": frame_id
         })
         
     except Exception as e:
         logger.error(f"Error saving measured frame: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to save measured frame"}
         )
@@ -600,12 +1002,12 @@ async def set_baseline_frame(frame_id: str):
     """set which frame is the baseline"""
     try:
         session_manager.set_baseline_frame(frame_id)
-        return JSONResponse(content={"message": "Baseline frame set successfully"})
+        return ORJSONResponse(content={"message": "Baseline frame set successfully"})
     except ValueError as e:
-        return JSONResponse(status_code=400, content={"error": str(e)})
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
     except Exception as e:
         logger.error(f"Error setting baseline: {e}")
-        return JSONResponse(status_code=500, content={"error": "Failed to set baseline"})
+        return ORJSONResponse(status_code=500, content={"error": "Failed to set baseline"})
 
 
 @app.get("/session/measured-frames")
@@ -614,7 +1016,7 @@ async def get_measured_frames():
     try:
         session = session_manager.get_current_session()
         if not session:
-            return JSONResponse(status_code=400, content={"error": "No active session"})
+            return ORJSONResponse(status_code=400, content={"error": "No active session"})
         
         # Return only metadata, not full measurement data
         frame_metadata = []
@@ -628,13 +1030,13 @@ async def get_measured_frames():
                 "thumbnail_url": f"/session/frame-thumbnail/{frame['frame_id']}"
             })
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "frame_metadata": frame_metadata,
             "baseline_frame_id": session.get("baseline_frame_id")
         })
     except Exception as e:
         logger.error(f"Error getting measured frames: {e}")
-        return JSONResponse(status_code=500, content={"error": "Failed to get measured frames"})
+        return ORJSONResponse(status_code=500, content={"error": "Failed to get measured frames"})
 
 
 @app.get("/session/frame-thumbnail/{frame_id}")
@@ -644,10 +1046,10 @@ async def get_frame_thumbnail(frame_id: str):
         thumbnail_bytes = session_manager.get_frame_thumbnail(frame_id)
         return Response(content=thumbnail_bytes, media_type="image/jpeg")
     except ValueError as e:
-        return JSONResponse(status_code=404, content={"error": str(e)})
+        return ORJSONResponse(status_code=404, content={"error": str(e)})
     except Exception as e:
         logger.error(f"Error getting frame thumbnail: {e}")
-        return JSONResponse(status_code=500, content={"error": "Failed to get frame thumbnail"})
+        return ORJSONResponse(status_code=500, content={"error": "Failed to get frame thumbnail"})
 
 
 @app.get("/session/frame-details/{frame_id}")
@@ -656,7 +1058,7 @@ async def get_frame_details(frame_id: str):
     try:
         session = session_manager.get_current_session()
         if not session:
-            return JSONResponse(status_code=400, content={"error": "No active session"})
+            return ORJSONResponse(status_code=400, content={"error": "No active session"})
         
         # Find the specific frame
         frame = next(
@@ -665,9 +1067,9 @@ async def get_frame_details(frame_id: str):
         )
         
         if not frame:
-            return JSONResponse(status_code=404, content={"error": "Frame not found"})
+            return ORJSONResponse(status_code=404, content={"error": "Frame not found"})
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "frame_id": frame["frame_id"],
             "timestamp": frame["timestamp"],
             "frame_idx": frame["frame_idx"],
@@ -679,7 +1081,94 @@ async def get_frame_details(frame_id: str):
         
     except Exception as e:
         logger.error(f"Error getting frame details: {e}")
-        return JSONResponse(status_code=500, content={"error": "Failed to get frame details"})
+        return ORJSONResponse(status_code=500, content={"error": "Failed to get frame details"})
+
+
+@app.get("/session/frame-details")
+async def get_frames_details(
+    frame_ids: Optional[str] = Query(None, description="Comma-separated frame IDs (all frames if omitted)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to include, e.g. measurements,formulas")
+):
+    """
+    Get measurement and formula data for many frames in a single response
+
+    Requested frames that are no longer in the session (e.g. deleted since the client
+    listed them) are reported in "missing" rather than failing the whole request.
+    """
+    try:
+        session = session_manager.get_current_session()
+        if not session:
+            return ORJSONResponse(status_code=400, content={"error": "No active session"})
+
+        missing = []
+        requested = [f for f in frame_ids.split(",") if f] if frame_ids else None
+        if requested is not None:
+            known = {frame["frame_id"] for frame in session["measured_frames"]}
+            missing = [f for f in requested if f not in known]
+            requested = [f for f in requested if f in known]
+
+        frames = session_manager.get_frames_details(
+            frame_ids=requested,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+
+        # Serialize straight from the session store without an intermediate copy
+        return ORJSONResponse(
+            content={
+                "frames": frames,
+                "missing": missing,
+                "baseline_frame_id": session.get("baseline_frame_id")
+            }
+        )
+
+    except KeyError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e.args[0])})
+    except Exception as e:
+        logger.error(f"Error getting frames details: {e}")
+        return ORJSONResponse(status_code=500, content={"error": "Failed to get frames details"})
+
+
+@app.get("/session/statistics")
+async def get_session_statistics(
+    keys: Optional[str] = Query(None, description="Comma-separated measurement/formula keys (default: all)")
+):
+    """Count, mean, SD, min and max of every measurement and formula across measured frames"""
+    try:
+        selected = [k.strip() for k in keys.split(",") if k.strip()] if keys else None
+        return ORJSONResponse(content=session_manager.get_statistics(selected))
+    except KeyError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e.args[0])})
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        logger.error(f"Error getting session statistics: {e}")
+        return ORJSONResponse(status_code=500, content={"error": "Failed to get session statistics"})
+
+
+@app.get("/session/baseline-comparisons")
+async def get_baseline_comparisons(
+    baseline_frame_id: Optional[str] = Query(None, description="Frame to compare against (defaults to the session baseline)")
+):
+    """Get percent-of-baseline and percent-change values for every measured frame"""
+    try:
+        session = session_manager.get_current_session()
+        if not session:
+            return ORJSONResponse(status_code=400, content={"error": "No active session"})
+
+        comparisons = session_manager.get_baseline_comparisons(baseline_frame_id)
+        return ORJSONResponse(
+            content={
+                "baseline_frame_id": baseline_frame_id or session["baseline_frame_id"],
+                "revision": session["measurement_revision"],
+                "comparisons": comparisons
+            }
+        )
+
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        logger.error(f"Error calculating baseline comparisons: {e}")
+        return ORJSONResponse(status_code=500, content={"error": "Failed to calculate baseline comparisons"})
 
 
 @app.post("/session/save-canvas-frame")
@@ -702,7 +1191,7 @@ async def save_canvas_captured_frame(request: Request):
         canvas_image = form.get("canvas_image")
         
         if not canvas_image or not hasattr(canvas_image, 'read'):
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "Canvas image is required"}
             )
@@ -712,7 +1201,7 @@ async def save_canvas_captured_frame(request: Request):
         # Check if frame already exists
         existing_frame = session_manager.check_frame_exists(frame_idx)
         if existing_frame and not override_existing:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=409,
                 content={
                     "error": "Frame already exists",
@@ -731,7 +1220,7 @@ async def save_canvas_captured_frame(request: Request):
         # Get current session
         session = session_manager.get_current_session()
         if not session:
-            return JSONResponse(status_code=400, content={"error": "No active session"})
+            return ORJSONResponse(status_code=400, content={"error": "No active session"})
         
         # Save the canvas image as thumbnail
         canvas_image_bytes = await canvas_image.read()
@@ -761,7 +1250,7 @@ async def save_canvas_captured_frame(request: Request):
         
         print(f"Canvas frame saved successfully with ID: {frame_id}")
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": "Canvas frame saved successfully",
             "frame_id": frame_id,
             "capture_method": "canvas"
@@ -769,7 +1258,7 @@ async def save_canvas_captured_frame(request: Request):
         
     except Exception as e:
         logger.error(f"Error saving canvas frame: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to save canvas frame"}
         )
@@ -781,13 +1270,13 @@ async def get_current_video_info():
     try:
         session = session_manager.get_current_session()
         if not session:
-            return JSONResponse(status_code=400, content={"error": "No active video session"})
+            return ORJSONResponse(status_code=400, content={"error": "No active video session"})
         
         import cv2
         cap = cv2.VideoCapture(session["video_path"])
         
         if not cap.isOpened():
-            return JSONResponse(status_code=400, content={"error": "Cannot open video file"})
+            return ORJSONResponse(status_code=400, content={"error": "Cannot open video file"})
         
         try:
             fps = cap.get(cv2.CAP_PROP_FPS)
@@ -804,12 +1293,12 @@ async def get_current_video_info():
                 "height": height
             }
             
-            return JSONResponse(content={"video_info": video_info})
+            return ORJSONResponse(content={"video_info": video_info})
         finally:
             cap.release()
             
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
 
 
 
@@ -819,15 +1308,15 @@ async def delete_measured_frame(frame_id: str):
     try:
         success = session_manager.remove_measured_frame(frame_id)
         if success:
-            return JSONResponse(content={"message": "Frame removed successfully"})
+            return ORJSONResponse(content={"message": "Frame removed successfully"})
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": "Frame not found"}
             )
     except Exception as e:
         logger.error(f"Error removing measured frame: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Failed to remove measured frame"}
         )
@@ -840,7 +1329,7 @@ async def get_session_video_file(request: Request, range: Optional[str] = Header
     """
     session = session_manager.get_current_session()
     if not session:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "Video file not found"}
         )
@@ -848,7 +1337,7 @@ async def get_session_video_file(request: Request, range: Optional[str] = Header
     video_path = session["video_path"]
     
     if not os.path.exists(video_path):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "Video file not found on disk"}
         )
@@ -903,7 +1392,7 @@ def measure_c_factor(request: CFactorRequest):
     """
     try:
         c_factor = calculate_c_factor(request.area_bv, request.area_av)
-        return JSONResponse(content={"c_factor": c_factor})
+        return ORJSONResponse(content={"c_factor": c_factor})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -915,7 +1404,7 @@ def measure_p_factor(request: PFactorRequest):
     """
     try:
         p_factor = calculate_p_factor(request.area_d, request.distance_a)
-        return JSONResponse(content={"p_factor": p_factor})
+        return ORJSONResponse(content={"p_factor": p_factor})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -935,6 +1424,18 @@ def measure_distance(request: DistanceRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _fill_baseline_comparisons(frames_data: List[dict], baseline_frame_id: Optional[str]):
+    """Fill in baseline comparisons the client did not send from the session engine"""
+    if baseline_frame_id and any(not frame.get("baseline_comparisons") for frame in frames_data):
+        try:
+            comparisons = session_manager.get_baseline_comparisons(baseline_frame_id)
+        except ValueError:
+            comparisons = {}
+        for frame in frames_data:
+            if not frame.get("baseline_comparisons"):
+                frame["baseline_comparisons"] = comparisons.get(frame.get("frame_id")) or {}
+
+
 @app.post("/session/export-results")
 async def export_results_with_calculated_data(request: Request):
     """Export analysis results using pre-calculated percentage data from frontend"""
@@ -947,6 +1448,8 @@ async def export_results_with_calculated_data(request: Request):
         if not frames_data:
             raise HTTPException(status_code=400, detail="No frames data provided")
         
+        _fill_baseline_comparisons(frames_data, baseline_frame_id)
+
         # Prepare export metadata
         export_metadata = {
             "export_timestamp": export_timestamp,
@@ -955,7 +1458,7 @@ async def export_results_with_calculated_data(request: Request):
         }
         
         # Use the export engine to create Excel file - PASS SESSION MANAGER
-        excel_buffer = create_excel_export(
+        excel_file = create_excel_export(
             frames_data=frames_data,
             baseline_frame_id=baseline_frame_id,
             export_metadata=export_metadata,
@@ -966,7 +1469,7 @@ async def export_results_with_calculated_data(request: Request):
         filename = f"video_analysis_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         
         return StreamingResponse(
-            io.BytesIO(excel_buffer.read()),
+            iter_export_file(excel_file),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -975,6 +1478,136 @@ async def export_results_with_calculated_data(request: Request):
         logger.error(f"Export failed: {e}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+
+@app.get("/session/export-tidy")
+def export_tidy(format: str = Query("csv"), baseline_frame_id: Optional[str] = Query(None)):
+    """
+    Export the session as a tidy table: one row per frame, one column per measurement,
+    formula and baseline comparison
+
+    format is csv, parquet or arrow (Arrow IPC file).
+    """
+    if format not in TIDY_FORMATS:
+        return ORJSONResponse(status_code=400, content={"error": f"Unknown export format: {format}"})
+    try:
+        df = session_tidy_frame(session_manager, baseline_frame_id)
+        chunks = iter_tidy_export(df, format)
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e)})
+
+    media_type, extension = TIDY_FORMATS[format]
+    filename = f"video_analysis_tidy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@app.post("/session/export-jobs")
+async def submit_export_job(request: Request):
+    """
+    Build the results workbook in the background
+
+    Takes the same body as /session/export-results. When frames_data is omitted the
+    session's measured frames are exported. Poll /session/export-jobs/{job_id} or
+    stream /session/export-jobs/{job_id}/stream, then download the file. Exporting an
+    unchanged session again is served from the cache.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    frames_data = data.get("frames_data")
+    session = session_manager.get_current_session()
+    # Read before the frames, so a change while they are taken gives a new cache key
+    revision = session and session["revision"]
+    baseline_frame_id = data.get("baseline_frame_id") or (session or {}).get("baseline_frame_id")
+
+    if frames_data is None:
+        if not session:
+            return ORJSONResponse(status_code=400, content={"error": "No active session"})
+        frames_data = session_manager.get_frames_details()
+        for frame in frames_data:
+            frame["is_baseline"] = frame["frame_id"] == baseline_frame_id
+    if not frames_data:
+        return ORJSONResponse(status_code=400, content={"error": "No frames data provided"})
+    _fill_baseline_comparisons(frames_data, baseline_frame_id)
+
+    job_id = export_job_manager.submit(
+        frames_data,
+        baseline_frame_id=baseline_frame_id,
+        export_metadata={
+            "export_timestamp": data.get("export_timestamp"),
+            "total_frames": len(frames_data),
+            "baseline_frame_id": baseline_frame_id
+        },
+        session_manager=session_manager,
+        session_id=session and session["session_id"],
+        revision=revision,
+        filename=f"video_analysis_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    )
+    return export_job_manager.get(job_id).summary()
+
+
+@app.get("/session/export-jobs/{job_id}")
+def get_export_job(job_id: str):
+    """Export job status and progress"""
+    try:
+        return export_job_manager.get(job_id).summary()
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Export job not found"})
+
+
+@app.get("/session/export-jobs/{job_id}/stream")
+async def stream_export_job(job_id: str):
+    """Stream progress as NDJSON whenever it changes, ending with the final status"""
+    try:
+        job = export_job_manager.get(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Export job not found"})
+
+    async def generate():
+        last = None
+        while True:
+            summary = job.summary()
+            if summary != last:
+                yield orjson.dumps(summary) + b"\n"
+                last = summary
+            if job.done:
+                return
+            await asyncio.sleep(0.1)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/session/export-jobs/{job_id}/download")
+def download_export_job(job_id: str):
+    """Download the workbook of a completed export job"""
+    try:
+        path = export_job_manager.artifact_path(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Export job not found"})
+    except ValueError as e:
+        return ORJSONResponse(status_code=409, content={"error": str(e)})
+    except LookupError as e:
+        return ORJSONResponse(status_code=410, content={"error": str(e)})
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=export_job_manager.get(job_id).filename
+    )
+
+
+@app.post("/session/export-jobs/{job_id}/cancel")
+def cancel_export_job(job_id: str):
+    """Cancel a queued or running export job"""
+    try:
+        cancelled = export_job_manager.cancel(job_id)
+    except KeyError:
+        return ORJSONResponse(status_code=404, content={"error": "Export job not found"})
+    return {"cancelled": cancelled, **export_job_manager.get(job_id).summary()}
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,6 +1,11 @@
 import cv2
 import numpy as np
 import math
+import copy
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
 from skimage import measure, morphology
 from typing import List, Tuple, Optional, Dict, Any
 import logging
@@ -44,6 +49,36 @@ def calculate_angle(points: List[List[float]]) -> float:
     return float(angle_deg)
 
 
+def calculate_angles_batch(triplets) -> np.ndarray:
+    """
+    Calculate many angles at once
+    
+    Args:
+        triplets: (N, 3, 2) array-like of [p1, vertex, p3] point triplets
+    
+    Returns:
+        np.ndarray: (N,) angles in degrees at the middle point; 0.0 where either arm has
+        zero length (same convention as calculate_angle)
+    """
+    pts = np.asarray(triplets, dtype=np.float64)
+    if pts.size == 0:
+        return np.zeros(0, dtype=np.float64)
+    if pts.ndim != 3 or pts.shape[1:] != (3, 2):
+        raise ValueError("Exactly 3 points are required to calculate an angle")
+    
+    v1 = pts[:, 0] - pts[:, 1]
+    v2 = pts[:, 2] - pts[:, 1]
+    
+    # atan2(|cross|, dot) is accurate near 0 and 180 degrees, where arccos loses precision
+    dot = np.einsum("ij,ij->i", v1, v2)
+    cross = v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]
+    angles = np.degrees(np.arctan2(np.abs(cross), dot))
+    
+    degenerate = ~(v1.any(axis=1) & v2.any(axis=1))
+    angles[degenerate] = 0.0
+    return angles
+
+
 def calculate_area_opencv(points: List[List[float]], method: str = "contour") -> Dict[str, Any]:
     """
     Calculate area using OpenCV methods
@@ -89,12 +124,15 @@ def calculate_area_opencv(points: List[List[float]], method: str = "contour") ->
         raise ValueError("Method must be 'contour' or 'shoelace'")
 
 
-def calculate_area_scikit(points: List[List[float]]) -> Dict[str, Any]:
+def calculate_area_scikit(points: List[List[float]], descriptor_mode: str = "analytic") -> Dict[str, Any]:
     """
     Calculate area using scikit-image - using the same approach as OpenCV for consistency
     
     Args:
         points: List of [x, y] coordinates defining the area boundary
+        descriptor_mode: "analytic" computes shape descriptors directly from the float
+            vertices; "raster" rasterizes the polygon and uses skimage regionprops
+            (kept to verify the analytic results)
     
     Returns:
         Dict with area, perimeter, and method info
@@ -110,7 +148,7 @@ def calculate_area_scikit(points: List[List[float]]) -> Dict[str, Any]:
     perimeter = calculate_perimeter(points)
     
     # Convert points to numpy array for additional calculations
-    pts = np.array(points, dtype=np.float32)
+    pts = as_point_array(points)
     
     # Calculate centroid (geometric center)
     centroid = [float(np.mean(pts[:, 0])), float(np.mean(pts[:, 1]))]
@@ -120,6 +158,198 @@ def calculate_area_scikit(points: List[List[float]]) -> Dict[str, Any]:
     max_x, max_y = np.max(pts, axis=0)
     bbox = [float(min_x), float(min_y), float(max_x), float(max_y)]
     
+    if descriptor_mode == "analytic":
+        descriptors = calculate_shape_descriptors(pts)
+    elif descriptor_mode == "raster":
+        descriptors = _raster_shape_descriptors(pts)
+    else:
+        raise ValueError("descriptor_mode must be 'analytic' or 'raster'")
+    
+    return {
+        "area_pixels": float(area),
+        "perimeter_pixels": float(perimeter),
+        "method": "scikit_image",
+        "point_count": len(points),
+        "centroid": centroid,
+        "bbox": bbox,
+        "descriptor_mode": descriptor_mode,
+        **descriptors
+    }
+
+
+def calculate_shape_descriptors(points) -> Dict[str, Any]:
+    """
+    Shape descriptors computed analytically from float polygon vertices
+    
+    Eccentricity comes from the second-order area moments of the polygon (the same
+    definition as skimage regionprops), solidity from the convex hull area, and the
+    Feret diameters and minimum-area bounding rectangle from rotating calipers on the hull.
+    
+    Returns:
+        Dict with eccentricity, solidity, convex_area_pixels, feret_diameter_max,
+        feret_diameter_min and min_area_rect
+    """
+    pts = as_point_array(points)
+    hull = convex_hull(pts)
+    convex_area = shoelace_area(hull) if len(hull) >= 3 else 0.0
+    feret_max, feret_min, min_area_rect = _rotating_calipers(hull)
+    
+    signed_area, mu20, mu02, mu11 = _polygon_central_moments(pts)
+    if abs(signed_area) <= 1e-12 or convex_area <= 1e-12:
+        # Degenerate (zero-area) polygon: same fallback values as the raster path
+        eccentricity, solidity = 0.0, 1.0
+    else:
+        # Eigenvalues of the covariance (inertia) matrix of the region
+        half_trace = (mu20 + mu02) / 2
+        spread = math.sqrt(((mu20 - mu02) / 2) ** 2 + mu11 ** 2)
+        major, minor = half_trace + spread, half_trace - spread
+        eccentricity = math.sqrt(max(0.0, 1 - minor / major)) if major > 0 else 0.0
+        solidity = min(1.0, abs(signed_area) / convex_area)
+    
+    return {
+        "eccentricity": float(eccentricity),
+        "solidity": float(solidity),
+        "convex_area_pixels": float(convex_area),
+        "feret_diameter_max": feret_max,
+        "feret_diameter_min": feret_min,
+        "min_area_rect": min_area_rect
+    }
+
+
+def convex_hull(points) -> np.ndarray:
+    """
+    Convex hull of float points using Andrew's monotone chain, O(n log n)
+    
+    Returns:
+        (m, 2) array of hull vertices in counter-clockwise order (y up) without
+        collinear points; fewer than 3 rows for degenerate input
+    """
+    pts = np.unique(as_point_array(points), axis=0)  # Sorted by x, then y
+    if len(pts) < 3:
+        return pts
+    
+    def half_hull(sequence):
+        chain = []
+        for p in sequence:
+            while len(chain) >= 2 and (
+                (chain[-1][0] - chain[-2][0]) * (p[1] - chain[-2][1])
+                - (chain[-1][1] - chain[-2][1]) * (p[0] - chain[-2][0])
+            ) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain
+    
+    ordered = pts.tolist()
+    lower = half_hull(ordered)
+    upper = half_hull(reversed(ordered))
+    return np.asarray(lower[:-1] + upper[:-1], dtype=np.float64)
+
+
+def _polygon_central_moments(pts: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Signed area and area-normalised central second moments (mu20, mu02, mu11) of a
+    polygon from Green's theorem
+    """
+    # Work relative to the vertex mean to limit cancellation
+    x = pts[:, 0] - pts[:, 0].mean()
+    y = pts[:, 1] - pts[:, 1].mean()
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    
+    signed_area = cross.sum() / 2
+    if abs(signed_area) <= 1e-12:
+        return 0.0, 0.0, 0.0, 0.0
+    
+    cx = ((x + x_next) * cross).sum() / (6 * signed_area)
+    cy = ((y + y_next) * cross).sum() / (6 * signed_area)
+    m20 = ((x * x + x * x_next + x_next * x_next) * cross).sum() / (12 * signed_area)
+    m02 = ((y * y + y * y_next + y_next * y_next) * cross).sum() / (12 * signed_area)
+    m11 = ((x * y_next + 2 * x * y + 2 * x_next * y_next + x_next * y) * cross).sum() / (24 * signed_area)
+    
+    return float(signed_area), float(m20 - cx * cx), float(m02 - cy * cy), float(m11 - cx * cy)
+
+
+def _rotating_calipers(hull: np.ndarray) -> Tuple[float, float, Optional[Dict[str, Any]]]:
+    """
+    Feret diameters and minimum-area bounding rectangle of a convex hull
+    
+    Every caliper orientation that matters is parallel to a hull edge. Edge angles of a
+    counter-clockwise hull increase monotonically, so the extreme vertex in any direction
+    is found with a binary search over them, giving O(h log h) calipers for all edges at once.
+    
+    Returns:
+        Tuple of (max Feret diameter, min Feret diameter, min-area rectangle dict)
+    """
+    if len(hull) < 2:
+        return 0.0, 0.0, None
+    if len(hull) == 2:
+        length = float(np.linalg.norm(hull[1] - hull[0]))
+        return length, 0.0, None
+    
+    h = len(hull)
+    edges = np.roll(hull, -1, axis=0) - hull
+    directions = edges / np.sqrt(np.einsum("ij,ij->i", edges, edges))[:, None]
+    normals = np.column_stack([-directions[:, 1], directions[:, 0]])  # Point into the hull
+    
+    # Edge angles relative to the first edge, increasing over [0, 2*pi)
+    angles = np.arctan2(directions[:, 1], directions[:, 0])
+    relative = np.mod(angles - angles[0], 2 * np.pi)
+    relative[0] = 0.0
+    
+    def extreme_vertex(turn):
+        # Vertex where the boundary first turns past edge angle + turn, i.e. the
+        # vertex furthest along the direction at edge angle + turn - pi/2
+        target = np.mod(relative + turn, 2 * np.pi)
+        return np.searchsorted(relative, target, side="left") % h
+    
+    far_u = extreme_vertex(np.pi / 2)
+    near_u = extreme_vertex(3 * np.pi / 2)
+    far_n = extreme_vertex(np.pi)
+    
+    a_hi = np.einsum("ij,ij->i", hull[far_u], directions)
+    a_lo = np.einsum("ij,ij->i", hull[near_u], directions)
+    n_lo = np.einsum("ij,ij->i", hull, normals)  # The edge itself supports the hull
+    n_hi = np.einsum("ij,ij->i", hull[far_n], normals)
+    lengths = a_hi - a_lo
+    widths = n_hi - n_lo
+    
+    # Minimum Feret diameter: narrowest caliper width
+    feret_min = float(widths.min())
+    
+    # Maximum Feret diameter: the diameter is attained by an antipodal vertex pair, and
+    # every antipodal pair joins an edge endpoint to the vertex furthest from that edge
+    # (both ends of the opposite edge are tried in case it is parallel)
+    ends = np.stack([np.arange(h), (np.arange(h) + 1) % h], axis=1)
+    opposite = np.stack([far_n, (far_n + 1) % h], axis=1)
+    chords = hull[ends][:, :, None, :] - hull[opposite][:, None, :, :]
+    feret_max = float(np.sqrt(np.einsum("...k,...k->...", chords, chords).max()))
+    
+    best = int(np.argmin(lengths * widths))
+    u, n = directions[best], normals[best]
+    corners = [
+        (u * a + n * b).tolist()
+        for a, b in ((a_lo[best], n_lo[best]), (a_hi[best], n_lo[best]),
+                     (a_hi[best], n_hi[best]), (a_lo[best], n_hi[best]))
+    ]
+    center = (u * (a_lo[best] + a_hi[best]) / 2 + n * (n_lo[best] + n_hi[best]) / 2).tolist()
+    
+    min_area_rect = {
+        "center": center,
+        "width": float(lengths[best]),
+        "height": float(widths[best]),
+        "angle": float(math.degrees(math.atan2(u[1], u[0]))),
+        "area": float(lengths[best] * widths[best]),
+        "corners": corners
+    }
+    
+    return feret_max, feret_min, min_area_rect
+
+
+def _raster_shape_descriptors(pts: np.ndarray) -> Dict[str, Any]:
+    """Eccentricity and solidity from a rasterized mask via skimage regionprops"""
+    min_x, min_y = np.min(pts, axis=0)
+    max_x, max_y = np.max(pts, axis=0)
+    
     # Calculate additional properties for medical analysis
     # For eccentricity and solidity, we need to create a mask
     width = int(np.ceil(max_x - min_x)) + 4
@@ -147,16 +377,7 @@ def calculate_area_scikit(points: List[List[float]]) -> Dict[str, Any]:
         eccentricity = 0.0
         solidity = 1.0
     
-    return {
-        "area_pixels": float(area),
-        "perimeter_pixels": float(perimeter),
-        "method": "scikit_image",
-        "point_count": len(points),
-        "centroid": centroid,
-        "bbox": bbox,
-        "eccentricity": eccentricity,
-        "solidity": solidity
-    }
+    return {"eccentricity": eccentricity, "solidity": solidity}
 
 
 def calculate_area_comparison(points: List[List[float]], 
@@ -217,39 +438,147 @@ def calculate_area_comparison(points: List[List[float]],
     return results
 
 
+def as_point_array(points) -> np.ndarray:
+    """
+    Convert [[x, y], ...] points to a contiguous (n, 2) float64 array
+    
+    Nested lists are flattened with np.fromiter, which is about twice as fast as
+    np.asarray on list-of-lists input
+    """
+    if isinstance(points, np.ndarray):
+        return np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+    
+    flat = np.fromiter(itertools.chain.from_iterable(points), dtype=np.float64)
+    if flat.size != 2 * len(points):
+        raise ValueError("Each point must have exactly 2 coordinates")
+    return flat.reshape(-1, 2)
+
+
 def shoelace_area(points: List[List[float]]) -> float:
     """
     Calculate area using the shoelace formula (Gauss's area formula)
     More accurate for irregular polygons
     """
-    n = len(points)
-    if n < 3:
+    pts = as_point_array(points)
+    if len(pts) < 3:
         return 0.0
     
-    area = 0.0
-    for i in range(n):
-        j = (i + 1) % n
-        area += points[i][0] * points[j][1]
-        area -= points[j][0] * points[i][1]
+    # Centre on the first vertex to limit cancellation in the cross products
+    x = pts[:, 0] - pts[0, 0]
+    y = pts[:, 1] - pts[0, 1]
     
-    return abs(area) / 2.0
+    return float(abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2.0)
 
 
 def calculate_perimeter(points: List[List[float]]) -> float:
     """Calculate perimeter of polygon defined by points"""
-    if len(points) < 2:
+    pts = as_point_array(points)
+    if len(pts) < 2:
         return 0.0
     
-    perimeter = 0.0
-    n = len(points)
+    # Edge vectors including the closing edge back to the first point
+    edges = np.diff(pts, axis=0, append=pts[:1])
+    
+    return float(np.sqrt(np.einsum("ij,ij->i", edges, edges)).sum())
+
+
+def polygons_to_ragged(polygons: List[List[List[float]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack a list of polygons into one ragged array
+    
+    Returns:
+        Tuple of (coords, offsets): coords is a (total_vertices, 2) float64 array and
+        polygon i is coords[offsets[i]:offsets[i + 1]]
+    """
+    counts = [len(polygon) for polygon in polygons]
+    offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    if offsets[-1] == 0:
+        return np.empty((0, 2), dtype=np.float64), offsets
+    coords = np.concatenate([as_point_array(polygon) for polygon in polygons])
+    return coords, offsets
+
+
+def calculate_polygon_batch(coords, offsets) -> Dict[str, np.ndarray]:
+    """
+    Measure many polygons in a single vectorized pass
+    
+    Args:
+        coords: (total_vertices, 2) vertex array, or the same values flattened as [x0, y0, x1, y1, ...]
+        offsets: (n_polygons + 1,) vertex offsets; polygon i is coords[offsets[i]:offsets[i + 1]]
     
-    for i in range(n):
-        j = (i + 1) % n
-        dx = points[j][0] - points[i][0]
-        dy = points[j][1] - points[i][1]
-        perimeter += math.sqrt(dx*dx + dy*dy)
+    Returns:
+        Dict of arrays: area (n,), perimeter (n,), centroid (n, 2) and bbox (n, 4) as
+        [min_x, min_y, max_x, max_y], all in pixels
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    
+    if offsets.ndim != 1 or len(offsets) < 1 or offsets[0] != 0 or offsets[-1] != len(coords):
+        raise ValueError("Offsets must start at 0 and end at the number of vertices")
+    counts = np.diff(offsets)
+    if np.any(counts < 3):
+        raise ValueError("At least 3 points are required to calculate area")
+    
+    if len(counts) == 0:
+        return {
+            "area": np.empty(0), "perimeter": np.empty(0),
+            "centroid": np.empty((0, 2)), "bbox": np.empty((0, 4))
+        }
     
-    return perimeter
+    area = np.empty(len(counts))
+    perimeter = np.empty(len(counts))
+    centroid = np.empty((len(counts), 2))
+    bbox = np.empty((len(counts), 4))
+    
+    # Work through blocks of whole polygons that fit in cache; one pass over a
+    # multi-million vertex array is memory bound and slower than cache-sized blocks
+    block_bounds = np.searchsorted(offsets, np.arange(0, len(coords), _BATCH_BLOCK_VERTICES), side="right") - 1
+    block_bounds = np.unique(np.append(block_bounds, len(counts)))
+    for first, stop in zip(block_bounds[:-1], block_bounds[1:]):
+        block = slice(first, stop)
+        block_offsets = offsets[first:stop + 1]
+        area[block], perimeter[block], centroid[block], bbox[block] = _measure_polygon_block(
+            coords[block_offsets[0]:block_offsets[-1]], block_offsets - block_offsets[0]
+        )
+    
+    return {"area": area, "perimeter": perimeter, "centroid": centroid, "bbox": bbox}
+
+
+# Vertices per block in calculate_polygon_batch (keeps the working arrays in cache)
+_BATCH_BLOCK_VERTICES = 1 << 15
+
+
+def _measure_polygon_block(coords: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Vectorized area, perimeter, centroid and bbox for a block of polygons"""
+    starts, lasts = offsets[:-1], offsets[1:] - 1
+    counts = np.diff(offsets)
+    x = np.ascontiguousarray(coords[:, 0])
+    y = np.ascontiguousarray(coords[:, 1])
+    
+    # Terms for consecutive vertices across the whole block, then overwrite the term at
+    # each polygon's last vertex with its closing edge back to the first vertex
+    cross = np.empty_like(x)
+    cross[:-1] = x[:-1] * y[1:] - x[1:] * y[:-1]
+    cross[lasts] = x[lasts] * y[starts] - x[starts] * y[lasts]
+    
+    dx = np.empty_like(x)
+    dy = np.empty_like(y)
+    dx[:-1] = x[1:] - x[:-1]
+    dy[:-1] = y[1:] - y[:-1]
+    dx[lasts] = x[starts] - x[lasts]
+    dy[lasts] = y[starts] - y[lasts]
+    
+    area = np.abs(np.add.reduceat(cross, starts)) / 2.0
+    perimeter = np.add.reduceat(np.sqrt(dx * dx + dy * dy), starts)
+    
+    centroid = np.column_stack([np.add.reduceat(x, starts), np.add.reduceat(y, starts)]) / counts[:, None]
+    bbox = np.column_stack([
+        np.minimum.reduceat(x, starts), np.minimum.reduceat(y, starts),
+        np.maximum.reduceat(x, starts), np.maximum.reduceat(y, starts)
+    ])
+    
+    return area, perimeter, centroid, bbox
 
 
 def calculate_distance_ratio(horizontal_points: List[List[float]], vertical_points: List[List[float]]) -> Dict[str, Any]:
@@ -286,4 +615,149 @@ def calculate_distance_ratio(horizontal_points: List[List[float]], vertical_poin
         "ratio_percentage": float(ratio_percentage),
         "horizontal_points": horizontal_points,
         "vertical_points": vertical_points
-    }
\ No newline at end of file
+    }
+
+
+def measure_frame_annotations(angles: Optional[Dict[str, List[List[float]]]] = None,
+                              distances: Optional[Dict[str, List[List[float]]]] = None,
+                              areas: Optional[Dict[str, List[List[float]]]] = None,
+                              distance_ratios: Optional[List[Dict[str, List[List[float]]]]] = None,
+                              scale_pixels_per_mm: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Measure every annotation drawn on a frame in one pass
+    
+    Args:
+        angles: Measurement key -> 3 [x, y] points (vertex in the middle)
+        distances: Measurement key -> 2 [x, y] points
+        areas: Measurement key -> polygon [x, y] points (all measured in one batch)
+        distance_ratios: List of {"horizontal_points": [...], "vertical_points": [...]}
+        scale_pixels_per_mm: Optional calibration for real-world area measurements
+    
+    Returns:
+        Dict with "measurements" (key -> raw value, as stored on measured frames) and
+        "details" (full area and distance ratio results)
+    """
+    angles, distances, areas = angles or {}, distances or {}, areas or {}
+    measurements = {}
+    details = {"areas": {}, "distance_ratios": []}
+    
+    for key, points in angles.items():
+        if len(points) != 3:
+            raise ValueError(f"{key}: exactly 3 points are required to calculate an angle")
+    if angles:
+        values = calculate_angles_batch(list(angles.values()))
+        measurements.update(zip(angles.keys(), values.tolist()))
+    
+    if distances:
+        pairs = np.asarray(list(distances.values()), dtype=np.float64)
+        if pairs.ndim != 3 or pairs.shape[1:] != (2, 2):
+            raise ValueError("Exactly 2 points are required to calculate distance")
+        lengths = np.linalg.norm(pairs[:, 1] - pairs[:, 0], axis=1)
+        measurements.update(zip(distances.keys(), lengths.tolist()))
+    
+    if areas:
+        polygon_result = calculate_polygon_batch(*polygons_to_ragged(list(areas.values())))
+        for i, key in enumerate(areas):
+            area_result = {
+                "area_pixels": float(polygon_result["area"][i]),
+                "perimeter_pixels": float(polygon_result["perimeter"][i]),
+                "point_count": len(areas[key]),
+                "centroid": polygon_result["centroid"][i].tolist(),
+                "bbox": polygon_result["bbox"][i].tolist()
+            }
+            if scale_pixels_per_mm:
+                area_result["area_mm2"] = area_result["area_pixels"] / (scale_pixels_per_mm ** 2)
+                area_result["perimeter_mm"] = area_result["perimeter_pixels"] / scale_pixels_per_mm
+            measurements[key] = area_result["area_pixels"]
+            details["areas"][key] = area_result
+    
+    for ratio in distance_ratios or []:
+        details["distance_ratios"].append(
+            calculate_distance_ratio(ratio.get("horizontal_points", []), ratio.get("vertical_points", []))
+        )
+    
+    return {"measurements": measurements, "details": details}
+
+
+class MeasurementCache:
+    """
+    Bounded LRU cache of measurement results keyed by a canonical geometry hash
+
+    Points are rounded to a fixed number of decimals before hashing, so repeated
+    requests for the same (or float-noise-identical) polygon share one entry. The hex
+    key doubles as an HTTP ETag since a result depends only on its inputs.
+    """
+
+    def __init__(self, max_entries: int = 1024, decimals: int = 3):
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, points, method: str, scale_pixels_per_mm: Optional[float] = None, **options) -> str:
+        """
+        Canonical hash of the measurement inputs
+
+        Args:
+            points: List of [x, y] coordinates
+            method: Measurement method name
+            scale_pixels_per_mm: Optional calibration scale
+            **options: Any other inputs that change the result
+
+        Returns:
+            str: Hex digest identifying the measurement
+        """
+        pts = np.round(as_point_array(points), self.decimals) + 0.0  # + 0.0 folds -0.0 into 0.0
+        digest = hashlib.blake2b(pts.tobytes(), digest_size=16)
+        extras = [method, repr(float(scale_pixels_per_mm) if scale_pixels_per_mm else None)]
+        extras += [f"{name}={options[name]!r}" for name in sorted(options)]
+        digest.update("|".join(extras).encode())
+        return digest.hexdigest()
+
+    def get_or_compute(self, key: str, compute) -> Any:
+        """
+        Return the cached result for key, computing and storing it on a miss
+
+        Exceptions from compute propagate and nothing is cached. Callers get a copy,
+        so mutating a result does not affect the cache.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit-rate metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """Drop all entries and reset the metrics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared cache for the interactive measurement endpoints
+measurement_cache = MeasurementCache()
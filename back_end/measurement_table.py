@@ -0,0 +1,189 @@
+import numpy as np
+import logging
+from typing import Dict, List, Optional, Any
+from baseline_comparison_engine import to_float
+
+logger = logging.getLogger(__name__)
+
+
+class MeasurementTable:
+    """
+    Columnar mirror of the measured frames' measurements and formulas.
+
+    Values live in a (capacity x keys) float64 array with NaN for missing values, plus
+    a validity mask. Rows are appended on add and swap-removed on delete, and the
+    per-column count, Welford mean/M2, min and max are updated on every change, so
+    session-wide statistics are available without traversing the frames.
+    """
+
+    def __init__(self, measurement_keys: List[str], formula_keys: List[str], initial_capacity: int = 64):
+        self.measurement_keys = list(measurement_keys)
+        self.formula_keys = list(formula_keys)
+        self.keys = self.measurement_keys + self.formula_keys
+        self.column_index = {key: col for col, key in enumerate(self.keys)}
+        self.values = np.full((initial_capacity, len(self.keys)), np.nan, dtype=np.float64)
+        self.valid = np.zeros((initial_capacity, len(self.keys)), dtype=bool)
+        self.frame_ids: List[str] = []
+        self.row_index: Dict[str, int] = {}
+        self._reset_aggregates()
+
+    def _reset_aggregates(self):
+        n_keys = len(self.keys)
+        self.count = np.zeros(n_keys, dtype=np.int64)
+        self.mean = np.zeros(n_keys, dtype=np.float64)
+        self.m2 = np.zeros(n_keys, dtype=np.float64)
+        self.min = np.full(n_keys, np.inf)
+        self.max = np.full(n_keys, -np.inf)
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+    def row_from_frame(self, frame: Dict[str, Any]) -> np.ndarray:
+        """Lay out a frame's measurements and formulas as one row (NaN where missing)"""
+        measurements = frame.get("measurements") or {}
+        formulas = frame.get("formulas") or {}
+        row = np.empty(len(self.keys), dtype=np.float64)
+        for col, key in enumerate(self.keys):
+            source = measurements if col < len(self.measurement_keys) else formulas
+            row[col] = to_float(source.get(key))
+        return row
+
+    def add_frame(self, frame: Dict[str, Any]):
+        """Append a measured frame"""
+        frame_id = frame["frame_id"]
+        if frame_id in self.row_index:
+            raise ValueError(f"Frame already in table: {frame_id}")
+        row = self.row_from_frame(frame)
+
+        n = len(self.frame_ids)
+        if n == len(self.values):
+            self._grow()
+        self.values[n] = row
+        self.valid[n] = np.isfinite(row)
+        self.frame_ids.append(frame_id)
+        self.row_index[frame_id] = n
+        self._include(row)
+
+    def remove_frame(self, frame_id: str) -> bool:
+        """Remove a frame by swapping the last row into its place"""
+        n = self.row_index.pop(frame_id, None)
+        if n is None:
+            return False
+        row = self.values[n].copy()
+        last = len(self.frame_ids) - 1
+        if n != last:
+            self.values[n] = self.values[last]
+            self.valid[n] = self.valid[last]
+            moved_id = self.frame_ids[last]
+            self.frame_ids[n] = moved_id
+            self.row_index[moved_id] = n
+        self.frame_ids.pop()
+        self.values[last] = np.nan
+        self.valid[last] = False
+        self._exclude(row)
+        return True
+
+    def update_frame(self, frame: Dict[str, Any]):
+        """Refresh a frame's row after its measurements or formulas changed"""
+        n = self.row_index.get(frame["frame_id"])
+        if n is None:
+            self.add_frame(frame)
+            return
+        old = self.values[n].copy()
+        new = self.row_from_frame(frame)
+        self.values[n] = new
+        self.valid[n] = np.isfinite(new)
+        self._exclude(old)
+        self._include(new)
+
+    def clear(self):
+        """Drop all rows"""
+        self.values[:] = np.nan
+        self.valid[:] = False
+        self.frame_ids = []
+        self.row_index = {}
+        self._reset_aggregates()
+
+    def _grow(self):
+        capacity = max(1, len(self.values)) * 2
+        values = np.full((capacity, len(self.keys)), np.nan, dtype=np.float64)
+        valid = np.zeros((capacity, len(self.keys)), dtype=bool)
+        values[:len(self.values)] = self.values
+        valid[:len(self.valid)] = self.valid
+        self.values, self.valid = values, valid
+
+    def _include(self, row: np.ndarray):
+        """Welford update with one row (only its finite values)"""
+        present = np.isfinite(row)
+        if not present.any():
+            return
+        x = np.where(present, row, 0.0)
+        self.count += present
+        delta = np.where(present, x - self.mean, 0.0)
+        self.mean += np.divide(delta, self.count, out=np.zeros_like(delta), where=present)
+        self.m2 += np.where(present, delta * (x - self.mean), 0.0)
+        self.min = np.where(present, np.minimum(self.min, x), self.min)
+        self.max = np.where(present, np.maximum(self.max, x), self.max)
+
+    def _exclude(self, row: np.ndarray):
+        """Reverse Welford update removing one row (only its finite values)"""
+        present = np.isfinite(row)
+        if not present.any():
+            return
+        x = np.where(present, row, 0.0)
+        remaining = self.count - present
+        emptied = present & (remaining == 0)
+        shrink = present & (remaining > 0)
+
+        old_mean = self.mean.copy()
+        new_mean = np.divide(self.count * old_mean - x, remaining, out=old_mean.copy(), where=shrink)
+        self.m2 = np.where(shrink, np.maximum(self.m2 - (x - old_mean) * (x - new_mean), 0.0), self.m2)
+        self.mean = new_mean
+        self.count = remaining
+
+        self.mean[emptied] = 0.0
+        self.m2[emptied] = 0.0
+        self.min[emptied] = np.inf
+        self.max[emptied] = -np.inf
+
+        # min/max cannot be un-applied; rescan only columns whose extreme was removed
+        stale = shrink & ((x <= self.min) | (x >= self.max))
+        if stale.any():
+            n = len(self.frame_ids)
+            columns = self.values[:n][:, stale]
+            self.min[stale] = np.nanmin(columns, axis=0)
+            self.max[stale] = np.nanmax(columns, axis=0)
+
+    def column(self, key: str) -> np.ndarray:
+        """View of one key's values for all frames (NaN where missing)"""
+        return self.values[:len(self.frame_ids), self.column_index[key]]
+
+    def statistics(self, keys: Optional[List[str]] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Running aggregates per key
+
+        Returns:
+            Dict mapping key to {"count", "mean", "std", "variance", "min", "max"}.
+            std/variance are sample values (ddof=1); None where undefined.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+        has_values = self.count > 0
+
+        def value(array, col):
+            return float(array[col]) if has_values[col] and np.isfinite(array[col]) else None
+
+        stats = {}
+        for key in keys or self.keys:
+            col = self.column_index[key]
+            var = value(variance, col)
+            stats[key] = {
+                "count": int(self.count[col]),
+                "mean": value(self.mean, col),
+                "std": float(np.sqrt(var)) if var is not None else None,
+                "variance": var,
+                "min": value(self.min, col),
+                "max": value(self.max, col)
+            }
+        return stats
+
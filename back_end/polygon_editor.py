@@ -0,0 +1,204 @@
+import math
+import uuid
+import threading
+import logging
+from typing import Dict, List, Optional, Any
+
+from measurement_engine import as_point_array
+
+logger = logging.getLogger(__name__)
+
+
+class EditablePolygon:
+    """
+    Server-side polygon that keeps its measurements up to date under vertex edits.
+
+    The shoelace sum, perimeter and vertex sums are stored as running totals. An edit
+    only touches the edges adjacent to the changed vertex, so each insert, move or
+    delete updates area, perimeter and centroid in O(1). Totals are recomputed from
+    scratch every resync_interval edits to keep floating-point drift bounded.
+
+    Edits arrive from threadpool requests and the WebSocket on the event loop, so every
+    public method holds the polygon's lock; hold it yourself to apply several edits and
+    read the result as one step.
+    """
+
+    def __init__(self, points: Optional[List[List[float]]] = None,
+                 scale_pixels_per_mm: Optional[float] = None, resync_interval: int = 1000):
+        self.points: List[List[float]] = [] if points is None or len(points) == 0 \
+            else as_point_array(points).tolist()
+        self.scale_pixels_per_mm = scale_pixels_per_mm
+        self.resync_interval = resync_interval
+        self.revision = 0
+        self._edits_since_resync = 0
+        self.lock = threading.RLock()
+        self.resync()
+
+    def resync(self):
+        """Recompute all running totals from the vertex list"""
+        with self.lock:
+            self._cross_sum = 0.0
+            self._perimeter = 0.0
+            n = len(self.points)
+            if n >= 2:
+                for i in range(n):
+                    self._add_edge(self.points[i], self.points[(i + 1) % n], 1)
+            self._sum_x = math.fsum(p[0] for p in self.points)
+            self._sum_y = math.fsum(p[1] for p in self.points)
+            self._edits_since_resync = 0
+
+    def _add_edge(self, p: List[float], q: List[float], sign: int):
+        """Add (sign=1) or remove (sign=-1) the shoelace and length terms of edge p->q"""
+        self._cross_sum += sign * (p[0] * q[1] - q[0] * p[1])
+        self._perimeter += sign * math.sqrt((q[0] - p[0]) ** 2 + (q[1] - p[1]) ** 2)
+
+    def _check_index(self, index: int, allow_end: bool = False) -> int:
+        upper = len(self.points) + (1 if allow_end else 0)
+        if not isinstance(index, int) or not 0 <= index < upper:
+            raise IndexError(f"Vertex index {index} out of range")
+        return index
+
+    def _finish_edit(self):
+        self.revision += 1
+        self._edits_since_resync += 1
+        if self._edits_since_resync >= self.resync_interval:
+            self.resync()
+
+    def move_vertex(self, index: int, point: List[float]):
+        """Move vertex index to point"""
+        with self.lock:
+            index = self._check_index(index)
+            new = [float(point[0]), float(point[1])]
+            old = self.points[index]
+            n = len(self.points)
+            if n > 2:
+                prev, nxt = self.points[index - 1], self.points[(index + 1) % n]
+                self._add_edge(prev, old, -1)
+                self._add_edge(old, nxt, -1)
+                self._add_edge(prev, new, 1)
+                self._add_edge(new, nxt, 1)
+            self.points[index] = new
+            self._sum_x += new[0] - old[0]
+            self._sum_y += new[1] - old[1]
+            if n <= 2:
+                # Both edges of a two-vertex polygon join the same pair; just recompute
+                self.resync()
+            self._finish_edit()
+
+    def insert_vertex(self, index: int, point: List[float]):
+        """Insert point before vertex index (index == point count appends)"""
+        with self.lock:
+            index = self._check_index(index, allow_end=True)
+            new = [float(point[0]), float(point[1])]
+            n = len(self.points)
+            if n > 2:
+                prev, nxt = self.points[index - 1], self.points[index % n]
+                self._add_edge(prev, nxt, -1)
+                self._add_edge(prev, new, 1)
+                self._add_edge(new, nxt, 1)
+            self.points.insert(index, new)
+            self._sum_x += new[0]
+            self._sum_y += new[1]
+            if n <= 2:
+                self.resync()
+            self._finish_edit()
+
+    def delete_vertex(self, index: int):
+        """Remove vertex index"""
+        with self.lock:
+            index = self._check_index(index)
+            n = len(self.points)
+            old = self.points[index]
+            if n > 2:
+                prev, nxt = self.points[index - 1], self.points[(index + 1) % n]
+                self._add_edge(prev, old, -1)
+                self._add_edge(old, nxt, -1)
+                self._add_edge(prev, nxt, 1)
+            del self.points[index]
+            self._sum_x -= old[0]
+            self._sum_y -= old[1]
+            if n <= 2:
+                self.resync()
+            self._finish_edit()
+
+    def apply(self, edit: Dict[str, Any]):
+        """
+        Apply one edit message
+
+        Args:
+            edit: {"op": "move" | "insert" | "delete" | "replace", "index": int, "point": [x, y]}
+                ("replace" takes "points" and swaps in a whole new polygon)
+        """
+        with self.lock:
+            op = edit.get("op")
+            if op == "move":
+                self.move_vertex(edit.get("index"), edit["point"])
+            elif op == "insert":
+                self.insert_vertex(edit.get("index", len(self.points)), edit["point"])
+            elif op == "delete":
+                self.delete_vertex(edit.get("index"))
+            elif op == "replace":
+                points = edit.get("points") or []
+                self.points = as_point_array(points).tolist() if len(points) else []
+                self.resync()
+                self.revision += 1
+            else:
+                raise ValueError(f"Unknown edit op: {op}")
+
+    def measurements(self) -> Dict[str, Any]:
+        """Current area, perimeter and centroid (vertex mean, as in /measure/area)"""
+        with self.lock:
+            n = len(self.points)
+            result = {
+                "area_pixels": abs(self._cross_sum) / 2.0 if n >= 3 else 0.0,
+                "perimeter_pixels": self._perimeter if n >= 2 else 0.0,
+                "centroid": [self._sum_x / n, self._sum_y / n] if n else None,
+                "point_count": n,
+                "revision": self.revision
+            }
+            if self.scale_pixels_per_mm:
+                result["area_mm2"] = result["area_pixels"] / (self.scale_pixels_per_mm ** 2)
+                result["perimeter_mm"] = result["perimeter_pixels"] / self.scale_pixels_per_mm
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Vertices and measurements of one revision"""
+        with self.lock:
+            return {"points": [list(p) for p in self.points], **self.measurements()}
+
+
+class PolygonEditorManager:
+    """Registry of open editable polygons"""
+
+    def __init__(self, max_polygons: int = 64):
+        self.max_polygons = max_polygons
+        self._polygons: Dict[str, EditablePolygon] = {}
+        self._lock = threading.Lock()
+
+    def open(self, points: Optional[List[List[float]]] = None,
+             scale_pixels_per_mm: Optional[float] = None) -> str:
+        """Open a new editable polygon and return its ID"""
+        polygon = EditablePolygon(points, scale_pixels_per_mm)
+        polygon_id = str(uuid.uuid4())
+        with self._lock:
+            if len(self._polygons) >= self.max_polygons:
+                # Drop the oldest polygon; editors that were abandoned without closing
+                oldest = next(iter(self._polygons))
+                del self._polygons[oldest]
+                logger.info(f"Closed stale editable polygon {oldest}")
+            self._polygons[polygon_id] = polygon
+        return polygon_id
+
+    def get(self, polygon_id: str) -> EditablePolygon:
+        """Get an open polygon, KeyError if it is not open"""
+        with self._lock:
+            return self._polygons[polygon_id]
+
+    def close(self, polygon_id: str) -> bool:
+        """Close a polygon, returns False if it was not open"""
+        with self._lock:
+            return self._polygons.pop(polygon_id, None) is not None
+
+
+# Global editor registry
+polygon_editor_manager = PolygonEditorManager()
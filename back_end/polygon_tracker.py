@@ -0,0 +1,252 @@
+import cv2
+import numpy as np
+import os
+import time
+import uuid
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+from measurement_engine import measure_frame_annotations
+
+logger = logging.getLogger(__name__)
+
+# Pyramidal Lucas-Kanade parameters
+LK_PARAMS = dict(
+    winSize=(21, 21),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+)
+
+ANNOTATION_TYPES = ("angles", "distances", "areas")
+
+
+class TrackingJob:
+    """State of one background tracking run"""
+
+    def __init__(self, video_path: str, start_frame: int, end_frame: int,
+                 annotations: Dict[str, Dict[str, List[List[float]]]],
+                 scale_pixels_per_mm: Optional[float] = None):
+        self.job_id = str(uuid.uuid4())
+        self.video_path = video_path
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.annotations = annotations
+        self.scale_pixels_per_mm = scale_pixels_per_mm
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.error: Optional[str] = None
+        self.results: List[Dict[str, Any]] = []
+        self.total_frames = end_frame - start_frame + 1
+        self.cancel_event = threading.Event()
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed")
+
+    def summary(self) -> Dict[str, Any]:
+        """Job status without the per-frame results"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "start_frame": self.start_frame,
+            "end_frame": self.end_frame,
+            "frames_done": len(self.results),
+            "total_frames": self.total_frames,
+            "progress": len(self.results) / self.total_frames if self.total_frames else 1.0
+        }
+
+
+def flatten_annotations(annotations: Dict[str, Dict[str, List[List[float]]]]) -> Tuple[np.ndarray, List[Tuple[str, str, int, int]]]:
+    """
+    Stack every annotation point into one array for a single optical flow call
+
+    Returns:
+        Tuple of (points (P, 1, 2) float32, layout of (type, key, start, stop) slices)
+    """
+    chunks = []
+    layout = []
+    offset = 0
+    for annotation_type in ANNOTATION_TYPES:
+        for key, points in (annotations.get(annotation_type) or {}).items():
+            pts = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+            chunks.append(pts)
+            layout.append((annotation_type, key, offset, offset + len(pts)))
+            offset += len(pts)
+    if not chunks:
+        raise ValueError("No annotations to track")
+    return np.concatenate(chunks).reshape(-1, 1, 2), layout
+
+
+def unflatten_annotations(points: np.ndarray, layout: List[Tuple[str, str, int, int]]) -> Dict[str, Dict[str, List[List[float]]]]:
+    """Inverse of flatten_annotations"""
+    flat = points.reshape(-1, 2).astype(np.float64)
+    annotations = {annotation_type: {} for annotation_type in ANNOTATION_TYPES}
+    for annotation_type, key, start, stop in layout:
+        annotations[annotation_type][key] = flat[start:stop].tolist()
+    return annotations
+
+
+class PolygonTracker:
+    """
+    Propagates annotated points across a frame range with pyramidal Lucas-Kanade
+    optical flow and measures every frame.
+
+    Each job runs in its own background thread and decodes the range in one sequential
+    pass (a single seek to the start frame). Per-frame results are appended as they are
+    produced, so callers can poll or stream them while the job is still running.
+    """
+
+    def __init__(self, formula_fn: Optional[Callable[[dict], dict]] = None, max_jobs: int = 16):
+        self.formula_fn = formula_fn
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, TrackingJob] = {}
+        self._lock = threading.Lock()
+
+    def start(self, video_path: str, start_frame: int, end_frame: int,
+              annotations: Dict[str, Dict[str, List[List[float]]]],
+              scale_pixels_per_mm: Optional[float] = None) -> str:
+        """
+        Start a tracking job in the background
+
+        Args:
+            video_path: Video to track through
+            start_frame: Frame the annotations were drawn on
+            end_frame: Last frame to track to (inclusive)
+            annotations: {"angles": {...}, "distances": {...}, "areas": {...}} point lists
+            scale_pixels_per_mm: Optional calibration for mm values
+
+        Returns:
+            str: Job ID
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Cannot find video file: {video_path}")
+        if start_frame < 0 or end_frame < start_frame:
+            raise ValueError("end_frame must be >= start_frame >= 0")
+        # Validate the annotations up front rather than failing inside the thread
+        flatten_annotations(annotations)
+        measure_frame_annotations(
+            annotations.get("angles"), annotations.get("distances"), annotations.get("areas")
+        )
+
+        job = TrackingJob(video_path, start_frame, end_frame, annotations, scale_pixels_per_mm)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        thread = threading.Thread(target=self._run, args=(job,), daemon=True, name=f"tracking-{job.job_id[:8]}")
+        thread.start()
+        logger.info(f"Started tracking job {job.job_id} for frames {start_frame}-{end_frame}")
+        return job.job_id
+
+    def get(self, job_id: str) -> TrackingJob:
+        """Get a job, KeyError if unknown"""
+        with self._lock:
+            return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation, returns False if the job had already finished"""
+        job = self.get(job_id)
+        if job.done:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def _prune(self):
+        """Forget the oldest finished jobs once over max_jobs"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        while len(self._jobs) >= self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    def _measure(self, job: TrackingJob, frame_idx: int, timestamp: float,
+                 points: np.ndarray, layout, tracked: np.ndarray) -> Dict[str, Any]:
+        """
+        Measurements and formulas for the tracked points of one frame
+
+        tracked marks the points followed without loss since the start frame; polygon
+        perimeters are reported alongside the measurements (and in mm with a scale).
+        """
+        annotations = unflatten_annotations(points, layout)
+        result = {
+            "frame_idx": frame_idx,
+            "timestamp": timestamp,
+            "annotations": annotations,
+            "tracked_fraction": float(tracked.mean()) if tracked.size else 1.0
+        }
+        try:
+            measured = measure_frame_annotations(
+                annotations["angles"], annotations["distances"], annotations["areas"],
+                scale_pixels_per_mm=job.scale_pixels_per_mm
+            )
+            result["measurements"] = measured["measurements"]
+            result["formulas"] = self.formula_fn(measured["measurements"]) if self.formula_fn else {}
+            areas = measured["details"]["areas"]
+            result["perimeters"] = {key: area["perimeter_pixels"] for key, area in areas.items()}
+            if job.scale_pixels_per_mm:
+                result["areas_mm2"] = {key: area["area_mm2"] for key, area in areas.items()}
+                result["perimeters_mm"] = {key: area["perimeter_mm"] for key, area in areas.items()}
+        except ValueError as e:
+            # Tracked points can collapse (e.g. an angle arm of zero length); keep going
+            result["measurements"] = {}
+            result["formulas"] = {}
+            result["perimeters"] = {}
+            result["error"] = str(e)
+        return result
+
+    def _run(self, job: TrackingJob):
+        cap = cv2.VideoCapture(job.video_path)
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Cannot open video file: {job.video_path}")
+            job.status = "running"
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if frame_count > 0 and job.start_frame >= frame_count:
+                raise ValueError(f"start_frame {job.start_frame} is past the end of the video "
+                                 f"({frame_count} frames)")
+            if frame_count > 0 and job.end_frame >= frame_count:
+                job.end_frame = frame_count - 1
+                job.total_frames = job.end_frame - job.start_frame + 1
+
+            points, layout = flatten_annotations(job.annotations)
+            tracked = np.ones(len(points), dtype=bool)
+            prev_gray = None
+
+            cap.set(cv2.CAP_PROP_POS_FRAMES, job.start_frame)
+            for frame_idx in range(job.start_frame, job.end_frame + 1):
+                if job.cancel_event.is_set():
+                    job.status = "cancelled"
+                    logger.info(f"Tracking job {job.job_id} cancelled at frame {frame_idx}")
+                    return
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    if not job.results:
+                        # The container's frame count was missing or wrong
+                        raise ValueError(f"start_frame {job.start_frame} is past the end of the video")
+                    logger.warning(f"Tracking job {job.job_id}: video ended at frame {frame_idx}")
+                    job.end_frame = frame_idx - 1
+                    job.total_frames = len(job.results)
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+                if prev_gray is not None:
+                    new_points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None, **LK_PARAMS)
+                    found = status.reshape(-1).astype(bool)
+                    # Points the flow lost stay where they were last seen and no longer count as
+                    # tracked, even if a later frame matches their stale position again
+                    points = np.where(found[:, None, None], new_points, points).astype(np.float32)
+                    tracked &= found
+                prev_gray = gray
+
+                job.results.append(self._measure(job, frame_idx, frame_idx / fps, points, layout, tracked))
+
+            job.status = "completed"
+            logger.info(f"Tracking job {job.job_id} completed ({len(job.results)} frames)")
+        except Exception as e:
+            logger.error(f"Tracking job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            cap.release()
+            job.finished_at = time.time()
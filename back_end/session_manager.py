@@ -4,7 +4,10 @@ import os
 from datetime import datetime
 import tempfile
 import logging
-from eilomea_measurement_engine import calculate_p_factor, calculate_c_factor, calculate_supraglottic_area_ratio_1, calculate_supraglottic_area_ratio_2
+import numpy as np
+from formula_graph import formula_graph
+from baseline_comparison_engine import BaselineComparisonEngine, to_float
+from measurement_table import MeasurementTable
 
 MEASUREMENT_KEYS = [
     "angle_a", "angle_b",
@@ -12,12 +15,18 @@ MEASUREMENT_KEYS = [
     "area_a", "area_b", "area_av", "area_bv"
 ]
 
-FORMULA_KEYS = [
-    "p_factor", "c_factor",
-    "distance_ratio_1", "distance_ratio_2", "distance_ratio_3", "distance_ratio_4",
-    "supraglottic_area_ratio_1", "supraglottic_area_ratio_2"
+# Defined by the formula registry in formula_graph
+FORMULA_KEYS = list(formula_graph.keys)
+
+# Fields that can be requested from the bulk frame details lookup
+FRAME_DETAIL_FIELDS = [
+    "frame_id", "timestamp", "frame_idx", "custom_name",
+    "measurements", "formulas", "created_at"
 ]
 
+# Values compared against the baseline frame (raw areas and distances are not compared)
+BASELINE_COMPARISON_MEASUREMENT_KEYS = ["angle_a", "angle_b"]
+
 class SingleSessionManager:
     """
     Simple session manager for single active session.
@@ -26,6 +35,8 @@ class SingleSessionManager:
 
     def __init__(self):
         self.current_session = None
+        self.comparison_engine = BaselineComparisonEngine(BASELINE_COMPARISON_MEASUREMENT_KEYS, FORMULA_KEYS)
+        self.measurement_table = MeasurementTable(MEASUREMENT_KEYS, FORMULA_KEYS)
         # Create a temporary directory for session files
         import tempfile
         self.session_temp_dir = tempfile.mkdtemp(prefix="rnsh_session_")
@@ -51,8 +62,12 @@ class SingleSessionManager:
             "analysis_type": None,
             "current_timestamp": 0.0, # Current frame position in seconds
             "current_frame_idx": 0, # Current frame number
-            "is_paused": True # Whether video is currently paused
+            "is_paused": True, # Whether video is currently paused
+            "revision": 0, # Bumped on every change to measured frames or baseline
+            "measurement_revision": 0 # Bumped only when measurement/formula values change
         }
+        self.comparison_engine.invalidate()
+        self.measurement_table.clear()
 
         return session_id
 
@@ -93,8 +108,16 @@ class SingleSessionManager:
         }
         
         self.current_session["measured_frames"].append(complete_frame_data)
+        self.measurement_table.add_frame(complete_frame_data)
+        self._bump_revision(measurements_changed=True)
         return frame_id
 
+    def _bump_revision(self, measurements_changed: bool = False):
+        """Record a mutation of the current session"""
+        self.current_session["revision"] += 1
+        if measurements_changed:
+            self.current_session["measurement_revision"] += 1
+
     def check_frame_exists(self, frame_idx: int) -> dict | None:
         """Check if a frame with the given frame_idx already exists"""
         if not self.current_session:
@@ -105,6 +128,70 @@ class SingleSessionManager:
                 return frame
         return None
 
+    def get_frames_details(self, frame_ids: Optional[List[str]] = None,
+                           fields: Optional[List[str]] = None) -> List[dict]:
+        """
+        Get details for all (or the selected) measured frames in one pass
+
+        Args:
+            frame_ids: Frame IDs to return, in the requested order. All frames when None
+            fields: Subset of FRAME_DETAIL_FIELDS to include. frame_id is always included
+
+        Returns:
+            List of frame dicts referencing the stored measurement/formula dicts (not copies)
+        """
+        if not self.current_session:
+            raise ValueError("No active session")
+
+        if fields is None:
+            fields = FRAME_DETAIL_FIELDS
+        elif unknown := [f for f in fields if f not in FRAME_DETAIL_FIELDS + ["baseline_comparisons"]]:
+            raise KeyError(f"Unknown frame fields: {', '.join(unknown)}")
+        projection = ["frame_id"] + [f for f in fields if f not in ("frame_id", "baseline_comparisons")]
+
+        frames = self.current_session["measured_frames"]
+        if frame_ids is not None:
+            frames_by_id = {frame["frame_id"]: frame for frame in frames}
+            if missing := [fid for fid in frame_ids if fid not in frames_by_id]:
+                raise LookupError(f"Frames not found: {', '.join(missing)}")
+            frames = [frames_by_id[fid] for fid in frame_ids]
+
+        details = [{field: frame.get(field) for field in projection} for frame in frames]
+
+        if "baseline_comparisons" in fields:
+            try:
+                comparisons = self.get_baseline_comparisons()
+            except ValueError:
+                # No baseline set, or the baseline frame has been removed
+                comparisons = {}
+            for detail in details:
+                detail["baseline_comparisons"] = comparisons.get(detail["frame_id"])
+
+        return details
+
+    def get_baseline_comparisons(self, baseline_frame_id: Optional[str] = None) -> Dict[str, Optional[dict]]:
+        """
+        Get percent-of-baseline and percent-change values for every measured frame
+
+        Args:
+            baseline_frame_id: Frame to compare against, defaults to the session baseline
+
+        Returns:
+            Dict mapping frame_id to its comparisons (None for the baseline frame itself)
+        """
+        if not self.current_session:
+            raise ValueError("No active session")
+
+        baseline_frame_id = baseline_frame_id or self.current_session["baseline_frame_id"]
+        if not baseline_frame_id:
+            raise ValueError("No baseline frame set")
+
+        return self.comparison_engine.compare(
+            self.current_session["measured_frames"],
+            baseline_frame_id,
+            self.current_session["measurement_revision"]
+        )
+
     def remove_measured_frame(self, frame_id: str) -> bool:
         """Remove a measured frame from the session"""
         if not self.current_session:
@@ -116,7 +203,11 @@ class SingleSessionManager:
             if frame["frame_id"] != frame_id
         ]
         
-        return len(self.current_session["measured_frames"]) < original_count
+        removed = len(self.current_session["measured_frames"]) < original_count
+        if removed:
+            self.measurement_table.remove_frame(frame_id)
+            self._bump_revision(measurements_changed=True)
+        return removed
 
     def update_frame_custom_name(self, frame_id: str, custom_name: str) -> bool:
         """Update the custom name of a measured frame"""
@@ -126,14 +217,74 @@ class SingleSessionManager:
         for frame in self.current_session["measured_frames"]:
             if frame["frame_id"] == frame_id:
                 frame["custom_name"] = custom_name
+                self._bump_revision()
                 return True
         return False
 
+    def update_frame_measurements(self, frame_id: str, measurements: dict) -> dict:
+        """
+        Update some measurements of a frame and recompute only the formulas that depend on them
+
+        Args:
+            frame_id: Frame to update
+            measurements: Changed measurement values (None clears a measurement)
+
+        Returns:
+            dict: The frame's formulas after the update
+        """
+        if not self.current_session:
+            raise ValueError("No active session")
+        if unknown := set(measurements) - set(MEASUREMENT_KEYS):
+            raise KeyError(f"Unknown measurement keys: {', '.join(sorted(unknown))}")
+
+        frame = next((f for f in self.current_session["measured_frames"] if f["frame_id"] == frame_id), None)
+        if frame is None:
+            raise LookupError(f"Frame not found: {frame_id}")
+
+        frame["measurements"].update(measurements)
+        affected = formula_graph.downstream(measurements)
+        if affected:
+            values = {**frame["formulas"], **frame["measurements"]}
+            updated = formula_graph.evaluate(values, only=affected)
+            for name in affected:
+                frame["formulas"][name] = updated.get(name)
+        self.measurement_table.update_frame(frame)
+        self._bump_revision(measurements_changed=True)
+        return frame["formulas"]
+
+    def recalculate_formulas(self) -> int:
+        """
+        Recompute the formulas of every measured frame in one vectorized pass
+        (e.g. after the formula registry changes)
+
+        Returns:
+            int: Number of frames updated
+        """
+        if not self.current_session:
+            raise ValueError("No active session")
+        frames = self.current_session["measured_frames"]
+        if not frames:
+            return 0
+
+        columns = {
+            key: np.array([to_float(f["measurements"].get(key)) for f in frames], dtype=np.float64)
+            for key in formula_graph.inputs()
+        }
+        results = formula_graph.evaluate_columns(columns)
+        for name, column in results.items():
+            for frame, value in zip(frames, column.tolist()):
+                frame["formulas"][name] = value if np.isfinite(value) else None
+        for frame in frames:
+            self.measurement_table.update_frame(frame)
+        self._bump_revision(measurements_changed=True)
+        return len(frames)
+
     def set_baseline_frame(self, frame_id: str):
         """Set baseline frame for current session"""
         if not self.current_session:
             raise ValueError("No active session")
         self.current_session["baseline_frame_id"] = frame_id
+        self._bump_revision()
     
 
     def get_frame_thumbnail(self, frame_id: str) -> bytes:
@@ -218,42 +369,26 @@ class SingleSessionManager:
     #         frame["percentage_closure"] = percentage_closure
 
 
+    def get_statistics(self, keys: Optional[List[str]] = None) -> dict:
+        """
+        Session-wide aggregates (count, mean, SD, min, max) of every measurement and formula
+
+        Served from the running aggregates of the measurement table, so the cost does not
+        depend on the number of measured frames.
+        """
+        if not self.current_session:
+            raise ValueError("No active session")
+        if keys and (unknown := set(keys) - set(self.measurement_table.keys)):
+            raise KeyError(f"Unknown keys: {', '.join(sorted(unknown))}")
+        return {
+            "frame_count": len(self.measurement_table),
+            "revision": self.current_session["measurement_revision"],
+            "statistics": self.measurement_table.statistics(keys)
+        }
+
     def calculate_formulas(self, measurements: dict) -> dict:
         """Calculate formulas from provided measurements"""
-        formulas = {}
-        try:
-            # P-Factor: Area A / Distance A
-            if measurements.get("area_a") and measurements.get("distance_a"):
-                formulas["p_factor"] = calculate_p_factor(
-                    measurements["area_a"], measurements["distance_a"]
-                )
-            # C-Factor: Area BV / (Area AV + Area BV)
-            if measurements.get("area_bv") and measurements.get("area_av"):
-                formulas["c_factor"] = calculate_c_factor(
-                    measurements["area_bv"], measurements["area_av"]
-                )
-            # Distance Ratios
-            if measurements.get("distance_g") and measurements.get("distance_a"):
-                formulas["distance_ratio_1"] = measurements["distance_g"] / measurements["distance_a"]
-            if measurements.get("distance_g") and measurements.get("distance_c"):
-                formulas["distance_ratio_2"] = measurements["distance_g"] / measurements["distance_c"]
-            if measurements.get("distance_h") and measurements.get("distance_a"):
-                formulas["distance_ratio_3"] = measurements["distance_h"] / measurements["distance_a"]
-            if measurements.get("distance_h") and measurements.get("distance_c"):
-                formulas["distance_ratio_4"] = measurements["distance_h"] / measurements["distance_c"]
-        
-            # Supraglottic Area Ratios
-            if measurements.get("area_b") and measurements.get("distance_a"):
-                formulas["supraglottic_area_ratio_1"] = calculate_supraglottic_area_ratio_1(
-                    measurements["area_b"], measurements["distance_a"]
-                )
-            if measurements.get("area_b") and measurements.get("distance_a") and measurements.get("distance_c"):
-                formulas["supraglottic_area_ratio_2"] = calculate_supraglottic_area_ratio_2(
-                    measurements["area_b"], measurements["distance_a"], measurements["distance_c"]
-                )
-        except Exception as e:
-            print(f"Error calculating formulas: {e}")
-        return formulas
+        return formula_graph.evaluate(measurements)
 
     def clear_current_session(self):
         """Clear current session and clean up files"""
@@ -271,6 +406,8 @@ class SingleSessionManager:
         
         # Clear from memory
         self.current_session = None
+        self.comparison_engine.invalidate()
+        self.measurement_table.clear()
     
 
     def __del__(self):
@@ -285,4 +422,5 @@ class SingleSessionManager:
 
 
 # Global single session manager
-session_manager = SingleSessionManager()
\ No newline at end of file
+session_manager = SingleSessionManager()
+
@@ -0,0 +1,198 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import io
+import time
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+import batch_processing
+from batch_processing import BatchJobManager, FileResult, SUMMARY_FILENAME, list_recordings, run_batch
+
+
+def write_recording(path, seconds=120, fs=200, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * fs) / fs
+    flow = np.sin(2 * np.pi * 0.25 * t) + rng.normal(0, 0.1, len(t))
+    df = pd.DataFrame({"Flow_Filtered": flow})
+    for col in ["R5", "X5", "R11", "X11", "R19", "X19"]:
+        df[col] = rng.normal(size=len(t))
+    df["#"] = np.arange(len(t))
+    df["Volume"] = np.cumsum(flow) / fs
+    df.to_csv(path, sep="\t", index=False)
+    return path
+
+
+@pytest.fixture
+def cohort(tmp_path):
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+    write_recording(recordings / "a.csv")
+    write_recording(recordings / "b.csv", seed=1)
+    (recordings / "broken.csv").write_text("not\ta recording\n")
+    (recordings / "notes.txt").write_text("ignored")
+    return recordings
+
+
+def wait_for(manager, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while not manager.get(job_id).done:
+        assert time.time() < deadline, "batch did not finish"
+        time.sleep(0.05)
+    return manager.get(job_id)
+
+
+class TestBatchProcessing:
+    """Cohort processing writes per-file results and a summary, recording failures"""
+
+    def test_list_recordings(self, cohort, tmp_path):
+        other = tmp_path / "other"
+        other.mkdir()
+        write_recording(other / "a.csv")
+        recordings = list_recordings([cohort, other / "a.csv"])
+        assert list(recordings) == ["a", "b", "broken", "a_2"]
+        assert recordings["a_2"] == other / "a.csv"
+        with pytest.raises(FileNotFoundError):
+            list_recordings([tmp_path / "missing"])
+
+    def test_failure_does_not_abort_batch(self, cohort, tmp_path):
+        seen = []
+        report = run_batch([cohort], tmp_path / "out", n_jobs=1, on_result=seen.append)
+        assert [r.name for r in report.results] == ["a", "b", "broken"]
+        assert len(seen) == 3
+        assert [r.name for r in report.failed] == ["broken"]
+        assert report.failed[0].error.startswith("RuntimeError")
+
+        a = report.results[0]
+        assert a.status == "completed" and a.breaths > 10 and a.seconds > 0
+        assert a.worker == os.getpid()
+        assert 10 < a.metrics["breaths_per_minute"] < 20
+        assert len(pd.read_csv(os.path.join(a.output_dir, "breaths.csv"))) == a.breaths
+        assert len(pd.read_csv(os.path.join(a.output_dir, "features.csv"))) == 7 * a.breaths
+
+        summary = pd.read_csv(tmp_path / "out" / SUMMARY_FILENAME)
+        assert list(summary["name"]) == ["a", "b", "broken"]
+        assert list(summary["status"]) == ["completed", "completed", "failed"]
+        assert "R5_TOTAL_mean" in summary and "metrics" not in summary
+        assert np.isnan(summary["R5_TOTAL_mean"].iloc[2])
+
+    def test_process_pool(self, cohort, tmp_path):
+        report = run_batch([cohort], tmp_path / "out", n_jobs=2)
+        a, b, broken = report.results
+        assert [r.name for r in report.results] == ["a", "b", "broken"]
+        assert a.status == b.status == "completed"
+        assert a.breaths > 10 and b.breaths > 10
+        assert broken.status == "failed"
+        # Every recording ran in a pool worker that had been through warm_up
+        assert all(r.worker != os.getpid() and r.warmed_up for r in report.results)
+        summary = pd.read_csv(tmp_path / "out" / SUMMARY_FILENAME)
+        assert list(summary["breaths"][:2]) == [a.breaths, b.breaths]
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_cancel_stops_batch(self, cohort, tmp_path, n_jobs):
+        cancel = threading.Event()
+        report = run_batch([cohort], tmp_path / "out", n_jobs=n_jobs, on_result=lambda r: cancel.set(),
+                           cancel=cancel)
+        assert len(report.results) == 1
+        assert not (tmp_path / "out" / SUMMARY_FILENAME).exists()
+
+    def test_shutdown_does_not_wait_for_running_batch(self, cohort, monkeypatch):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_recording(name, path, output_dir):
+            started.set()
+            release.wait(10)
+            return FileResult(name, str(path), "completed", 0.0, os.getpid())
+
+        monkeypatch.setattr(batch_processing, "process_recording", slow_recording)
+        manager = BatchJobManager(recordings_root=str(cohort))
+        job_id = manager.submit([str(cohort)], n_jobs=1)
+        assert started.wait(10)
+        start = time.perf_counter()
+        manager.shutdown()
+        assert time.perf_counter() - start < 1
+        release.set()
+        job = wait_for(manager, job_id)
+        assert job.status == "cancelled"
+        assert len(job.results) == 1
+
+    def test_manager_temporary_output_root(self, cohort, tmp_path, monkeypatch):
+        monkeypatch.setattr(batch_processing.tempfile, "tempdir", str(tmp_path))
+        manager = BatchJobManager(recordings_root=str(cohort))
+        assert manager.output_root is None
+        job = wait_for(manager, manager.submit([str(cohort / "a.csv")], n_jobs=1))
+        assert job.status == "completed"
+        assert job.output_dir.startswith(manager.output_root)
+        manager.shutdown()
+        assert not os.path.exists(manager.output_root)
+
+
+class TestBatchEndpoints:
+    """Background batch jobs over HTTP"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        manager = BatchJobManager(output_root=str(tmp_path / "batches"), recordings_root=str(tmp_path))
+        monkeypatch.setattr(batch_processing, "batch_job_manager", manager)
+        import api.batch_api as batch_api
+        monkeypatch.setattr(batch_api, "batch_job_manager", manager)
+        yield TestClient(app), manager
+        manager.shutdown()
+
+    def test_batch_job(self, client, cohort):
+        client, manager = client
+        response = client.post("/batch/", json={"paths": [str(cohort)], "n_jobs": 1})
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+        assert response.json()["total_files"] == 3
+
+        wait_for(manager, job_id)
+        body = client.get(f"/batch/{job_id}").json()
+        assert body["status"] == "completed"
+        assert body["files_done"] == 3 and body["files_failed"] == 1
+        assert {r["name"]: r["status"] for r in body["results"]}["broken"] == "failed"
+
+        summary = client.get(f"/batch/{job_id}/summary")
+        assert summary.status_code == 200
+        assert len(pd.read_csv(io.BytesIO(summary.content))) == 3
+
+    def test_batch_errors(self, client, tmp_path):
+        client, _ = client
+        assert client.post("/batch/", json={"paths": [str(tmp_path / "missing")]}).status_code == 404
+        (tmp_path / "empty").mkdir()
+        assert client.post("/batch/", json={"paths": [str(tmp_path / "empty")]}).status_code == 400
+        assert client.get("/batch/unknown").status_code == 404
+        assert client.get("/batch/unknown/summary").status_code == 404
+
+    def test_batch_paths_limited_to_recordings_root(self, client, cohort, tmp_path_factory):
+        client, manager = client
+        outside = tmp_path_factory.mktemp("outside")
+        write_recording(outside / "c.csv")
+        assert client.post("/batch/", json={"paths": [str(outside)]}).status_code == 403
+        assert client.post("/batch/", json={"paths": [str(cohort / ".." / ".." / outside.name)]}).status_code == 403
+        (cohort / "link.csv").symlink_to(outside / "c.csv")
+        assert client.post("/batch/", json={"paths": [str(cohort)]}).status_code == 403
+
+        manager.recordings_root = None
+        assert client.post("/batch/", json={"paths": [str(cohort / "a.csv")]}).status_code == 403
+
+    def test_batch_output_dir_not_accepted(self, client, cohort, tmp_path):
+        client, manager = client
+        response = client.post("/batch/", json={"paths": [str(cohort / "a.csv")], "n_jobs": 1,
+                                                "output_dir": str(tmp_path / "elsewhere")})
+        assert response.json()["output_dir"].startswith(manager.output_root)
+        wait_for(manager, response.json()["job_id"])
+        assert not (tmp_path / "elsewhere").exists()
+
+    def test_app_shutdown_stops_batches(self, monkeypatch):
+        import main
+        stopped = []
+        monkeypatch.setattr(main.batch_job_manager, "shutdown", lambda: stopped.append(True))
+        monkeypatch.setattr(main.export_job_manager, "shutdown", lambda: None)
+        with TestClient(app):
+            assert stopped == []
+        assert stopped == [True]
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from importlib.metadata import version
+import numpy as np
+import pandas as pd
+import pytest
+import Resp_Analysis.main_proc as main_proc
+
+
+def make_recording(seconds=600, fs=200):
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * fs) / fs
+    flow = np.sin(2 * np.pi * 0.25 * t) * (1 + 0.3 * np.sin(t / 13)) + rng.normal(0, 0.1, len(t))
+    df = pd.DataFrame({"Flow_Filtered": flow}, index=pd.Index(np.arange(len(t)), name="#"))
+    for col in ["R5", "X5", "R11", "X11", "R19", "X19"]:
+        df[col] = rng.normal(size=len(t))
+    df["Volume"] = np.cumsum(flow) / fs
+    return df
+
+
+def write_recording(path, df):
+    df.to_csv(path, sep="\t")
+    return str(path)
+
+
+@pytest.mark.skipif(version("physio") != "0.2.0", reason="segmentation targets the pinned physio 0.2.0")
+class TestChunkedProcessing:
+    """Windowed processing: in-memory results for one window, independent of read size otherwise"""
+
+    def test_single_window_matches_in_memory(self):
+        df = make_recording()
+        _, vis_df, _, breaths = main_proc.process_dataframe("rec", df, chunk_seconds=0)
+        _, chunked_vis_df, _, chunked_breaths = main_proc.process_dataframe("rec", df, chunk_seconds=600)
+        assert len(breaths) > 100
+        pd.testing.assert_frame_equal(chunked_breaths, breaths, check_exact=False, rtol=1e-9)
+        pd.testing.assert_frame_equal(chunked_vis_df, vis_df, check_exact=False, rtol=1e-9)
+
+    def test_stream_does_not_depend_on_read_size(self):
+        df = make_recording()
+        expected = [pd.concat(parts, ignore_index=True) for parts in zip(*main_proc.iter_process_chunks(df, 45))]
+        for rows in (500, 20000):
+            chunks = (df.iloc[start:start + rows] for start in range(0, len(df), rows))
+            pieces = list(main_proc.iter_process_stream(chunks, 45))
+            for got, want in zip((pd.concat(parts, ignore_index=True) for parts in zip(*pieces)), expected):
+                pd.testing.assert_frame_equal(got, want)
+
+    def test_iter_process_chunks_numbers_breaths_across_chunks(self):
+        pieces = list(main_proc.iter_process_chunks(make_recording(), chunk_seconds=45))
+        assert len(pieces) > 5
+        index = np.concatenate([merged["breath_index"].to_numpy() for _, merged in pieces])
+        np.testing.assert_array_equal(index, np.arange(1, len(index) + 1))
+
+    def test_long_recordings_are_chunked(self, monkeypatch):
+        monkeypatch.setattr(main_proc, "LONG_RECORDING_SECONDS", 60)
+        calls = []
+        original = main_proc.iter_process_chunks
+        monkeypatch.setattr(main_proc, "iter_process_chunks", lambda *a: calls.append(a) or original(*a))
+        main_proc.process_dataframe("rec", make_recording(seconds=120))
+        assert calls and calls[0][1] == main_proc.CHUNK_SECONDS
+
+    def test_process_file_streams_long_csv(self, tmp_path, monkeypatch):
+        df = make_recording(seconds=120)
+        path = write_recording(tmp_path / "rec.csv", df)
+
+        monkeypatch.setattr(main_proc, "LONG_RECORDING_SECONDS", 60)
+        monkeypatch.setattr(main_proc, "CHUNK_SECONDS", 30)
+        monkeypatch.setattr(main_proc, "_load_df", lambda *a: pytest.fail("long recording loaded whole"))
+        name, vis_df, samples, breaths = main_proc.process_file(path)
+        assert (name, samples) == ("rec", len(df))
+        assert len(breaths) > 20
+        assert vis_df["BREATH_INDEX"].max() == len(breaths)
+
+    def test_process_file_loads_short_csv(self, tmp_path):
+        df = make_recording(seconds=60)
+        path = write_recording(tmp_path / "rec.csv", df)
+        assert not main_proc.is_long_recording(path)
+        _, _, samples, breaths = main_proc.process_file(path)
+        assert samples == len(df)
+        assert len(breaths) > 5
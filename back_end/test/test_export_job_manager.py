@@ -0,0 +1,195 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import io
+import time
+import threading
+import openpyxl
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+import export_job_manager
+from export_job_manager import ExportJobManager
+from session_manager import session_manager
+
+
+def make_frames(n):
+    return [
+        {"frame_id": f"frame-{i}", "frame_idx": i, "timestamp": i / 10, "custom_name": f"Frame {i}",
+         "measurements": {"angle_a": 40.0 + i}, "formulas": {}, "baseline_comparisons": {},
+         "is_baseline": i == 0}
+        for i in range(n)
+    ]
+
+
+def wait_for(manager, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while not manager.get(job_id).done:
+        assert time.time() < deadline, "export job did not finish"
+        time.sleep(0.01)
+    return manager.get(job_id)
+
+
+class BlockingSessionManager:
+    """Thumbnail source that holds the export on its first frame until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def get_frame_thumbnail(self, frame_id):
+        self.started.set()
+        self.release.wait(10)
+        return None
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ExportJobManager(max_workers=1, max_artifacts=2, artifact_dir=str(tmp_path))
+    yield manager
+    manager.shutdown()
+
+
+class TestExportJobManager:
+    """Test background export jobs and the artifact cache"""
+
+    def test_export_completes(self, manager):
+        job = wait_for(manager, manager.submit(make_frames(3), "frame-0"))
+        assert job.status == "completed"
+        assert job.frames_done == 3 and job.summary()["progress"] == 1.0
+        assert not job.cached
+        sheet = openpyxl.load_workbook(manager.artifact_path(job.job_id)).active
+        assert sheet["B5"].value == 3
+
+    def test_same_inputs_served_from_cache(self, manager):
+        frames = make_frames(2)
+        first = wait_for(manager, manager.submit(frames, "frame-0"))
+        second = manager.get(manager.submit(frames, "frame-0"))
+        assert second.status == "completed" and second.cached
+        assert manager.artifact_path(second.job_id) == manager.artifact_path(first.job_id)
+
+        frames[1]["measurements"]["angle_a"] = 99.0
+        third = wait_for(manager, manager.submit(frames, "frame-0"))
+        assert not third.cached
+        assert third.path != first.path
+
+    def test_cache_key_tracks_revision(self):
+        frames = make_frames(2)
+        key = ExportJobManager.cache_key("session", 3, "frame-0", frames)
+        assert key == ExportJobManager.cache_key("session", 3, "frame-0", make_frames(2))
+        assert key != ExportJobManager.cache_key("session", 4, "frame-0", frames)
+        assert key != ExportJobManager.cache_key("session", 3, "frame-1", frames)
+
+    def test_submission_is_a_snapshot(self, manager):
+        blocker = BlockingSessionManager()
+        frames = make_frames(2)
+        job_id = manager.submit(frames, "frame-0", session_manager=blocker)
+        assert blocker.started.wait(10)
+        frames[0]["custom_name"] = "Renamed"
+        blocker.release.set()
+        job = wait_for(manager, job_id)
+        sheet = openpyxl.load_workbook(job.path).active
+        assert sheet["A9"].value == "Frame 0 (Baseline)"
+        # The key describes the copy that was exported
+        assert job.cache_key == ExportJobManager.cache_key(None, None, "frame-0", make_frames(2))
+
+    def test_submission_keyed_by_session_revision(self, manager):
+        job = wait_for(manager, manager.submit(make_frames(2), "frame-0", session_id="session", revision=3))
+        assert job.cache_key == ExportJobManager.cache_key("session", 3, "frame-0", make_frames(2))
+
+    def test_cancel_running_and_queued(self, manager):
+        blocker = BlockingSessionManager()
+        running_id = manager.submit(make_frames(3), "frame-0", session_manager=blocker)
+        queued_id = manager.submit(make_frames(4), "frame-0")
+        assert blocker.started.wait(10)
+
+        assert manager.cancel(queued_id)
+        assert manager.get(queued_id).status == "cancelled"
+        assert manager.cancel(running_id)
+        blocker.release.set()
+        job = wait_for(manager, running_id)
+        assert job.status == "cancelled"
+        assert job.frames_done == 1
+        assert not manager.cancel(running_id)
+        with pytest.raises(ValueError):
+            manager.artifact_path(running_id)
+        assert not os.path.exists(os.path.join(manager.artifact_dir, f"{running_id}.xlsx"))
+
+    def test_duplicate_submission_joins_running_job(self, manager):
+        blocker = BlockingSessionManager()
+        frames = make_frames(2)
+        job_id = manager.submit(frames, "frame-0", session_manager=blocker)
+        assert manager.submit(frames, "frame-0", session_manager=blocker) == job_id
+        blocker.release.set()
+        wait_for(manager, job_id)
+
+    def test_artifact_eviction(self, manager):
+        jobs = [wait_for(manager, manager.submit(make_frames(n), "frame-0")) for n in (1, 2, 3)]
+        with pytest.raises(LookupError):
+            manager.artifact_path(jobs[0].job_id)
+        assert os.path.exists(manager.artifact_path(jobs[2].job_id))
+
+    def test_temporary_artifact_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(export_job_manager.tempfile, "tempdir", str(tmp_path))
+        manager = ExportJobManager(max_workers=1)
+        assert manager.artifact_dir is None
+        job = wait_for(manager, manager.submit(make_frames(1), "frame-0"))
+        assert job.path.startswith(manager.artifact_dir)
+        manager.shutdown()
+        assert not os.path.exists(manager.artifact_dir)
+
+    def test_failed_export(self, manager):
+        job = wait_for(manager, manager.submit([{"frame_id": "x", "timestamp": "not a number"}]))
+        assert job.status == "failed"
+        assert job.error
+
+
+class TestExportJobEndpoints:
+    """Test the export job API against the session"""
+
+    def test_session_export_roundtrip(self):
+        client = TestClient(app)
+        session_manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+        try:
+            first_id = session_manager.add_measured_frame({"frame_idx": 0, "timestamp": 0.0, "custom_name": "Frame 0", "measurements": {"angle_a": 40.0}, "formulas": {}})
+            session_manager.add_measured_frame({"frame_idx": 5, "timestamp": 0.2, "custom_name": "Frame 5", "measurements": {"angle_a": 44.0}, "formulas": {}})
+            session_manager.set_baseline_frame(first_id)
+
+            job = client.post("/session/export-jobs", json={}).json()
+            assert job["total_frames"] == 2
+            lines = client.get(f"/session/export-jobs/{job['job_id']}/stream").text.splitlines()
+            assert '"status":"completed"' in lines[-1]
+
+            response = client.get(f"/session/export-jobs/{job['job_id']}/download")
+            assert response.status_code == 200
+            sheet = openpyxl.load_workbook(io.BytesIO(response.content)).active
+            assert sheet["A9"].value.endswith("(Baseline)")
+            angle_rows = [row for row in sheet.iter_rows(max_col=4, values_only=True) if row[0] == "Angle A"]
+            assert angle_rows[0][3] == "N/A"
+            assert angle_rows[1][3] == pytest.approx(1.1)
+
+            again = client.post("/session/export-jobs", json={}).json()
+            assert again["cached"] and again["status"] == "completed"
+
+            session_manager.update_frame_custom_name(first_id, "Start")
+            changed = client.post("/session/export-jobs", json={}).json()
+            assert not changed["cached"]
+        finally:
+            session_manager.clear_current_session()
+
+    def test_app_shutdown_stops_exports(self, monkeypatch):
+        import main
+        stopped = []
+        monkeypatch.setattr(main.export_job_manager, "shutdown", lambda: stopped.append(True))
+        monkeypatch.setattr(main.batch_job_manager, "shutdown", lambda: None)
+        with TestClient(app):
+            assert stopped == []
+        assert stopped == [True]
+
+    def test_errors(self):
+        client = TestClient(app)
+        assert client.post("/session/export-jobs", json={}).status_code == 400
+        assert client.get("/session/export-jobs/missing").status_code == 404
+        assert client.get("/session/export-jobs/missing/download").status_code == 404
+        assert client.post("/session/export-jobs/missing/cancel").status_code == 404
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+import numpy as np
+import orjson
+from fastapi.testclient import TestClient
+from main import app
+from fast_json import ORJSONResponse, points_to_array, numbers_to_array
+
+
+class TestORJSONResponse:
+    """Test the app-wide orjson response class"""
+
+    def test_numpy_content(self):
+        content = {
+            "array": np.arange(3, dtype=np.float64),
+            "strided": np.arange(6).reshape(2, 3)[:, ::2],
+            "scalar": np.float32(1.5),
+            "nan": float("nan"),
+            1: "int key"
+        }
+        decoded = orjson.loads(ORJSONResponse(content=content).body)
+        assert decoded == {"array": [0.0, 1.0, 2.0], "strided": [[0, 2], [3, 5]], "scalar": 1.5, "nan": None, "1": "int key"}
+
+
+class TestArrayParsing:
+    """Test ndarray parsing of point payloads"""
+
+    def test_points_to_array(self):
+        points = points_to_array([[0, 1], [2.5, 3]])
+        assert points.dtype == np.float64
+        np.testing.assert_array_equal(points, [[0, 1], [2.5, 3]])
+        assert points_to_array([]).shape == (0, 2)
+
+    @pytest.mark.parametrize("points", [[[0, 1, 2]], [[0, "a"]], [0, 1], "points", [[0, float("inf")]]])
+    def test_invalid_points(self, points):
+        with pytest.raises(ValueError):
+            points_to_array(points)
+
+    def test_numbers_to_array(self):
+        assert numbers_to_array([0, 3], "offsets", np.int64).dtype == np.int64
+        with pytest.raises(ValueError):
+            numbers_to_array([[1]], "coords")
+
+    def test_area_endpoint_fast_path(self):
+        client = TestClient(app)
+        response = client.post("/measure/area", json={"points": [[0, 0], [10, 0], [10, 10], [0, 10]], "method": "opencv"})
+        assert response.status_code == 200
+        assert response.json()["area_pixels"] == pytest.approx(100.0)
+
+        assert client.post("/measure/area", json={"method": "scikit"}).status_code == 400
+        assert client.post("/measure/area", content=b"not json").status_code == 400
+
+    def test_area_batch_endpoint(self):
+        client = TestClient(app)
+        response = client.post("/measure/area-batch", json={
+            "coords": [0, 0, 4, 0, 0, 3, 0, 0, 10, 0, 10, 10, 0, 10], "offsets": [0, 3, 7], "scale_pixels_per_mm": 2.0
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["area_pixels"] == pytest.approx([6.0, 100.0])
+        assert data["area_mm2"] == pytest.approx([1.5, 25.0])
+        assert data["centroid"][1] == pytest.approx([5.0, 5.0])
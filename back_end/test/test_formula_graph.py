@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+import numpy as np
+from formula_graph import Formula, FormulaGraph, formula_graph
+from session_manager import SingleSessionManager, FORMULA_KEYS
+
+MEASUREMENTS = {
+    "area_a": 120.0, "area_b": 80.0, "area_av": 30.0, "area_bv": 70.0,
+    "distance_a": 12.0, "distance_c": 8.0, "distance_g": 6.0, "distance_h": 4.0
+}
+
+
+class TestFormulaGraph:
+    """Test the formula dependency graph"""
+
+    def test_registry_matches_formula_keys(self):
+        assert formula_graph.keys == FORMULA_KEYS
+
+    def test_single_frame_values(self):
+        formulas = formula_graph.evaluate(MEASUREMENTS)
+        assert formulas["p_factor"] == pytest.approx(10.0)
+        assert formulas["c_factor"] == pytest.approx(0.7)
+        assert formulas["distance_ratio_4"] == pytest.approx(0.5)
+        assert formulas["supraglottic_area_ratio_2"] == pytest.approx(4.0)
+
+    def test_missing_and_zero_inputs(self):
+        formulas = formula_graph.evaluate({"area_a": 100.0, "distance_a": 0, "distance_c": None})
+        assert formulas == {}
+
+    def test_downstream(self):
+        assert formula_graph.downstream(["distance_c"]) == [
+            "distance_ratio_2", "distance_ratio_4", "supraglottic_area_ratio_2"
+        ]
+        assert formula_graph.downstream(["angle_a"]) == []
+
+    def test_columns_match_single_frame(self):
+        rng = np.random.default_rng(0)
+        frames = [
+            {key: (float(v) if rng.random() > 0.2 else None) for key, v in zip(MEASUREMENTS, rng.uniform(0, 50, 8))}
+            for _ in range(200)
+        ]
+        frames[0]["distance_a"] = 0.0
+        columns = {key: np.array([f[key] if f[key] is not None else np.nan for f in frames]) for key in MEASUREMENTS}
+        results = formula_graph.evaluate_columns(columns)
+
+        for i, frame in enumerate(frames):
+            expected = formula_graph.evaluate(frame)
+            for name in FORMULA_KEYS:
+                if name in expected:
+                    assert results[name][i] == pytest.approx(expected[name])
+                else:
+                    assert np.isnan(results[name][i])
+
+    def test_formula_of_formula(self):
+        graph = FormulaGraph([
+            Formula("double_p", ("p_factor",), lambda p: p * 2),
+            *formula_graph.formulas.values()
+        ])
+        assert graph.order.index("p_factor") < graph.order.index("double_p")
+        assert graph.evaluate(MEASUREMENTS)["double_p"] == pytest.approx(20.0)
+        assert "double_p" in graph.downstream(["area_a"])
+
+    def test_cycle_rejected(self):
+        with pytest.raises(ValueError, match="cycle"):
+            FormulaGraph([Formula("a", ("b",), lambda b: b), Formula("b", ("a",), lambda a: a)])
+
+
+class TestIncrementalUpdates:
+    """Test recomputing formulas after a measurement edit"""
+
+    @pytest.fixture
+    def manager(self):
+        manager = SingleSessionManager()
+        manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+        manager.add_measured_frame({
+            "timestamp": 0.0, "frame_idx": 0,
+            "measurements": dict(MEASUREMENTS),
+            "formulas": manager.calculate_formulas(MEASUREMENTS)
+        })
+        return manager
+
+    def test_update_recomputes_downstream_only(self, manager):
+        frame = manager.get_current_session()["measured_frames"][0]
+        frame["formulas"]["c_factor"] = -1.0  # Sentinel: not downstream of distance_a
+
+        formulas = manager.update_frame_measurements(frame["frame_id"], {"distance_a": 24.0})
+        assert formulas["p_factor"] == pytest.approx(5.0)
+        assert formulas["supraglottic_area_ratio_2"] == pytest.approx(80.0 / 32.0)
+        assert formulas["c_factor"] == -1.0
+
+    def test_clearing_a_measurement(self, manager):
+        frame_id = manager.get_current_session()["measured_frames"][0]["frame_id"]
+        formulas = manager.update_frame_measurements(frame_id, {"area_a": None})
+        assert formulas["p_factor"] is None
+
+    def test_recalculate_all(self, manager):
+        frame = manager.get_current_session()["measured_frames"][0]
+        frame["formulas"] = {key: None for key in FORMULA_KEYS}
+        assert manager.recalculate_formulas() == 1
+        assert frame["formulas"]["c_factor"] == pytest.approx(0.7)
+
+    def test_invalid_updates(self, manager):
+        frame_id = manager.get_current_session()["measured_frames"][0]["frame_id"]
+        with pytest.raises(KeyError):
+            manager.update_frame_measurements(frame_id, {"area_z": 1.0})
+        with pytest.raises(LookupError):
+            manager.update_frame_measurements("missing", {"area_a": 1.0})
@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+from main import app
+from session_manager import session_manager
+
+FRAME_ANNOTATIONS = {
+    "angles": {"angle_a": [[0, 0], [1, 0], [1, 1]]},
+    "distances": {"distance_a": [[0, 0], [3, 4]], "distance_c": [[0, 0], [0, 2]]},
+    "areas": {"area_a": [[0, 0], [10, 0], [10, 10], [0, 10]], "area_b": [[0, 0], [4, 0], [0, 3]]},
+}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def video_session(tmp_path):
+    """Active session backed by a short synthetic video"""
+    video_path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+    session_manager.create_session(video_path=video_path, filename="video.avi", metadata={})
+    yield session_manager
+    session_manager.clear_current_session()
+
+
+class TestMeasureFrame:
+    """Test the single-round-trip frame measurement endpoint"""
+
+    def test_measurements_and_formulas(self, client):
+        response = client.post("/measure/frame", json=FRAME_ANNOTATIONS)
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["measurements"] == pytest.approx({
+            "angle_a": 90.0, "distance_a": 5.0, "distance_c": 2.0, "area_a": 100.0, "area_b": 6.0
+        })
+        # P-factor = area_a / distance_a, supraglottic ratio 2 = area_b / (distance_a + distance_c)
+        assert data["formulas"]["p_factor"] == pytest.approx(20.0)
+        assert data["formulas"]["supraglottic_area_ratio_2"] == pytest.approx(6.0 / 7.0)
+        assert data["details"]["areas"]["area_a"]["perimeter_pixels"] == pytest.approx(40.0)
+        assert "frame_id" not in data
+
+    def test_unknown_measurement_key(self, client):
+        response = client.post("/measure/frame", json={"angles": {"angle_z": [[0, 0], [1, 0], [1, 1]]}})
+        assert response.status_code == 400
+
+    def test_invalid_geometry(self, client):
+        response = client.post("/measure/frame", json={"areas": {"area_a": [[0, 0], [1, 0]]}})
+        assert response.status_code == 400
+
+    def test_save_to_session(self, client, video_session):
+        payload = {**FRAME_ANNOTATIONS, "save": True, "timestamp": 0.1, "frame_idx": 3, "custom_name": "Open"}
+        response = client.post("/measure/frame", json=payload)
+        assert response.status_code == 200
+        frame_id = response.json()["frame_id"]
+
+        frame = video_session.get_frames_details(frame_ids=[frame_id])[0]
+        assert frame["custom_name"] == "Open"
+        assert frame["measurements"]["area_a"] == pytest.approx(100.0)
+        assert frame["formulas"]["p_factor"] == pytest.approx(20.0)
+
+        # Saving the same frame again conflicts unless overriding
+        assert client.post("/measure/frame", json=payload).status_code == 409
+        override = client.post("/measure/frame", json={**payload, "override_existing": True})
+        assert override.status_code == 200
+        assert len(video_session.get_current_session()["measured_frames"]) == 1
+
+    def test_save_requires_frame_position(self, client):
+        response = client.post("/measure/frame", json={**FRAME_ANNOTATIONS, "save": True})
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from measurement_engine import MeasurementCache, measurement_cache
+
+SQUARE = [[0, 0], [10, 0], [10, 10], [0, 10]]
+
+
+@pytest.fixture
+def client():
+    measurement_cache.clear()
+    yield TestClient(app)
+    measurement_cache.clear()
+
+
+class TestMeasurementCache:
+    """Test the geometry-keyed memoization cache"""
+
+    def test_key_is_canonical(self):
+        cache = MeasurementCache(decimals=3)
+        assert cache.make_key(SQUARE, "area") == cache.make_key([[0.0001, 0], [10, 0], [10, 10], [0, 10]], "area")
+        assert cache.make_key(SQUARE, "area") != cache.make_key(SQUARE, "area", 2.0)
+        assert cache.make_key(SQUARE, "area") != cache.make_key(SQUARE, "area-comparison")
+        assert cache.make_key(SQUARE, "area", mode="a") != cache.make_key(SQUARE, "area", mode="b")
+
+    def test_hits_and_copies(self):
+        cache = MeasurementCache()
+        calls = []
+        compute = lambda: calls.append(1) or {"area": 100.0}
+
+        first = cache.get_or_compute("k", compute)
+        first["area"] = -1
+        assert cache.get_or_compute("k", compute) == {"area": 100.0}
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+    def test_bounded_lru(self):
+        cache = MeasurementCache(max_entries=2)
+        for key in ("a", "b", "a", "c"):
+            cache.get_or_compute(key, lambda: key)
+        assert cache.stats()["size"] == 2
+        # "b" was least recently used and has been evicted
+        cache.get_or_compute("b", lambda: "b")
+        assert cache.stats()["misses"] == 4
+
+    def test_errors_not_cached(self):
+        cache = MeasurementCache()
+
+        def fail():
+            raise ValueError("bad polygon")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("k", fail)
+        assert cache.stats()["size"] == 0
+
+
+class TestConditionalRequests:
+    """Test ETag handling on the area endpoints"""
+
+    @pytest.mark.parametrize("path", ["/measure/area", "/measure/area-comparison"])
+    def test_etag_round_trip(self, client, path):
+        first = client.post(path, json={"points": SQUARE})
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        repeat = client.post(path, json={"points": SQUARE}, headers={"If-None-Match": etag})
+        assert repeat.status_code == 304
+
+        moved = client.post(path, json={"points": SQUARE[:3] + [[0, 11]]}, headers={"If-None-Match": etag})
+        assert moved.status_code == 200
+        assert moved.headers["ETag"] != etag
+
+    def test_repeated_request_hits_cache(self, client):
+        client.post("/measure/area", json={"points": SQUARE})
+        second = client.post("/measure/area", json={"points": SQUARE})
+        assert second.json()["area_pixels"] == pytest.approx(100.0)
+
+        stats = client.get("/measure/cache-stats").json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
@@ -3,7 +3,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 import pytest
-from measurement_engine import calculate_angle
+import numpy as np
+from measurement_engine import calculate_angle, calculate_angles_batch
 
 @pytest.mark.parametrize("points,expected", [
     # Right angle (90°)
@@ -24,6 +25,7 @@ from measurement_engine import calculate_angle
 def test_calculate_angle(points, expected):
     angle = calculate_angle(points)
     assert pytest.approx(angle, abs=1e-2) == expected
+    assert pytest.approx(calculate_angles_batch([points])[0], abs=1e-2) == expected
 
 
 def test_invalid_points():
@@ -32,4 +34,20 @@ def test_invalid_points():
         calculate_angle([[0, 0], [1, 0]])
     # More than 3 points
     with pytest.raises(ValueError):
-        calculate_angle([[0, 0], [1, 0], [2, 0], [3, 0]]) 
\ No newline at end of file
+        calculate_angle([[0, 0], [1, 0], [2, 0], [3, 0]])
+
+
+def test_angles_batch_matches_single():
+    rng = np.random.default_rng(0)
+    triplets = rng.uniform(-100, 100, (500, 3, 2))
+    expected = [calculate_angle(t.tolist()) for t in triplets]
+    np.testing.assert_allclose(calculate_angles_batch(triplets), expected, atol=1e-6)
+
+
+def test_angles_batch_degenerate():
+    # Zero-length arms give 0, like calculate_angle
+    angles = calculate_angles_batch([[[1, 1], [1, 1], [2, 2]], [[0, 0], [1, 0], [1, 0]], [[0, 0], [1, 0], [1, 1]]])
+    np.testing.assert_allclose(angles, [0.0, 0.0, 90.0])
+    assert calculate_angles_batch([]).shape == (0,)
+    with pytest.raises(ValueError):
+        calculate_angles_batch([[[0, 0], [1, 0]]])
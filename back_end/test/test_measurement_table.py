@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from main import app
+from measurement_table import MeasurementTable
+from session_manager import SingleSessionManager, session_manager, MEASUREMENT_KEYS, FORMULA_KEYS
+
+
+def make_frame(frame_id, angle_a, area_a=None):
+    return {"frame_id": frame_id, "measurements": {"angle_a": angle_a, "area_a": area_a}, "formulas": {}}
+
+
+def assert_matches_numpy(table, key):
+    column = table.column(key)
+    values = column[np.isfinite(column)]
+    stats = table.statistics([key])[key]
+    assert stats["count"] == len(values)
+    if len(values):
+        assert stats["mean"] == pytest.approx(values.mean())
+        assert stats["min"] == pytest.approx(values.min())
+        assert stats["max"] == pytest.approx(values.max())
+    if len(values) > 1:
+        assert stats["std"] == pytest.approx(values.std(ddof=1))
+
+
+class TestMeasurementTable:
+    """Test the columnar table and its running aggregates"""
+
+    def test_add_and_statistics(self):
+        table = MeasurementTable(MEASUREMENT_KEYS, FORMULA_KEYS)
+        for i, angle in enumerate([40.0, 42.0, 47.0]):
+            table.add_frame(make_frame(str(i), angle))
+        stats = table.statistics(["angle_a", "area_a"])
+        assert stats["angle_a"]["mean"] == pytest.approx(43.0)
+        assert stats["angle_a"]["std"] == pytest.approx(np.std([40, 42, 47], ddof=1))
+        assert stats["area_a"] == {"count": 0, "mean": None, "std": None, "variance": None, "min": None, "max": None}
+
+    def test_random_adds_removes_and_updates(self):
+        rng = np.random.default_rng(0)
+        table = MeasurementTable(MEASUREMENT_KEYS, FORMULA_KEYS, initial_capacity=2)
+        live = []
+        for step in range(500):
+            action = rng.random()
+            if action < 0.5 or not live:
+                frame_id = f"f{step}"
+                area = float(rng.uniform(0, 500)) if rng.random() > 0.3 else None
+                table.add_frame(make_frame(frame_id, float(rng.normal(45, 5)), area))
+                live.append(frame_id)
+            elif action < 0.8:
+                frame_id = live.pop(int(rng.integers(len(live))))
+                assert table.remove_frame(frame_id)
+            else:
+                frame_id = live[int(rng.integers(len(live)))]
+                table.update_frame(make_frame(frame_id, float(rng.normal(45, 5)), None))
+        assert len(table) == len(live)
+        assert_matches_numpy(table, "angle_a")
+        assert_matches_numpy(table, "area_a")
+
+    def test_remove_extremes(self):
+        table = MeasurementTable(MEASUREMENT_KEYS, FORMULA_KEYS)
+        for i, angle in enumerate([10.0, 50.0, 30.0]):
+            table.add_frame(make_frame(str(i), angle))
+        table.remove_frame("1")
+        assert table.statistics(["angle_a"])["angle_a"]["max"] == pytest.approx(30.0)
+        table.remove_frame("0")
+        table.remove_frame("2")
+        assert table.statistics(["angle_a"])["angle_a"]["count"] == 0
+        assert not table.remove_frame("2")
+
+
+class TestSessionStatistics:
+    """Test that the session keeps the table in sync"""
+
+    def test_session_mutations(self):
+        manager = SingleSessionManager()
+        manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+        ids = [
+            manager.add_measured_frame({
+                "frame_idx": i, "measurements": {"area_a": 100.0 * (i + 1), "distance_a": 10.0}, "formulas": {}
+            })
+            for i in range(3)
+        ]
+        manager.remove_measured_frame(ids[0])
+        manager.update_frame_measurements(ids[1], {"distance_a": 20.0})
+
+        result = manager.get_statistics(["area_a", "p_factor"])
+        assert result["frame_count"] == 2
+        assert result["statistics"]["area_a"]["mean"] == pytest.approx(250.0)
+        # p_factor was only computed for the updated frame
+        assert result["statistics"]["p_factor"]["count"] == 1
+        assert result["statistics"]["p_factor"]["mean"] == pytest.approx(10.0)
+
+        with pytest.raises(KeyError):
+            manager.get_statistics(["thumbnail_path"])
+
+    def test_statistics_endpoint(self):
+        client = TestClient(app)
+        assert client.get("/session/statistics").status_code == 400
+
+        session_manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+        try:
+            session_manager.add_measured_frame({"frame_idx": 0, "measurements": {"angle_a": 40.0}, "formulas": {}})
+            response = client.get("/session/statistics", params={"keys": "angle_a"})
+            assert response.status_code == 200
+            assert response.json()["statistics"]["angle_a"]["mean"] == pytest.approx(40.0)
+        finally:
+            session_manager.clear_current_session()
@@ -0,0 +1,125 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import threading
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from main import app
+from measurement_engine import shoelace_area, calculate_perimeter
+from polygon_editor import EditablePolygon
+
+SQUARE = [[0, 0], [10, 0], [10, 10], [0, 10]]
+
+
+def assert_matches_full_recompute(polygon):
+    measurements = polygon.measurements()
+    if len(polygon.points) >= 3:
+        assert measurements["area_pixels"] == pytest.approx(shoelace_area(polygon.points), abs=1e-6)
+    if len(polygon.points) >= 2:
+        assert measurements["perimeter_pixels"] == pytest.approx(calculate_perimeter(polygon.points), abs=1e-6)
+    if polygon.points:
+        np.testing.assert_allclose(measurements["centroid"], np.mean(polygon.points, axis=0), atol=1e-6)
+
+
+class TestEditablePolygon:
+    """Test incremental measurement updates under vertex edits"""
+
+    def test_move_vertex(self):
+        polygon = EditablePolygon(SQUARE)
+        polygon.move_vertex(2, [20, 10])
+        assert polygon.measurements()["area_pixels"] == pytest.approx(150.0)
+        assert_matches_full_recompute(polygon)
+
+    def test_insert_and_delete(self):
+        polygon = EditablePolygon(SQUARE)
+        polygon.insert_vertex(1, [5, -5])
+        assert polygon.measurements()["area_pixels"] == pytest.approx(125.0)
+        polygon.delete_vertex(1)
+        assert polygon.measurements()["area_pixels"] == pytest.approx(100.0)
+        assert polygon.revision == 2
+
+    def test_build_up_from_empty(self):
+        polygon = EditablePolygon()
+        for point in SQUARE:
+            polygon.insert_vertex(len(polygon.points), point)
+            assert_matches_full_recompute(polygon)
+        assert polygon.measurements()["area_pixels"] == pytest.approx(100.0)
+
+    def test_random_edit_sequence(self):
+        rng = np.random.default_rng(0)
+        polygon = EditablePolygon(rng.uniform(0, 500, (50, 2)).tolist(), resync_interval=10_000)
+        for _ in range(2000):
+            n = len(polygon.points)
+            op = rng.choice(["move", "insert", "delete"]) if n > 3 else "insert"
+            if op == "move":
+                polygon.apply({"op": "move", "index": int(rng.integers(n)), "point": rng.uniform(0, 500, 2).tolist()})
+            elif op == "insert":
+                polygon.apply({"op": "insert", "index": int(rng.integers(n + 1)), "point": rng.uniform(0, 500, 2).tolist()})
+            else:
+                polygon.apply({"op": "delete", "index": int(rng.integers(n))})
+        assert_matches_full_recompute(polygon)
+
+    def test_edits_wait_for_lock(self):
+        polygon = EditablePolygon(SQUARE)
+        with polygon.lock:
+            # An edit from another thread (e.g. the REST endpoint) waits for the holder
+            thread = threading.Thread(target=polygon.apply, args=({"op": "move", "index": 2, "point": [20, 10]},))
+            thread.start()
+            thread.join(0.2)
+            assert thread.is_alive()
+            assert polygon.measurements()["area_pixels"] == pytest.approx(100.0)
+        thread.join(5)
+        assert polygon.measurements()["area_pixels"] == pytest.approx(150.0)
+        assert_matches_full_recompute(polygon)
+
+    def test_snapshot_copies_points(self):
+        polygon = EditablePolygon(SQUARE)
+        snapshot = polygon.snapshot()
+        polygon.move_vertex(0, [1, 1])
+        assert snapshot["points"][0] == [0.0, 0.0]
+        assert snapshot["revision"] == 0
+
+    def test_invalid_edits(self):
+        polygon = EditablePolygon(SQUARE)
+        with pytest.raises(IndexError):
+            polygon.move_vertex(4, [0, 0])
+        with pytest.raises(ValueError):
+            polygon.apply({"op": "rotate"})
+
+    def test_calibrated_values(self):
+        polygon = EditablePolygon(SQUARE, scale_pixels_per_mm=2.0)
+        assert polygon.measurements()["area_mm2"] == pytest.approx(25.0)
+
+
+class TestPolygonEditorEndpoints:
+    """Test the REST and WebSocket editing channels"""
+
+    def test_websocket_drag(self):
+        client = TestClient(app)
+        polygon_id = client.post("/polygon/open", json={"points": SQUARE}).json()["polygon_id"]
+
+        with client.websocket_connect(f"/ws/polygon/{polygon_id}") as websocket:
+            for x in (12, 14, 20):
+                websocket.send_json({"op": "move", "index": 2, "point": [x, 10]})
+                reply = websocket.receive_json()
+            assert reply["area_pixels"] == pytest.approx(150.0)
+
+            websocket.send_json({"op": "delete", "index": 9})
+            assert "error" in websocket.receive_json()
+
+        assert client.get(f"/polygon/{polygon_id}").json()["points"][2] == [20.0, 10.0]
+        assert client.delete(f"/polygon/{polygon_id}").status_code == 200
+        assert client.get(f"/polygon/{polygon_id}").status_code == 404
+
+    def test_rest_edits(self):
+        client = TestClient(app)
+        polygon_id = client.post("/polygon/open", json={"points": SQUARE}).json()["polygon_id"]
+        response = client.post(f"/polygon/{polygon_id}/edit", json={"edits": [
+            {"op": "insert", "index": 1, "point": [5, -5]},
+            {"op": "move", "index": 0, "point": [0, -1]}
+        ]})
+        assert response.status_code == 200
+        assert response.json()["point_count"] == 5
+        client.delete(f"/polygon/{polygon_id}")
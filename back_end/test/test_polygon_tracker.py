@@ -0,0 +1,151 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import time
+import pytest
+import cv2
+import numpy as np
+import orjson
+from fastapi.testclient import TestClient
+from main import app
+from session_manager import session_manager
+from polygon_tracker import PolygonTracker
+
+N_FRAMES = 12
+SQUARE = [[40, 40], [80, 40], [80, 80], [40, 80]]
+
+
+@pytest.fixture
+def moving_square_video(tmp_path):
+    """Bright square translating 2 px right per frame"""
+    video_path = str(tmp_path / "moving.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    for i in range(N_FRAMES):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        cv2.rectangle(frame, (40 + 2 * i, 40), (80 + 2 * i, 80), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+
+def wait_for(job, timeout=10):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestPolygonTracker:
+    """Test optical-flow propagation of annotations across frames"""
+
+    def test_tracks_translating_square(self, moving_square_video):
+        tracker = PolygonTracker(formula_fn=lambda m: {"area_twice": m["area_a"] * 2})
+        job_id = tracker.start(moving_square_video, 0, N_FRAMES - 1, {
+            "areas": {"area_a": SQUARE},
+            "distances": {"distance_a": [SQUARE[0], SQUARE[1]]}
+        })
+        job = wait_for(tracker.get(job_id))
+
+        assert job.status == "completed"
+        assert [r["frame_idx"] for r in job.results] == list(range(N_FRAMES))
+        last = job.results[-1]
+        assert last["measurements"]["area_a"] == pytest.approx(1600.0, rel=0.05)
+        assert last["formulas"]["area_twice"] == pytest.approx(2 * last["measurements"]["area_a"])
+        assert last["perimeters"]["area_a"] == pytest.approx(160.0, rel=0.05)
+        assert "perimeters_mm" not in last
+        assert last["tracked_fraction"] == 1.0
+        xs = [p[0] for p in last["annotations"]["areas"]["area_a"]]
+        assert min(xs) == pytest.approx(40 + 2 * (N_FRAMES - 1), abs=1.5)
+
+    def test_scaled_perimeters(self, moving_square_video):
+        tracker = PolygonTracker()
+        job = wait_for(tracker.get(tracker.start(moving_square_video, 0, 3, {"areas": {"area_a": SQUARE}},
+                                                 scale_pixels_per_mm=4.0)))
+        first = job.results[0]
+        assert first["perimeters"]["area_a"] == pytest.approx(160.0)
+        assert first["perimeters_mm"]["area_a"] == pytest.approx(40.0)
+        assert first["areas_mm2"]["area_a"] == pytest.approx(100.0)
+
+    def test_lost_points_stay_untracked(self, moving_square_video, monkeypatch):
+        # The flow loses the first point on frame 1 only; it must not count as tracked again
+        calc = cv2.calcOpticalFlowPyrLK
+        calls = []
+
+        def flaky_flow(prev, cur, points, *args, **kwargs):
+            new_points, status, err = calc(prev, cur, points, *args, **kwargs)
+            calls.append(None)
+            if len(calls) == 1:
+                status = status.copy()
+                status[0] = 0
+            return new_points, status, err
+
+        monkeypatch.setattr(cv2, "calcOpticalFlowPyrLK", flaky_flow)
+        tracker = PolygonTracker()
+        job = wait_for(tracker.get(tracker.start(moving_square_video, 0, 4, {"areas": {"area_a": SQUARE}})))
+        assert [r["tracked_fraction"] for r in job.results] == [1.0, 0.75, 0.75, 0.75, 0.75]
+
+    def test_end_frame_clamped_to_video(self, moving_square_video):
+        tracker = PolygonTracker()
+        job = wait_for(tracker.get(tracker.start(moving_square_video, 5, 500, {"areas": {"area_a": SQUARE}})))
+        assert job.status == "completed"
+        assert len(job.results) == N_FRAMES - 5
+        assert job.summary()["progress"] == pytest.approx(1.0)
+
+    def test_start_past_end_of_video_fails(self, moving_square_video):
+        tracker = PolygonTracker()
+        job = wait_for(tracker.get(tracker.start(moving_square_video, N_FRAMES, N_FRAMES + 5,
+                                                 {"areas": {"area_a": SQUARE}})))
+        assert job.status == "failed"
+        assert "past the end" in job.error
+        assert job.results == [] and job.total_frames > 0
+
+    def test_cancel(self, moving_square_video):
+        tracker = PolygonTracker()
+        job_id = tracker.start(moving_square_video, 0, N_FRAMES - 1, {"areas": {"area_a": SQUARE}})
+        tracker.cancel(job_id)
+        job = wait_for(tracker.get(job_id))
+        assert job.status in ("cancelled", "completed")
+        assert tracker.cancel(job_id) is False
+
+    def test_invalid_requests(self, moving_square_video):
+        tracker = PolygonTracker()
+        with pytest.raises(ValueError):
+            tracker.start(moving_square_video, 5, 2, {"areas": {"area_a": SQUARE}})
+        with pytest.raises(ValueError):
+            tracker.start(moving_square_video, 0, 5, {})
+        with pytest.raises(ValueError):
+            tracker.start(moving_square_video, 0, 5, {"areas": {"area_a": SQUARE[:2]}})
+
+
+class TestTrackingEndpoints:
+    """Test the tracking job endpoints against the session video"""
+
+    def test_stream_results(self, moving_square_video):
+        client = TestClient(app)
+        session_manager.create_session(video_path=moving_square_video, filename="moving.avi", metadata={})
+        try:
+            response = client.post("/tracking/start", json={
+                "start_frame": 0, "end_frame": N_FRAMES - 1,
+                "areas": {"area_a": SQUARE}, "distances": {"distance_a": [SQUARE[0], SQUARE[1]]}
+            })
+            assert response.status_code == 200
+            job_id = response.json()["job_id"]
+
+            lines = [orjson.loads(line) for line in client.get(f"/tracking/{job_id}/stream").text.splitlines()]
+            assert lines[-1]["status"] == "completed"
+            frames = lines[:-1]
+            assert len(frames) == N_FRAMES
+            assert frames[0]["formulas"]["p_factor"] == pytest.approx(1600.0 / 40.0)
+
+            polled = client.get(f"/tracking/{job_id}/results", params={"since": 10}).json()
+            assert len(polled["results"]) == N_FRAMES - 10
+            assert polled["next"] == N_FRAMES
+        finally:
+            session_manager.clear_current_session()
+
+    def test_requires_session(self):
+        client = TestClient(app)
+        response = client.post("/tracking/start", json={"start_frame": 0, "end_frame": 1, "areas": {"area_a": SQUARE}})
+        assert response.status_code == 400
+        assert client.get("/tracking/missing/results").status_code == 404
@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from session_manager import SingleSessionManager, session_manager, MEASUREMENT_KEYS, FORMULA_KEYS
+
+
+@pytest.fixture
+def manager():
+    """Session manager with an active session and three measured frames"""
+    manager = SingleSessionManager()
+    manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+    for idx in range(3):
+        manager.add_measured_frame({
+            "timestamp": idx / 30,
+            "frame_idx": idx,
+            "measurements": {"angle_a": 40.0 + idx, "distance_a": 10.0, "area_a": 100.0 * (idx + 1)},
+            "formulas": {"p_factor": 10.0 * (idx + 1)},
+            "custom_name": f"Frame {idx}"
+        })
+    return manager
+
+
+class TestFramesDetails:
+    """Test bulk frame detail lookups"""
+
+    def test_all_frames_all_fields(self, manager):
+        frames = manager.get_frames_details()
+        assert len(frames) == 3
+        assert [f["frame_idx"] for f in frames] == [0, 1, 2]
+        assert set(frames[0]["measurements"]) == set(MEASUREMENT_KEYS)
+        assert set(frames[0]["formulas"]) == set(FORMULA_KEYS)
+
+    def test_field_projection(self, manager):
+        frames = manager.get_frames_details(fields=["measurements"])
+        assert set(frames[0]) == {"frame_id", "measurements"}
+
+    def test_selected_frames_keep_requested_order(self, manager):
+        ids = [f["frame_id"] for f in manager.get_current_session()["measured_frames"]]
+        frames = manager.get_frames_details(frame_ids=[ids[2], ids[0]], fields=["frame_idx"])
+        assert [f["frame_idx"] for f in frames] == [2, 0]
+
+    def test_unknown_field(self, manager):
+        with pytest.raises(KeyError):
+            manager.get_frames_details(fields=["thumbnail_path"])
+
+    def test_unknown_frame(self, manager):
+        with pytest.raises(LookupError):
+            manager.get_frames_details(frame_ids=["missing"])
+
+    def test_no_session(self):
+        with pytest.raises(ValueError):
+            SingleSessionManager().get_frames_details()
+
+
+class TestFramesDetailsEndpoint:
+    """Test the bulk frame details endpoint"""
+
+    def test_stale_frame_ids_are_reported_missing(self):
+        client = TestClient(app)
+        session_manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+        try:
+            ids = [session_manager.add_measured_frame({"timestamp": idx / 30, "frame_idx": idx, "measurements": {}})
+                   for idx in range(2)]
+            response = client.get("/session/frame-details", params={
+                "frame_ids": f"{ids[1]},deleted,{ids[0]}", "fields": "frame_idx"
+            })
+            assert response.status_code == 200
+            body = response.json()
+            assert [f["frame_idx"] for f in body["frames"]] == [1, 0]
+            assert body["missing"] == ["deleted"]
+
+            body = client.get("/session/frame-details").json()
+            assert len(body["frames"]) == 2 and body["missing"] == []
+        finally:
+            session_manager.clear_current_session()
+
+
+class TestBaselineComparisons:
+    """Test server-side baseline comparisons and their caching"""
+
+    def _frame_ids(self, manager):
+        return [f["frame_id"] for f in manager.get_current_session()["measured_frames"]]
+
+    def test_comparison_values(self, manager):
+        ids = self._frame_ids(manager)
+        manager.set_baseline_frame(ids[0])
+        comparisons = manager.get_baseline_comparisons()
+
+        assert comparisons[ids[0]] is None
+        angle = comparisons[ids[1]]["angle_a"]
+        assert angle["percentOfBaseline"] == pytest.approx(41.0 / 40.0 * 100)
+        assert angle["percentChangeFromBaseline"] == pytest.approx(1.0 / 40.0 * 100)
+        assert comparisons[ids[2]]["p_factor"]["percentOfBaseline"] == pytest.approx(300.0)
+        # Missing values and raw distances are not compared
+        assert comparisons[ids[1]]["angle_b"] is None
+        assert "distance_a" not in comparisons[ids[1]]
+
+    def test_zero_baseline_value(self, manager):
+        ids = self._frame_ids(manager)
+        manager.get_current_session()["measured_frames"][0]["measurements"]["angle_a"] = 0.0
+        comparisons = manager.get_baseline_comparisons(ids[0])
+        assert comparisons[ids[1]]["angle_a"] is None
+
+    def test_cached_until_measurements_change(self, manager):
+        ids = self._frame_ids(manager)
+        manager.set_baseline_frame(ids[0])
+        first = manager.get_baseline_comparisons()
+
+        # Renaming a frame does not change any comparison
+        manager.update_frame_custom_name(ids[1], "Renamed")
+        assert manager.get_baseline_comparisons() is first
+
+        manager.remove_measured_frame(ids[2])
+        second = manager.get_baseline_comparisons()
+        assert second is not first
+        assert ids[2] not in second
+
+    def test_no_baseline(self, manager):
+        with pytest.raises(ValueError):
+            manager.get_baseline_comparisons()
+
+    def test_frames_details_include_comparisons(self, manager):
+        ids = self._frame_ids(manager)
+        manager.set_baseline_frame(ids[0])
+        frames = manager.get_frames_details(fields=["baseline_comparisons"])
+        assert frames[0]["baseline_comparisons"] is None
+        assert frames[1]["baseline_comparisons"]["angle_a"] is not None
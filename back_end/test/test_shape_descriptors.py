@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import math
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from main import app
+from measurement_engine import calculate_area_scikit, calculate_shape_descriptors, convex_hull
+
+SQUARE = [[0, 0], [10, 0], [10, 10], [0, 10]]
+L_SHAPE = [[0, 0], [10, 0], [10, 2], [2, 2], [2, 10], [0, 10]]
+
+
+def ellipse(a, b, n_vertices=720, angle=0.0):
+    """Ellipse polygon centred at (300, 200), rotated by angle radians"""
+    t = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)
+    x, y = a * np.cos(t), b * np.sin(t)
+    c, s = math.cos(angle), math.sin(angle)
+    return np.column_stack([300 + c * x - s * y, 200 + s * x + c * y])
+
+
+class TestShapeDescriptors:
+    """Test analytic shape descriptors computed from float vertices"""
+
+    def test_ellipse_eccentricity(self):
+        result = calculate_shape_descriptors(ellipse(100, 40, angle=0.7))
+        assert result["eccentricity"] == pytest.approx(math.sqrt(1 - (40 / 100) ** 2), rel=1e-4)
+        assert result["solidity"] == pytest.approx(1.0)
+        assert result["feret_diameter_max"] == pytest.approx(200.0, rel=1e-4)
+        assert result["feret_diameter_min"] == pytest.approx(80.0, rel=1e-4)
+
+    def test_square(self):
+        result = calculate_shape_descriptors(SQUARE)
+        assert result["eccentricity"] == pytest.approx(0.0, abs=1e-9)
+        assert result["feret_diameter_max"] == pytest.approx(math.hypot(10, 10))
+        assert result["feret_diameter_min"] == pytest.approx(10.0)
+        assert result["min_area_rect"]["area"] == pytest.approx(100.0)
+        np.testing.assert_allclose(result["min_area_rect"]["center"], [5.0, 5.0])
+
+    def test_concave_solidity(self):
+        # Area 36, convex hull area 68
+        result = calculate_shape_descriptors(L_SHAPE)
+        assert result["convex_area_pixels"] == pytest.approx(68.0)
+        assert result["solidity"] == pytest.approx(36.0 / 68.0)
+
+    def test_rotated_rectangle(self):
+        angle = math.radians(30)
+        u, n = np.array([math.cos(angle), math.sin(angle)]), np.array([-math.sin(angle), math.cos(angle)])
+        rect = [u * a + n * b for a, b in ((0, 0), (20, 0), (20, 5), (0, 5))]
+        result = calculate_shape_descriptors(rect)["min_area_rect"]
+        assert sorted([result["width"], result["height"]]) == pytest.approx([5.0, 20.0])
+        assert result["area"] == pytest.approx(100.0)
+        assert result["angle"] % 90 == pytest.approx(30.0)
+
+    def test_degenerate_polygon(self):
+        result = calculate_shape_descriptors([[0, 0], [1, 1], [2, 2]])
+        assert result["eccentricity"] == 0.0
+        assert result["solidity"] == 1.0
+        assert result["min_area_rect"] is None
+
+    def test_hull_drops_interior_and_collinear_points(self):
+        hull = convex_hull(SQUARE + [[5, 5], [5, 0]])
+        assert len(hull) == 4
+
+    def test_analytic_matches_raster_mode(self):
+        points = ellipse(100, 40, angle=0.3).tolist()
+        analytic = calculate_area_scikit(points)
+        raster = calculate_area_scikit(points, descriptor_mode="raster")
+        assert analytic["descriptor_mode"] == "analytic"
+        assert raster["descriptor_mode"] == "raster"
+        assert analytic["eccentricity"] == pytest.approx(raster["eccentricity"], abs=5e-3)
+        assert analytic["solidity"] == pytest.approx(raster["solidity"], abs=2e-2)
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            calculate_area_scikit(SQUARE, descriptor_mode="exact")
+
+
+class TestAreaEndpointDescriptors:
+    """Test shape descriptors returned by /measure/area"""
+
+    def test_feret_in_response(self):
+        client = TestClient(app)
+        response = client.post("/measure/area", json={"points": SQUARE, "scale_pixels_per_mm": 2.0})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["feret_diameter_min"] == pytest.approx(10.0)
+        assert data["feret_diameter_min_mm"] == pytest.approx(5.0)
+        assert data["min_area_rect"]["area"] == pytest.approx(100.0)
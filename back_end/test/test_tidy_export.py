@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import io
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from tidy_export import session_tidy_frame, iter_tidy_export
+from session_manager import SingleSessionManager, session_manager, MEASUREMENT_KEYS, FORMULA_KEYS
+
+
+def add_frames(manager, n, seed=0):
+    rng = np.random.default_rng(seed)
+    frame_ids = []
+    for i in range(n):
+        measurements = {k: float(v) if rng.random() > 0.2 else None
+                        for k, v in zip(MEASUREMENT_KEYS, rng.uniform(1, 100, len(MEASUREMENT_KEYS)))}
+        frame_ids.append(manager.add_measured_frame({
+            "frame_idx": i * 3, "timestamp": i / 10, "custom_name": f"Frame {i}",
+            "measurements": measurements, "formulas": manager.calculate_formulas(measurements)
+        }))
+    return frame_ids
+
+
+@pytest.fixture
+def manager():
+    manager = SingleSessionManager()
+    manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+    return manager
+
+
+class TestTidyExport:
+    """Test the one-row-per-frame session export"""
+
+    def test_columns_and_order(self, manager):
+        frame_ids = add_frames(manager, 6)
+        manager.remove_measured_frame(frame_ids[1])  # Reorders the table rows
+        df = session_tidy_frame(manager)
+
+        assert list(df["frame_id"]) == [fid for fid in frame_ids if fid != frame_ids[1]]
+        assert list(df.columns[:5]) == ["frame_id", "frame_idx", "timestamp", "custom_name", "is_baseline"]
+        assert set(MEASUREMENT_KEYS + FORMULA_KEYS) <= set(df.columns)
+        assert str(df["frame_idx"].dtype) == "Int64"
+        for frame, (_, row) in zip(manager.current_session["measured_frames"], df.iterrows()):
+            for key in MEASUREMENT_KEYS:
+                expected = frame["measurements"][key]
+                assert np.isnan(row[key]) if expected is None else row[key] == expected
+        # No baseline: comparison columns exist but are empty
+        assert df["angle_a_pct_of_baseline"].isna().all()
+        assert not df["is_baseline"].any()
+
+    def test_comparisons_match_engine(self, manager):
+        frame_ids = add_frames(manager, 8, seed=1)
+        manager.set_baseline_frame(frame_ids[2])
+        df = session_tidy_frame(manager).set_index("frame_id")
+        comparisons = manager.get_baseline_comparisons()
+
+        assert df.loc[frame_ids[2], "is_baseline"]
+        for frame_id, per_key in comparisons.items():
+            for key in manager.comparison_engine.keys:
+                of = df.loc[frame_id, key + "_pct_of_baseline"]
+                change = df.loc[frame_id, key + "_pct_change_from_baseline"]
+                comparison = (per_key or {}).get(key)
+                if comparison is None:
+                    assert np.isnan(of) and np.isnan(change)
+                else:
+                    assert of == pytest.approx(comparison["percentOfBaseline"])
+                    assert change == pytest.approx(comparison["percentChangeFromBaseline"])
+
+    def test_csv_roundtrip(self, manager):
+        add_frames(manager, 5)
+        df = session_tidy_frame(manager)
+        chunks = list(iter_tidy_export(df, "csv", chunk_rows=2))
+        assert len(chunks) == 1 + 3
+        loaded = pd.read_csv(io.BytesIO(b"".join(chunks)))
+        assert list(loaded.columns) == list(df.columns)
+        np.testing.assert_allclose(loaded["area_a"], df["area_a"])
+        assert list(loaded["custom_name"]) == list(df["custom_name"])
+
+    def test_unknown_format(self, manager):
+        df = session_tidy_frame(manager)
+        assert len(df) == 0
+        with pytest.raises(ValueError):
+            iter_tidy_export(df, "xlsx")
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+    def test_arrow_formats_roundtrip(self, manager, fmt):
+        add_frames(manager, 7)
+        df = session_tidy_frame(manager)
+        data = b"".join(iter_tidy_export(df, fmt, chunk_rows=3))
+        if fmt == "parquet":
+            table = pq.read_table(pa.BufferReader(data))
+        else:
+            table = pa.ipc.open_file(pa.BufferReader(data)).read_all()
+        pd.testing.assert_frame_equal(table.to_pandas(), df)
+
+    def test_endpoint(self):
+        client = TestClient(app)
+        assert client.get("/session/export-tidy").status_code == 400
+        session_manager.create_session(video_path="/nonexistent/video.mp4", filename="video.mp4", metadata={})
+        try:
+            add_frames(session_manager, 3)
+            response = client.get("/session/export-tidy", params={"format": "csv"})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/csv")
+            assert len(pd.read_csv(io.BytesIO(response.content))) == 3
+            response = client.get("/session/export-tidy", params={"format": "parquet"})
+            assert response.status_code == 200
+            assert len(pq.read_table(pa.BufferReader(response.content))) == 3
+            assert client.get("/session/export-tidy", params={"format": "xml"}).status_code == 400
+        finally:
+            session_manager.clear_current_session()
@@ -0,0 +1,180 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import io
+import zipfile
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from upload_cache import UploadCache
+from Resp_Analysis.resp_modules.dataframe_loader import DataFrameLoader
+from Resp_Analysis.resp_modules.breath_feature_reshaper import BreathFeatureReshaper
+import upload_cache as upload_cache_module
+import api.upload_and_downland_api as upload_api
+from batch_processing import batch_job_manager
+from export_job_manager import export_job_manager
+
+
+def make_upload(n=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"#": np.arange(n)})
+    for col in ["Flow_Filtered", "R5", "X5", "R11", "X11", "R19", "X19", "Volume"]:
+        df[col] = rng.normal(size=n)
+    return df.to_csv(sep="\t", index=False).encode()
+
+
+class CountingLoader(DataFrameLoader):
+    def __init__(self):
+        super().__init__(index_col="#", delimiter="\t")
+        self.calls = 0
+
+    def load_bytes(self, data, suffix, name="uploaded"):
+        self.calls += 1
+        return super().load_bytes(data, suffix, name)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return UploadCache(max_entries=2, cache_dir=str(tmp_path), loader=CountingLoader())
+
+
+class TestUploadCache:
+    """Parse-once cache of uploaded data files"""
+
+    def test_same_content_parsed_once(self, cache):
+        content = make_upload()
+        first = cache.load(content, "a.csv")
+        second = cache.load(content, "renamed.csv")
+        assert first is second
+        assert cache.loader.calls == 1
+
+    def test_different_content_or_type_gets_new_entry(self, cache):
+        content = make_upload()
+        a = cache.load(content, "a.csv")
+        b = cache.load(make_upload(seed=1), "a.csv")
+        assert a.key != b.key
+        assert UploadCache.content_key(content, ".csv") != UploadCache.content_key(content, ".xlsx")
+
+    def test_dataframe_is_memory_mapped_copy_of_upload(self, cache):
+        content = make_upload()
+        expected = DataFrameLoader(index_col="#", delimiter="\t").load_bytes(content, ".csv")
+        df = cache.load(content, "a.csv").dataframe()
+        pd.testing.assert_frame_equal(df, expected)
+        base = df["R5"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert base is not None
+
+    def test_dataframe_can_be_modified(self, cache):
+        entry = cache.load(make_upload(), "a.csv")
+        df = entry.dataframe()
+        df.loc[df.index[0], "R5"] = 99.0
+        assert entry.dataframe()["R5"].iloc[0] != 99.0
+
+    def test_lru_eviction_removes_files(self, cache):
+        entries = []
+        for i in range(3):
+            with cache.load(make_upload(seed=i), f"{i}.csv") as entry:
+                entries.append(entry)
+        assert not os.path.exists(entries[0].path)
+        with pytest.raises(KeyError):
+            cache.get(entries[0].key)
+        assert cache.get(entries[2].key) is entries[2]
+
+    def test_held_entry_survives_eviction(self, cache):
+        content = make_upload()
+        held = cache.load(content, "a.csv")
+        for i in range(1, 3):
+            cache.load(make_upload(seed=i), f"{i}.csv").release()
+        with pytest.raises(KeyError):
+            cache.get(held.key)
+        # Another request still reading the evicted upload
+        pd.testing.assert_frame_equal(held.dataframe(),
+                                      DataFrameLoader(index_col="#", delimiter="\t").load_bytes(content, ".csv"))
+        held.release()
+        assert not os.path.exists(held.path)
+
+    def test_text_column_nulls_survive(self, cache):
+        df = pd.DataFrame({"#": [0, 1, 2], "R5": [1.0, 2.0, 3.0], "Note": ["a", None, "b"]})
+        with cache.load(df.to_csv(sep="\t", index=False).encode(), "notes.csv") as entry:
+            notes = entry.dataframe()["Note"]
+        assert list(notes.isna()) == [False, True, False]
+        assert notes.iloc[2] == "b"
+
+    def test_failed_parse_is_not_cached(self, cache):
+        with pytest.raises(ValueError):
+            cache.load(b"anything", "data.txt")
+        assert cache.latest() is None
+
+    def test_latest_processed(self, cache):
+        a = cache.load(make_upload(), "a.csv")
+        cache.load(make_upload(seed=1), "b.csv")
+        assert cache.latest(processed=True) is None
+        a.processed = (pd.DataFrame(), pd.DataFrame())
+        assert cache.latest(processed=True) is a
+
+    def test_temporary_dir_created_on_first_upload_and_cleared(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(upload_cache_module.tempfile, "tempdir", str(tmp_path))
+        cache = UploadCache()
+        assert cache.cache_dir is None and list(tmp_path.iterdir()) == []
+        entry = cache.load(make_upload(), "a.csv")
+        assert entry.path.startswith(cache.cache_dir)
+        cache.clear()
+        assert cache.cache_dir is None and list(tmp_path.iterdir()) == []
+        assert os.path.exists(cache.load(make_upload(), "a.csv").path)
+        cache.clear()
+
+
+class TestUploadEndpoints:
+    """Upload, plot and export endpoints share one parse"""
+
+    @pytest.fixture
+    def client(self, cache, monkeypatch):
+        monkeypatch.setattr(upload_cache_module.upload_cache, "load", cache.load)
+        monkeypatch.setattr(upload_cache_module.upload_cache, "get", cache.get)
+        monkeypatch.setattr(upload_cache_module.upload_cache, "latest", cache.latest)
+
+        def fake_process(name, df):
+            breaths = pd.DataFrame({
+                "breath_index": [1], "INSP_Volume": [0.5], "EXP_Volume": [0.4],
+                "inspiration_start": [0], "inspiration_end": [10],
+                "expiration_start": [11], "expiration_end": [20], "R5_INSP": [df["R5"].mean()],
+            })
+            return name, BreathFeatureReshaper(breaths), df, breaths
+
+        monkeypatch.setattr(upload_api, "process_dataframe", fake_process)
+        return TestClient(app)
+
+    def test_upload_then_plot_parses_once(self, client, cache):
+        content = make_upload()
+        upload = client.post("/upload-download/", files={"file": ("rec.csv", content)})
+        assert upload.status_code == 200
+        body = upload.json()
+        assert body["filename"] == "rec_result"
+        assert body["items"][1]["R5"] is None
+
+        plot = client.post("/plot-csv", files={"file": ("rec.csv", content)})
+        assert plot.status_code == 200
+        assert [series["id"] for series in plot.json()] == ["X5", "R5", "Volume"]
+        assert cache.loader.calls == 1
+
+        export = client.get("/export-zip/", params={"upload_id": body["upload_id"]})
+        assert export.status_code == 200
+        assert "data.xlsx" in zipfile.ZipFile(io.BytesIO(export.content)).namelist()
+        assert cache.loader.calls == 1
+
+    def test_shutdown_clears_uploads(self, monkeypatch):
+        cleared = []
+        monkeypatch.setattr(upload_cache_module.upload_cache, "clear", lambda: cleared.append(True))
+        # Keep the app's batch and export runners usable for later tests
+        monkeypatch.setattr(batch_job_manager, "shutdown", lambda: None)
+        monkeypatch.setattr(export_job_manager, "shutdown", lambda: None)
+        with TestClient(app):
+            assert cleared == []
+        assert cleared == [True]
+
+    def test_export_unknown_upload(self, client):
+        assert client.get("/export-zip/", params={"upload_id": "missing"}).status_code == 404
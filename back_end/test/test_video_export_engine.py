@@ -0,0 +1,169 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import io
+import cv2
+import numpy as np
+import openpyxl
+import pytest
+import zipfile
+from PIL import Image
+from video_export_engine import (
+    VideoExportEngine, create_excel_export, downscale_thumbnail, iter_export_file, THUMBNAIL_SIZE
+)
+
+
+def make_frame(idx, measurements, formulas=None, comparisons=None, is_baseline=False):
+    return {
+        "frame_id": f"frame-{idx}", "frame_idx": idx * 5, "timestamp": idx / 10,
+        "custom_name": f"Frame {idx}", "measurements": measurements, "formulas": formulas or {},
+        "baseline_comparisons": comparisons or {}, "is_baseline": is_baseline
+    }
+
+
+def load_sheet(excel_file):
+    workbook = openpyxl.load_workbook(io.BytesIO(b"".join(iter_export_file(excel_file))))
+    return workbook["Analysis Results"]
+
+
+def find_row(sheet, label):
+    for row in sheet.iter_rows(min_col=1, max_col=1):
+        if row[0].value == label:
+            return row[0].row
+    raise AssertionError(f"{label} not found")
+
+
+class FakeSessionManager:
+    def __init__(self, shape=(40, 60, 3)):
+        ok, encoded = cv2.imencode(".jpg", np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8))
+        self.thumbnail = encoded.tobytes()
+
+    def get_frame_thumbnail(self, frame_id):
+        if frame_id == "missing":
+            raise ValueError("Frame or thumbnail not found")
+        return self.thumbnail
+
+
+class TestVideoExportEngine:
+    """Test the write-only Excel export"""
+
+    @pytest.fixture
+    def frames(self):
+        return [
+            make_frame(0, {"angle_a": 40.0, "area_a": 1000.0}, {"p_factor": 2.5}, is_baseline=True),
+            make_frame(1, {"angle_a": 44.0, "distance_a": 12.0}, {"p_factor": 3.0}, comparisons={
+                "angle_a": {"percentOfBaseline": 110.0, "percentChangeFromBaseline": 10.0},
+                "p_factor": {"percentOfBaseline": "120", "percentChangeFromBaseline": None}
+            })
+        ]
+
+    def test_layout_and_values(self, frames):
+        sheet = load_sheet(create_excel_export(frames, "frame-0"))
+        assert sheet["A1"].value == "Video Analysis Results"
+        assert sheet["A5"].value == "Total Frames:" and sheet["B5"].value == 2
+        assert sheet["B6"].value == "Frame 0"
+        assert sheet["A9"].value == "Frame 0 (Baseline)"
+        assert sheet["A10"].value == "Timestamp:" and sheet["D10"].value == 0
+        assert [c.value for c in sheet[13][:5]] == [
+            "Measurement/Formula", "Value", "Unit", "% of Baseline", "% Change from Baseline"
+        ]
+        assert sheet["A14"].value == "Raw Measurements"
+        assert [c.value for c in sheet[15][:5]] == ["Angle A", 40.0, "°", "N/A", "N/A"]
+        assert [c.value for c in sheet[16][:5]] == ["Area A", 1000.0, "px²", "N/A", "N/A"]
+        assert sheet["A17"].value == "Calculated Formulas"
+        assert sheet["A18"].value == "P-Factor (Area A / Distance A)"
+        # Next frame starts after one blank row in the table and two between frames
+        assert sheet["A22"].value == "Frame 1"
+
+    def test_baseline_comparisons(self, frames):
+        sheet = load_sheet(create_excel_export(frames, "frame-0"))
+        angle_row = sheet[28]
+        assert angle_row[0].value == "Angle A"
+        assert angle_row[3].value == pytest.approx(1.1)
+        assert angle_row[3].number_format == "0.0%"
+        assert angle_row[4].value == pytest.approx(0.1)
+        assert angle_row[4].number_format == "+0.0%;-0.0%"
+        # Distance A has no comparison; a string percentage is converted, a None one is "-"
+        assert [c.value for c in sheet[find_row(sheet, "Distance A")][3:5]] == ["-", "-"]
+        p_factor = sheet[31]
+        assert p_factor[0].value.startswith("P-Factor")
+        assert p_factor[3].value == pytest.approx(1.2)
+        assert p_factor[4].value == "-"
+
+    def test_styles_and_merges(self, frames):
+        sheet = load_sheet(create_excel_export(frames, "frame-0"))
+        merged = {str(r) for r in sheet.merged_cells.ranges}
+        assert {"A1:H2", "A9:H9", "A14:E14", "A17:E17", "A22:H22"} <= merged
+        assert sheet["A1"].fill.fgColor.rgb.endswith("4472C4")
+        assert sheet["A1"].font.b and sheet["A1"].font.sz == 16
+        assert sheet["A14"].fill.fgColor.rgb.endswith("E2EFDA")
+        assert sheet["A14"].alignment.horizontal == "left"
+        value_cell = sheet["B15"]
+        assert value_cell.number_format == "0.000"
+        assert value_cell.border.left.style == "thin"
+        assert value_cell.alignment.horizontal == "center"
+        assert sheet.column_dimensions["A"].width == 45
+        assert sheet.column_dimensions["E"].width == 25
+
+    def test_missing_and_invalid_values(self):
+        frame = make_frame(0, {"angle_a": "41.5", "angle_b": "abc", "area_a": None})
+        frame["baseline_comparisons"] = None
+        sheet = load_sheet(create_excel_export([frame]))
+        row = find_row(sheet, "Angle A")
+        assert sheet.cell(row, 2).value == 41.5
+        assert [c.value for c in sheet[row][3:5]] == ["-", "-"]
+        assert sheet.cell(row + 1, 2).value == "Invalid number"
+        with pytest.raises(AssertionError):
+            find_row(sheet, "Area A")
+        with pytest.raises(AssertionError):
+            find_row(sheet, "Baseline Frame:")
+
+    def test_thumbnails(self, frames):
+        engine = VideoExportEngine(session_manager=FakeSessionManager())
+        sheet = load_sheet(engine.create_excel_export(frames, "frame-0"))
+        assert len(sheet._images) == 2
+        # Thumbnails take 8 rows instead of 2
+        assert sheet["A13"].value is None
+        assert sheet["A19"].value == "Measurement/Formula"
+
+    def test_thumbnails_embedded_at_display_size(self, frames):
+        source = FakeSessionManager(shape=(720, 1280, 3))
+        frames.append(make_frame(2, {"angle_a": 1.0}))
+        frames[2]["frame_id"] = "missing"
+        excel_file = create_excel_export(frames, "frame-0", session_manager=source)
+        with zipfile.ZipFile(io.BytesIO(b"".join(iter_export_file(excel_file)))) as archive:
+            media = [name for name in archive.namelist() if name.startswith("xl/media/")]
+            assert len(media) == 2
+            for name in media:
+                data = archive.read(name)
+                assert len(data) < len(source.thumbnail) / 10
+                assert Image.open(io.BytesIO(data)).size == THUMBNAIL_SIZE
+
+    def test_downscale_thumbnail(self):
+        ok, png = cv2.imencode(".png", np.full((300, 400, 4), 200, dtype=np.uint8))
+        image = Image.open(io.BytesIO(downscale_thumbnail(png.tobytes(), size=(40, 30))))
+        assert image.format == "JPEG"
+        assert image.size == (40, 30)
+        with pytest.raises(Exception):
+            downscale_thumbnail(b"not an image")
+
+    def test_iter_export_file_closes(self, frames):
+        excel_file = create_excel_export(frames, "frame-0")
+        chunks = list(iter_export_file(excel_file, chunk_size=1024))
+        assert len(chunks) > 1
+        assert b"".join(chunks)[:2] == b"PK"
+        assert excel_file.closed
+
+    def test_large_session(self):
+        rng = np.random.default_rng(0)
+        frames = [
+            make_frame(i, {"angle_a": float(v), "area_a": float(v) * 10}, {"p_factor": float(v) / 7},
+                       comparisons={"angle_a": {"percentOfBaseline": 100.0, "percentChangeFromBaseline": 0.0}},
+                       is_baseline=i == 0)
+            for i, v in enumerate(rng.uniform(10, 90, 300))
+        ]
+        sheet = load_sheet(create_excel_export(frames, "frame-0"))
+        assert sheet["B5"].value == 300
+        assert len(sheet.merged_cells.ranges) == 1 + 3 * 300
+        assert sheet.cell(find_row(sheet, "Frame 299"), 1).fill.fgColor.rgb.endswith("8EA9DB")
@@ -0,0 +1,149 @@
+import io
+import logging
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# format -> (media type, file extension)
+TIDY_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+# Rows per CSV chunk / Parquet row group / Arrow record batch
+CHUNK_ROWS = 65536
+
+PERCENT_OF_SUFFIX = "_pct_of_baseline"
+PERCENT_CHANGE_SUFFIX = "_pct_change_from_baseline"
+
+
+def session_tidy_frame(session_manager, baseline_frame_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    One row per measured frame, in session order, with every measurement, formula
+    and baseline comparison as a column
+
+    Values come from the session's columnar measurement table, and comparisons are
+    computed over whole columns. Missing values are NaN. Without a usable baseline
+    the comparison columns are all NaN, so the schema does not change.
+
+    Args:
+        session_manager: Session to export
+        baseline_frame_id: Frame to compare against. Defaults to the session baseline
+
+    Raises:
+        ValueError: If there is no active session
+    """
+    session = session_manager.get_current_session()
+    if not session:
+        raise ValueError("No active session")
+    frames = session["measured_frames"]
+    table = session_manager.measurement_table
+    engine = session_manager.comparison_engine
+    baseline_frame_id = baseline_frame_id or session["baseline_frame_id"]
+
+    # The table swap-removes rows, so put them back into session order
+    rows = np.fromiter((table.row_index[f["frame_id"]] for f in frames), dtype=np.intp, count=len(frames))
+    values = table.values[rows]
+    frame_ids = [f["frame_id"] for f in frames]
+
+    columns = {
+        "frame_id": frame_ids,
+        "frame_idx": pd.array([f.get("frame_idx") for f in frames], dtype="Int64"),
+        "timestamp": np.array([f.get("timestamp") for f in frames], dtype=np.float64),
+        "custom_name": [f.get("custom_name") for f in frames],
+        "is_baseline": np.array([fid == baseline_frame_id for fid in frame_ids], dtype=bool),
+    }
+    for col, key in enumerate(table.keys):
+        columns[key] = values[:, col]
+
+    compared = values[:, [table.column_index[key] for key in engine.keys]]
+    percent_of = np.full_like(compared, np.nan)
+    percent_change = np.full_like(compared, np.nan)
+    if baseline_frame_id in frame_ids:
+        baseline_row = frame_ids.index(baseline_frame_id)
+        of, change, valid = engine.compare_columns(compared, baseline_row)
+        valid[baseline_row] = False
+        np.copyto(percent_of, of, where=valid)
+        np.copyto(percent_change, change, where=valid)
+    for col, key in enumerate(engine.keys):
+        columns[key + PERCENT_OF_SUFFIX] = percent_of[:, col]
+        columns[key + PERCENT_CHANGE_SUFFIX] = percent_change[:, col]
+
+    return pd.DataFrame(columns)
+
+
+def iter_tidy_export(df: pd.DataFrame, fmt: str = "csv", chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Serialize a tidy frame in chunks
+
+    Args:
+        df: Frame from session_tidy_frame
+        fmt: "csv", "parquet" or "arrow" (Arrow IPC file, memory-mappable downstream)
+        chunk_rows: Rows per CSV chunk, Parquet row group or Arrow record batch
+
+    Raises:
+        ValueError: Unknown format
+    """
+    if fmt not in TIDY_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}. Use one of: {', '.join(TIDY_FORMATS)}")
+    if fmt == "csv":
+        return _iter_csv(df, chunk_rows)
+    return _iter_arrow(df, fmt, chunk_rows)
+
+
+def _iter_csv(df: pd.DataFrame, chunk_rows: int) -> Iterator[bytes]:
+    yield df.head(0).to_csv(index=False).encode()
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that keeps what was written until drained, but reports the
+    full stream position (Parquet/Arrow footers record absolute offsets)"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_arrow(df: pd.DataFrame, fmt: str, chunk_rows: int) -> Iterator[bytes]:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, table.schema)
+    else:
+        writer = pa.ipc.new_file(sink, table.schema)
+    with writer:
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            if fmt == "parquet":
+                writer.write_batch(batch, row_group_size=chunk_rows)
+            else:
+                writer.write_batch(batch)
+            # Hand over what has been written so far
+            if data := sink.drain():
+                yield data
+    if data := sink.drain():
+        yield data
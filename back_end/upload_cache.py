@@ -0,0 +1,227 @@
+import os
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from Resp_Analysis.resp_modules.dataframe_loader import DataFrameLoader
+
+logger = logging.getLogger(__name__)
+
+
+class UploadEntry:
+    """
+    A parsed upload stored as one .npy file per column
+
+    Entries come from UploadCache held by the caller. An entry evicted while held keeps
+    its files until the last holder releases it, so use it as a context manager (or
+    call release()) once done reading.
+    """
+
+    def __init__(self, key: str, name: str, path: str, columns: List[str], index_name: Optional[str], rows: int):
+        self.key = key
+        self.name = name  # File name without extension
+        self.path = path
+        self.columns = columns
+        self.index_name = index_name
+        self.rows = rows
+        self.created_at = time.time()
+        # (vis_df, breaths) once the upload has been through process_dataframe
+        self.processed: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+        self.nullable: Set[Union[int, str]] = set()  # Stored columns with a null mask
+        self._holds = 0
+        self._evicted = False
+        self._hold_lock = threading.Lock()
+
+    def __enter__(self) -> "UploadEntry":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def release(self):
+        """Give up one hold; an evicted entry's files go with the last one"""
+        with self._hold_lock:
+            self._holds -= 1
+            delete = self._evicted and self._holds == 0
+        if delete:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def _hold(self) -> "UploadEntry":
+        with self._hold_lock:
+            self._holds += 1
+        return self
+
+    def _evict(self):
+        """Delete the files now, or when the last holder releases the entry"""
+        with self._hold_lock:
+            self._evicted = True
+            delete = self._holds == 0
+        if delete:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def dataframe(self) -> pd.DataFrame:
+        """
+        The upload as a DataFrame over memory-mapped columns
+
+        Nothing is read from disk until a column is used. The mapping is copy-on-write,
+        so callers may modify the result without touching the cached files.
+        """
+        data = {col: self._load_column(i) for i, col in enumerate(self.columns)}
+        index = pd.Index(self._load_column("index"), name=self.index_name)
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def _load_column(self, name: Union[int, str]) -> np.ndarray:
+        array = np.load(self._column_path(name), mmap_mode="c")
+        if name in self.nullable:
+            # Strings cannot hold NaN; restore the nulls the parse produced
+            array = array.astype(object)
+            array[np.load(self._null_path(name))] = np.nan
+        return array
+
+    def _column_path(self, name) -> str:
+        return os.path.join(self.path, f"{name}.npy")
+
+    def _null_path(self, name) -> str:
+        return os.path.join(self.path, f"{name}_nulls.npy")
+
+
+class UploadCache:
+    """
+    Parse-once cache of uploaded respiratory data files.
+
+    The frontend sends the same file to several endpoints. Entries are keyed by a
+    hash of the file content, so only the first request parses and validates it;
+    the others, and later exports, read the stored columns back via memory mapping.
+    load(), get() and latest() hand out held entries; see UploadEntry.
+
+    Without a cache_dir, a temporary directory is created on the first upload and
+    removed again by clear(), which the app calls on shutdown.
+    """
+
+    def __init__(self, max_entries: int = 8, cache_dir: Optional[str] = None,
+                 loader: Optional[DataFrameLoader] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._temporary_dir = cache_dir is None
+        self.loader = loader or DataFrameLoader(index_col="#", delimiter="\t")
+        self._entries: "OrderedDict[str, UploadEntry]" = OrderedDict()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_key(content: bytes, suffix: str) -> str:
+        """Key of an upload: its content and file type"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(suffix.lower().encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def load(self, content: bytes, filename: str) -> UploadEntry:
+        """
+        Get the cached entry for an upload, held, parsing and storing it on first sight
+
+        Args:
+            content: Raw file bytes
+            filename: Upload file name, for its suffix and the report name
+
+        Raises:
+            ValueError: The file could not be read or failed validation. Nothing is cached
+        """
+        stem, suffix = os.path.splitext(os.path.basename(filename))
+        key = self.content_key(content, suffix)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same file wait for one parse
+        try:
+            with key_lock:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        return entry._hold()
+
+                start = time.perf_counter()
+                df = self.loader.load_bytes(content, suffix, filename)
+                df.columns = df.columns.str.strip()
+                entry = self._store(key, stem, df)
+                logger.info(f"Cached upload {filename} ({entry.rows} rows) in {time.perf_counter() - start:.2f}s")
+                return entry
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def get(self, key: str) -> UploadEntry:
+        """Get an entry, held, KeyError if unknown or evicted"""
+        with self._lock:
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            return entry._hold()
+
+    def latest(self, processed: bool = False) -> Optional[UploadEntry]:
+        """Most recently used entry, held, optionally only among processed ones"""
+        with self._lock:
+            for entry in reversed(self._entries.values()):
+                if not processed or entry.processed is not None:
+                    return entry._hold()
+        return None
+
+    def clear(self):
+        """Drop all entries and their files, held or not"""
+        with self._lock:
+            self._entries.clear()
+            cache_dir = self.cache_dir
+            if self._temporary_dir:
+                self.cache_dir = None
+        if cache_dir is not None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def _store(self, key: str, name: str, df: pd.DataFrame) -> UploadEntry:
+        with self._lock:
+            if self.cache_dir is None:
+                self.cache_dir = tempfile.mkdtemp(prefix="rnsh_uploads_")
+            path = os.path.join(self.cache_dir, key)
+        os.makedirs(path, exist_ok=True)
+        entry = UploadEntry(key, name, path, list(df.columns), df.index.name, len(df))
+        try:
+            for name, values in [*enumerate(df[col] for col in entry.columns), ("index", df.index)]:
+                array, nulls = self._column_array(values)
+                np.save(entry._column_path(name), array)
+                if nulls is not None:
+                    np.save(entry._null_path(name), nulls)
+                    entry.nullable.add(name)
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        with self._lock:
+            self._entries[key] = entry._hold()
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1])
+        for old in evicted:
+            old._evict()
+        return entry
+
+    @staticmethod
+    def _column_array(values) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Numeric data as is; anything else as fixed-width strings, so no pickling, plus
+        a mask of its nulls when it has any
+        """
+        array = np.asarray(values)
+        if array.dtype.kind in "biuf":
+            return array, None
+        nulls = np.asarray(pd.isna(values))
+        strings = np.where(nulls, "", array.astype(object)).astype(str)
+        return strings, nulls if nulls.any() else None
+
+
+# Global upload cache
+upload_cache = UploadCache()
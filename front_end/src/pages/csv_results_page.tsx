@@ -24,6 +24,7 @@ function CSVResultsPage() {
   const chartData = useCSVResultStore((state) => state.result)
   const clearResult = useCSVResultStore((state) => state.clearResult)
   const segmentData = useCSVResultStore((state) => state.segmentData)
+  const uploadId = useCSVResultStore((state) => state.uploadId)
 
   const [error, setError] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
@@ -92,6 +93,9 @@ function CSVResultsPage() {
   }
 
 const handleExport = async () => {
+  const exportUrl = uploadId
+    ? `http://localhost:8000/export-zip/?upload_id=${encodeURIComponent(uploadId)}`
+    : 'http://localhost:8000/export-zip/'
   try {
     // Check if we're running in Electron
     if (window.electronAPI?.isElectron) {
@@ -99,7 +103,7 @@ const handleExport = async () => {
       
       // Use Electron's secure download API
       const result = await window.electronAPI.downloadFile(
-        'http://localhost:8000/export-zip/',
+        exportUrl,
         'report.zip',
         'GET'
       );
@@ -118,7 +122,7 @@ const handleExport = async () => {
       console.log('Using browser download API for CSV export');
       
       // Fallback to browser download for web version
-      const response = await fetch("http://localhost:8000/export-zip/", {
+      const response = await fetch(exportUrl, {
         method: "GET",
       });
 
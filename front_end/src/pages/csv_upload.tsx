@@ -11,6 +11,7 @@ const CSVUpload = () => {
 
   const setResult = useCSVResultStore((state) => state.setResult)
   const setSegmentData = useCSVResultStore((state) => state.setSegmentData)
+  const setUploadId = useCSVResultStore((state) => state.setUploadId)
   const clearResult = useCSVResultStore((state) => state.clearResult)
 
   // Clear any existing results when entering the upload page
@@ -45,6 +46,7 @@ const CSVUpload = () => {
 
       setResult(chartData)
       setSegmentData(segmentResp.items)
+      setUploadId(segmentResp.upload_id ?? null)
       navigate('/csv-results')
 
     } catch (err) {
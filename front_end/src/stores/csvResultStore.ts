@@ -12,8 +12,10 @@ type DataRow = Record<string, string | number | null>
 interface CSVResultState {
   result: ChartDatum[] | null
   segmentData: DataRow[]
+  uploadId: string | null
   setResult: (data: ChartDatum[]) => void
   setSegmentData: (data: DataRow[]) => void
+  setUploadId: (id: string | null) => void
   clearResult: () => void
 }
 
@@ -22,9 +24,11 @@ export const useCSVResultStore = create<CSVResultState>()(
     (set) => ({
       result: null,
       segmentData: [],
+      uploadId: null,
       setResult: (data) => set({ result: data }),
       setSegmentData: (data) => set({ segmentData: data }),
-      clearResult: () => set({ result: null, segmentData: [] })
+      setUploadId: (id) => set({ uploadId: id }),
+      clearResult: () => set({ result: null, segmentData: [], uploadId: null })
     }),
     {
       name: "csv-result-storage"
@@ -1,4 +1,4 @@
-import { calculateAllBaselineComparisons, type FullFrameData } from './baselineCalculations';
+import { type BaselineComparison, type FullFrameData } from './baselineCalculations';
 
 export interface FrameExportData {
   frame_id: string;
@@ -37,6 +37,10 @@ export interface FrameExportData {
   thumbnail_url?: string;
 }
 
+interface SessionFrameData extends FullFrameData {
+  baseline_comparisons?: Record<string, BaselineComparison | null> | null;
+}
+
 export interface ExportData {
   frames_data: FrameExportData[];
   baseline_frame_id?: string;
@@ -51,55 +55,56 @@ export const prepareFramesForExport = async (
   baselineFrameId?: string
 ): Promise<FrameExportData[]> => {
   const exportData: FrameExportData[] = [];
-  let baselineFrameData: FullFrameData | null = null;
+  let framesById = new Map<string, SessionFrameData>();
 
-  // Fetch baseline frame data if we have a baseline
-  if (baselineFrameId) {
-    try {
-      const baselineResponse = await fetch(`http://localhost:8000/session/frame-details/${baselineFrameId}`);
-      if (baselineResponse.ok) {
-        baselineFrameData = await baselineResponse.json();
-      }
-    } catch (error) {
-      console.error('Error fetching baseline frame data:', error);
+  // Fetch every frame with its server-computed baseline comparisons in a single request
+  try {
+    const params = new URLSearchParams({
+      frame_ids: frameMetadata.map((frame) => frame.frame_id).join(','),
+      fields: 'frame_idx,timestamp,custom_name,measurements,formulas,baseline_comparisons'
+    });
+    const response = await fetch(`http://localhost:8000/session/frame-details?${params}`);
+    if (!response.ok) {
+      console.error('Failed to fetch frame details for export');
+      return exportData;
+    }
+    const { frames, missing = [] }: { frames: SessionFrameData[]; missing?: string[] } = await response.json();
+    if (missing.length > 0) {
+      // Frames removed from the session since they were listed; export the rest
+      console.warn(`Skipping frames no longer in the session: ${missing.join(', ')}`);
     }
+    framesById = new Map(frames.map((frame): [string, SessionFrameData] => [frame.frame_id, frame]));
+  } catch (error) {
+    console.error('Error fetching frame details:', error);
+    return exportData;
   }
 
   // Process each frame
   for (const frame of frameMetadata) {
-    try {
-      // Fetch full frame data for each frame
-      const frameResponse = await fetch(`http://localhost:8000/session/frame-details/${frame.frame_id}`);
-      if (!frameResponse.ok) {
-        console.error(`Failed to fetch data for frame ${frame.frame_id}`);
-        continue;
-      }
+    const fullFrameData = framesById.get(frame.frame_id);
+    if (!fullFrameData) {
+      continue;
+    }
 
-      const fullFrameData: FullFrameData = await frameResponse.json();
-      
-      // Calculate baseline comparisons if we have baseline data
-      let baselineComparisons = undefined;
-      if (baselineFrameData && frame.frame_id !== baselineFrameId) {
-        baselineComparisons = calculateAllBaselineComparisons(fullFrameData, baselineFrameData);
-      }
+    // Baseline comparisons are computed by the session (null for the baseline frame itself)
+    const baselineComparisons = baselineFrameId && frame.frame_id !== baselineFrameId
+      ? fullFrameData.baseline_comparisons ?? undefined
+      : undefined;
 
-      // Prepare export data for this frame
-      const frameExportData: FrameExportData = {
-        frame_id: frame.frame_id,
-        frame_idx: fullFrameData.frame_idx,
-        timestamp: fullFrameData.timestamp,
-        custom_name: fullFrameData.custom_name || `Frame ${fullFrameData.frame_idx}`,
-        measurements: fullFrameData.measurements || {},
-        formulas: fullFrameData.formulas || {},
-        baseline_comparisons: baselineComparisons,
-        is_baseline: frame.frame_id === baselineFrameId,
-        thumbnail_url: frame.thumbnail_url
-      };
+    // Prepare export data for this frame
+    const frameExportData: FrameExportData = {
+      frame_id: frame.frame_id,
+      frame_idx: fullFrameData.frame_idx,
+      timestamp: fullFrameData.timestamp,
+      custom_name: fullFrameData.custom_name || `Frame ${fullFrameData.frame_idx}`,
+      measurements: fullFrameData.measurements || {},
+      formulas: fullFrameData.formulas || {},
+      baseline_comparisons: baselineComparisons,
+      is_baseline: frame.frame_id === baselineFrameId,
+      thumbnail_url: frame.thumbnail_url
+    };
 
-      exportData.push(frameExportData);
-    } catch (error) {
-      console.error(`Error processing frame ${frame.frame_id}:`, error);
-    }
+    exportData.push(frameExportData);
   }
 
   return exportData;